@@ -0,0 +1,143 @@
+"""
+JWT-аутентификация по утверждениям токена.
+
+Токен, выданный get_jwt_token, содержит id, роль, is_staff и версию
+токенов пользователя. По ним строится ClaimsUser, и запрос проходит
+проверку прав без чтения строки пользователя из базы. Версия токенов
+сверяется с кэшем, общим для всех процессов: после смены роли старые
+токены отклоняются. Для
+токенов без утверждений и для остальных полей, включая имя, которое
+можно сменить без отзыва токенов, пользователь берется из кэша процесса
+(user_cache) или из базы.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import ADMIN, DEFAULT_USER, MODERATOR, User
+from . import metrics
+from .user_cache import get_user
+
+VERSION_CLAIM = 'token_version'
+CLAIMS = ('role', 'is_staff', VERSION_CLAIM)
+TOKEN_VERSION_KEY = 'api:token_version:{}'
+REVOKED = -1
+
+
+def get_cache():
+    return caches[settings.TOKEN_VERSION_CACHE_ALIAS]
+
+
+def get_token_version(user_id):
+    """Текущая версия токенов пользователя; REVOKED, если входить нельзя."""
+    key = TOKEN_VERSION_KEY.format(user_id)
+    version = get_cache().get(key)
+    if version is None:
+        row = User.objects.filter(pk=user_id).values_list(
+            'token_version', 'is_active'
+        ).first()
+        version = row[0] if row and row[1] else REVOKED
+        # add не затирает версию, записанную store_token_version, пока
+        # прочитанное из базы значение было в пути.
+        get_cache().add(key, version, settings.TOKEN_VERSION_TIMEOUT)
+    return version
+
+
+def store_token_version(user_id, version):
+    """Записывает новую версию токенов в кэш, общий для всех процессов."""
+    get_cache().set(
+        TOKEN_VERSION_KEY.format(user_id), version,
+        settings.TOKEN_VERSION_TIMEOUT
+    )
+
+
+class ClaimsAccessToken(AccessToken):
+    """Токен доступа с утверждениями для ClaimsUser."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for claim in CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    Пользователь из утверждений токена. Проверки прав используют только
+    их; обращение к другим полям, сравнение или сохранение в качестве
+    внешнего ключа один раз загружает пользователя из базы.
+    """
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: get_user(user_id))
+        self.__dict__['claims'] = {
+            'pk': user_id,
+            **{claim: token[claim] for claim in CLAIMS},
+        }
+
+    pk = id = property(lambda self: self.claims['pk'])
+    role = property(lambda self: self.claims['role'])
+    is_staff = property(lambda self: self.claims['is_staff'])
+    is_active = is_authenticated = property(lambda self: True)
+    is_anonymous = property(lambda self: False)
+
+    @property
+    def is_admin(self):
+        return self.role == ADMIN or self.is_staff
+
+    @property
+    def is_moderator(self):
+        return self.role == MODERATOR
+
+    @property
+    def is_user(self):
+        return self.role == DEFAULT_USER
+
+
+class YamdbJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация по утверждениям токена с подсчетом токенов."""
+
+    def get_validated_token(self, raw_token):
+        try:
+            token = super().get_validated_token(raw_token)
+        except InvalidToken:
+            metrics.JWT_TOKENS.inc(event='rejected')
+            raise
+        metrics.JWT_TOKENS.inc(event='validated')
+        return token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            raise InvalidToken('Токен не содержит идентификатор пользователя')
+        if any(claim not in validated_token for claim in CLAIMS):
+            return self.get_stored_user(user_id)
+        if validated_token[VERSION_CLAIM] != get_token_version(user_id):
+            metrics.JWT_TOKENS.inc(event='revoked')
+            raise AuthenticationFailed(
+                'Токен отозван', code='token_revoked'
+            )
+        return ClaimsUser(validated_token)
+
+    def get_stored_user(self, user_id):
+        """Пользователь из кэша процесса или базы, как в simplejwt."""
+        try:
+            user = get_user(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(
+                'Пользователь не найден', code='user_not_found'
+            )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                'Пользователь неактивен', code='user_inactive'
+            )
+        return user
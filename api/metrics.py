@@ -0,0 +1,245 @@
+"""
+Метрики приложения в формате Prometheus.
+
+Каждый процесс копит приращения в памяти и периодически сбрасывает их
+одной транзакцией в общий файл SQLite (METRICS_PATH), где значения
+складываются. Эндпоинт /metrics сбрасывает буфер своего процесса и
+отдает суммы по всем процессам, поэтому внешний сервис не нужен.
+"""
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+logger = logging.getLogger('api.metrics')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SCHEMA = """CREATE TABLE IF NOT EXISTS metrics (
+    series TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (series, labels)
+)"""
+UPSERT = """INSERT INTO metrics (series, labels, value) VALUES (?, ?, ?)
+ON CONFLICT (series, labels) DO UPDATE SET value = value + excluded.value"""
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', '\\\\').replace('"', '\\"')
+        .replace('\n', '\\n')
+    )
+
+
+def format_labels(names, values):
+    return ','.join(
+        f'{name}="{escape(value)}"' for name, value in zip(names, values)
+    )
+
+
+class Buffer:
+    """Приращения метрик текущего процесса, еще не записанные в файл."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.flushed = time.monotonic()
+
+    def add(self, series, labels, value):
+        with self.lock:
+            key = (series, labels)
+            self.values[key] = self.values.get(key, 0) + value
+        if time.monotonic() - self.flushed >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """
+        Записывает приращения в файл. Если файл недоступен, приращения
+        возвращаются в буфер до следующей попытки, а запрос, во время
+        которого случился сброс, не завершается ошибкой.
+        """
+        with self.lock:
+            values, self.values = self.values, {}
+            self.flushed = time.monotonic()
+        if not values:
+            return
+        try:
+            with connect() as connection:
+                connection.executemany(UPSERT, [
+                    (series, labels, value)
+                    for (series, labels), value in values.items()
+                ])
+        except (sqlite3.Error, OSError):
+            logger.exception(
+                'Не удалось записать метрики в %s', settings.METRICS_PATH
+            )
+            with self.lock:
+                for key, value in values.items():
+                    self.values[key] = self.values.get(key, 0) + value
+
+    def clear(self):
+        with self.lock:
+            self.values = {}
+
+
+buffer = Buffer()
+atexit.register(lambda: settings.METRICS_ENABLED and buffer.flush())
+# Дочерний процесс (воркер gunicorn с --preload) не должен повторно
+# сбросить приращения, накопленные родителем до fork.
+os.register_at_fork(after_in_child=buffer.reset)
+
+
+@contextmanager
+def connect():
+    """Соединение с файлом метрик; изменения фиксируются при выходе."""
+    connection = sqlite3.connect(settings.METRICS_PATH, timeout=10)
+    try:
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute(SCHEMA)
+        with connection:
+            yield connection
+    finally:
+        connection.close()
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        REGISTRY.append(self)
+
+    def label_string(self, values):
+        missing = set(self.labels) - set(values)
+        if missing:
+            raise ValueError(
+                f'Метрике {self.name} не хватает меток: {sorted(missing)}'
+            )
+        return format_labels(
+            self.labels, (values[name] for name in self.labels)
+        )
+
+    def series(self):
+        return (self.name,)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if settings.METRICS_ENABLED:
+            buffer.add(self.name, self.label_string(labels), amount)
+
+
+class Histogram(Metric):
+    """Гистограмма: накопительные корзины `le`, сумма и количество."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=()):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        if not settings.METRICS_ENABLED:
+            return
+        label_string = self.label_string(labels)
+        prefix = label_string + ',' if label_string else ''
+        for bound in self.buckets:
+            if value <= bound:
+                buffer.add(
+                    f'{self.name}_bucket',
+                    f'{prefix}le="{format_bound(bound)}"', 1
+                )
+        buffer.add(f'{self.name}_sum', label_string, value)
+        buffer.add(f'{self.name}_count', label_string, 1)
+
+    def series(self):
+        return tuple(
+            f'{self.name}_{suffix}' for suffix in ('bucket', 'sum', 'count')
+        )
+
+
+def format_bound(bound):
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def sort_key(item):
+    """Корзины гистограммы идут по возрастанию границы `le`."""
+    labels, _ = item
+    head, separator, bound = labels.rpartition('le="')
+    if not separator:
+        return labels, 0.0
+    return head, float(bound.rstrip('"').replace('+Inf', 'inf'))
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+REGISTRY = []
+
+REQUESTS = Counter(
+    'yamdb_http_requests_total', 'Количество запросов к API.',
+    ('view', 'action', 'method', 'status')
+)
+REQUEST_LATENCY = Histogram(
+    'yamdb_http_request_duration_seconds', 'Время обработки запроса.',
+    ('view', 'action'), LATENCY_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    'yamdb_http_request_db_queries', 'Число запросов к БД за запрос.',
+    ('view', 'action'), QUERY_BUCKETS
+)
+CACHE_REQUESTS = Counter(
+    'yamdb_response_cache_total', 'Обращения к кэшу ответов.',
+    ('view', 'action', 'outcome')
+)
+EMAILS = Counter(
+    'yamdb_emails_total', 'Письма: поставленные в очередь и отправленные.',
+    ('state',)
+)
+JWT_TOKENS = Counter(
+    'yamdb_jwt_total', 'Выданные и проверенные JWT-токены.', ('event',)
+)
+USER_CACHE_REQUESTS = Counter(
+    'yamdb_user_cache_total', 'Обращения к кэшу пользователей процесса.',
+    ('outcome',)
+)
+
+
+def render():
+    """Текст метрик всех процессов в формате Prometheus."""
+    buffer.flush()
+    with connect() as connection:
+        rows = connection.execute(
+            'SELECT series, labels, value FROM metrics'
+        ).fetchall()
+    by_series = {}
+    for series, labels, value in rows:
+        by_series.setdefault(series, []).append((labels, value))
+    lines = []
+    for values in by_series.values():
+        values.sort(key=sort_key)
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for series in metric.series():
+            for labels, value in by_series.get(series, ()):
+                label_part = f'{{{labels}}}' if labels else ''
+                lines.append(f'{series}{label_part} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
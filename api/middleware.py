@@ -0,0 +1,225 @@
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.urls import reverse
+from rest_framework.exceptions import APIException
+from rest_framework.settings import api_settings
+
+from . import metrics
+from .mixins import time_serialization
+from .profiling import PROFILE_PARAM, PROFILERS, save_report
+
+logger = logging.getLogger('api.timing')
+_current_view = ContextVar('current_view', default=None)
+
+
+class QueryTimer:
+    """Обертка выполнения SQL: считает запросы и их суммарное время."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.count += 1
+
+
+def get_view_labels(request):
+    """
+    Представление и действие: (`TitleViewSet`, `list`), (`signup`,
+    `post`). Для запросов вне маршрутов — (`none`, метод).
+    """
+    action = request.method.lower()
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'none', action
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.func.__name__, action
+    actions = getattr(match.func, 'actions', None) or {}
+    return view_class.__name__, actions.get(action, action)
+
+
+def get_view_name(request):
+    """Имя представления: `TitleViewSet.list`, `signup`."""
+    if getattr(request, 'resolver_match', None) is None:
+        return None
+    view, action = get_view_labels(request)
+    if getattr(request.resolver_match.func, 'actions', None):
+        return f'{view}.{action}'
+    return view
+
+
+def current_view():
+    """Имя представления запроса, который обрабатывается сейчас."""
+    return _current_view.get()
+
+
+@contextmanager
+def count_queries():
+    """Считает запросы ко всем базам данных внутри блока."""
+    timer = QueryTimer()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+        yield timer
+
+
+class ViewContextMiddleware:
+    """
+    Запоминает имя представления, выбранного для запроса, чтобы его
+    могли указать обертки SQL, у которых нет доступа к запросу.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _current_view.set(None)
+        try:
+            return self.get_response(request)
+        finally:
+            _current_view.reset(token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _current_view.set(get_view_name(request))
+
+
+class RequestTimingMiddleware:
+    """
+    Замеряет для каждого запроса число запросов к БД, время SQL, время
+    сериализаторов, время рендеринга ответа и общее время. Результат
+    добавляется в заголовки Server-Timing и X-DB-Queries и пишется в лог
+    `api.timing`.
+    Включается настройкой REQUEST_TIMING.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request._render_seconds = 0.0
+        started = time.perf_counter()
+        with count_queries() as timer, time_serialization() as serialize:
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        record = {
+            'view': get_view_name(request),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': timer.count,
+            'db_ms': round(timer.seconds * 1000, 2),
+            'serialize_ms': round(serialize.seconds * 1000, 2),
+            'render_ms': round(request._render_seconds * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }
+        response['X-DB-Queries'] = str(timer.count)
+        response['Server-Timing'] = (
+            f'db;dur={record["db_ms"]};desc="{timer.count} queries", '
+            f'serialize;dur={record["serialize_ms"]}, '
+            f'render;dur={record["render_ms"]}, '
+            f'total;dur={record["total_ms"]}'
+        )
+        logger.info(
+            json.dumps(record, ensure_ascii=False), extra={'timing': record}
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Ответы DRF рендерятся после представления: время от этого момента
+        до конца рендеринга считается временем рендеринга.
+        """
+        started = time.perf_counter()
+
+        def rendered(response):
+            request._render_seconds += time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Метрики запросов для /metrics: количество, время обработки и число
+    запросов к БД по представлениям и действиям DRF. Включается
+    настройкой METRICS_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        with count_queries() as timer:
+            response = self.get_response(request)
+        view, action = get_view_labels(request)
+        metrics.REQUESTS.inc(
+            view=view, action=action, method=request.method,
+            status=response.status_code
+        )
+        metrics.REQUEST_LATENCY.observe(
+            time.perf_counter() - started, view=view, action=action
+        )
+        metrics.REQUEST_QUERIES.observe(timer.count, view=view, action=action)
+        return response
+
+
+def get_api_user(request):
+    """
+    Пользователь по учетным данным запроса, проверенным так же, как это
+    делает API. До представлений DRF request.user еще анонимный.
+    """
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(request)
+        except APIException:
+            return None
+        if result is not None:
+            return result[0]
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Профилирование запроса администратора по параметру `?_profile=`
+    (`cprofile` или `sql`). Отчет сохраняется в кэше, его адрес
+    передается в заголовках X-Profile-Id и X-Profile-Url. Для остальных
+    запросов проверяется только наличие параметра в строке запроса.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if PROFILE_PARAM not in request.META.get('QUERY_STRING', ''):
+            return self.get_response(request)
+        profiler = PROFILERS.get(request.GET.get(PROFILE_PARAM))
+        if profiler is None:
+            return self.get_response(request)
+        user = get_api_user(request)
+        if user is None or not user.is_admin:
+            return self.get_response(request)
+        response, report = profiler(self.get_response, request)
+        profile_id = save_report(report)
+        response['X-Profile-Id'] = profile_id
+        response['X-Profile-Url'] = request.build_absolute_uri(
+            reverse('profile-report', args=(profile_id,))
+        )
+        return response
@@ -1,6 +1,54 @@
+import threading
+import time
+from contextlib import contextmanager
+
 from reviews.validators import validate_username
 
+_timing = threading.local()
+
 
 class ValidateUsernameMixin:
     def validate_username(self, value):
         return validate_username(value)
+
+
+class SerializeTimer:
+    """Суммарное время сериализации; вложенные вызовы не складываются."""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.active = False
+
+    def __enter__(self):
+        self.active = True
+        self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.seconds += time.perf_counter() - self.started
+        self.active = False
+
+
+@contextmanager
+def time_serialization():
+    """Считает время сериализаторов с SerializeTimingMixin внутри блока."""
+    previous = getattr(_timing, 'timer', None)
+    _timing.timer = timer = SerializeTimer()
+    try:
+        yield timer
+    finally:
+        _timing.timer = previous
+
+
+class SerializeTimingMixin:
+    """
+    Добавляет время to_representation к замеру time_serialization.
+    Вложенные сериализаторы и запросы связанных объектов входят во
+    время внешнего сериализатора.
+    """
+
+    def to_representation(self, instance):
+        timer = getattr(_timing, 'timer', None)
+        if timer is None or timer.active:
+            return super().to_representation(instance)
+        with timer:
+            return super().to_representation(instance)
@@ -0,0 +1,146 @@
+"""
+Очередь исходящих писем.
+
+enqueue() только сохраняет письмо в таблицу OutgoingEmail. Команда
+send_emails забирает письма пачками, отправляет каждую пачку через одно
+соединение с почтовым сервером и при ошибках переносит письма на потом
+с экспоненциально растущей задержкой. С EMAIL_OUTBOX_EAGER письмо
+отправляется сразу после постановки в очередь (для тестов и отладки).
+"""
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+from . import metrics
+
+SAVE_ATTEMPTS = 5
+SAVE_RETRY_DELAY = 0.05
+RESULT_FIELDS = (
+    'status', 'attempts', 'next_attempt_at', 'claimed_by', 'last_error',
+    'sent_at'
+)
+
+
+def enqueue(subject, body, recipients, from_email=None):
+    emails = [
+        OutgoingEmail.objects.create(
+            subject=subject, body=body, recipient=recipient,
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL
+        )
+        for recipient in recipients
+    ]
+    metrics.EMAILS.inc(len(emails), state='queued')
+    if settings.EMAIL_OUTBOX_EAGER:
+        transaction.on_commit(lambda: send_batch(
+            claim(len(emails), pks=[email.pk for email in emails])
+        ))
+    return emails
+
+
+def claim(batch_size, pks=None):
+    """
+    Забирает пачку писем, срок отправки которых наступил. Письма
+    помечаются идентификатором обработчика и откладываются на
+    EMAIL_OUTBOX_LEASE секунд, поэтому несколько обработчиков не
+    отправят одно письмо дважды, а письма упавшего обработчика вернутся
+    в очередь.
+    """
+    now = timezone.now()
+    due = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.PENDING, next_attempt_at__lte=now
+    )
+    if pks is not None:
+        due = due.filter(pk__in=pks)
+    candidates = list(due.values_list('pk', flat=True)[:batch_size])
+    if not candidates:
+        return []
+    token = uuid.uuid4().hex
+    # Пометка и чтение пачки в одной транзакции: если чтение упадет,
+    # письма не останутся в аренде у обработчика, который их не получил.
+    with transaction.atomic():
+        due.filter(pk__in=candidates).update(
+            claimed_by=token,
+            next_attempt_at=now + timedelta(
+                seconds=settings.EMAIL_OUTBOX_LEASE
+            )
+        )
+        return list(OutgoingEmail.objects.filter(claimed_by=token))
+
+
+def backoff(attempts):
+    return timedelta(seconds=min(
+        settings.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1),
+        settings.EMAIL_OUTBOX_BACKOFF_MAX
+    ))
+
+
+def fail(email, error, now):
+    email.attempts += 1
+    email.last_error = f'{type(error).__name__}: {error}'
+    email.claimed_by = ''
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = OutgoingEmail.FAILED
+        metrics.EMAILS.inc(state='failed')
+    else:
+        email.next_attempt_at = now + backoff(email.attempts)
+
+
+def save_results(emails):
+    """
+    Сохраняет итоги отправки пачки. Письма уже ушли, поэтому при ошибке
+    базы запись повторяется: иначе после аренды они отправятся снова.
+    """
+    for attempt in range(1, SAVE_ATTEMPTS + 1):
+        try:
+            OutgoingEmail.objects.bulk_update(emails, RESULT_FIELDS)
+            return
+        except DatabaseError:
+            # Внутри транзакции повтор невозможен до ее отката.
+            if attempt == SAVE_ATTEMPTS or connection.in_atomic_block:
+                raise
+            time.sleep(SAVE_RETRY_DELAY * attempt)
+
+
+def send_batch(emails, backend=None):
+    """
+    Отправляет письма через одно соединение. Возвращает число
+    отправленных; неотправленные письма переносятся или помечаются
+    как не отправленные после EMAIL_OUTBOX_MAX_ATTEMPTS попыток.
+    """
+    if not emails:
+        return 0
+    sent = 0
+    now = timezone.now()
+    try:
+        with get_connection(backend) as connection:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email,
+                    [email.recipient], connection=connection
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    fail(email, error, timezone.now())
+                    continue
+                email.status = OutgoingEmail.SENT
+                email.sent_at = timezone.now()
+                email.attempts += 1
+                email.claimed_by = ''
+                sent += 1
+    except Exception as error:
+        # Соединение не открылось или оборвалось: все письма пачки,
+        # которые еще не отправлены, повторяются позже.
+        for email in emails:
+            if email.status == OutgoingEmail.PENDING and email.claimed_by:
+                fail(email, error, now)
+    save_results(emails)
+    if sent:
+        metrics.EMAILS.inc(sent, state='sent')
+    return sent
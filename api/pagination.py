@@ -0,0 +1,254 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """
+    Пагинация по ключу (курсору) для выборок с составной сортировкой.
+
+    Без параметра `cursor` в запросе работает как LimitOffsetPagination.
+    С ним (пустое значение — первая страница) выдает страницы, начиная
+    с позиции, закодированной в курсоре, без OFFSET и COUNT(*).
+    Если задан newer_query_param, ответ содержит ссылку `newer` для
+    опроса объектов, появившихся перед первым объектом страницы.
+    Последнее поле сортировки должно быть уникальным, значение NULL
+    допускается только в первом. Параметры из ranking_query_params
+    задают собственную сортировку выборки, поэтому вместе с курсором
+    они отклоняются с ответом 400.
+    """
+    cursor_query_param = 'cursor'
+    newer_query_param = None
+    ordering = ('-id',)
+    ranking_query_params = ()
+    invalid_cursor_message = 'Неверный курсор.'
+    ranking_message = (
+        'Пагинация по курсору недоступна вместе с параметрами: {}.'
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        newer = (
+            self.newer_query_param is not None
+            and self.newer_query_param in request.query_params
+        )
+        self.keyset = newer or self.cursor_query_param in request.query_params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        ranking = [
+            param for param in self.ranking_query_params
+            if request.query_params.get(param)
+        ]
+        if ranking:
+            raise ValidationError({
+                self.cursor_query_param: self.ranking_message.format(
+                    ', '.join(ranking)
+                )
+            })
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.fields = [
+            (field.lstrip('-'), field.startswith('-'))
+            for field in self.ordering
+        ]
+        if newer:
+            position, _ = self.decode_cursor(
+                queryset, request.query_params[self.newer_query_param]
+            )
+            if position is None:
+                raise NotFound(self.invalid_cursor_message)
+            results = self.paginate_keyset(queryset, position, True)
+        else:
+            position, reverse = self.decode_cursor(
+                queryset, request.query_params[self.cursor_query_param]
+            )
+            results = self.paginate_keyset(queryset, position, reverse)
+        if results:
+            self.newest_position = self.get_position(results[0])
+        else:
+            self.newest_position = position if newer else None
+        return results
+
+    def paginate_keyset(self, queryset, position, reverse):
+        ordered = queryset.order_by(*self.order_by(queryset, reverse))
+        if position is None:
+            results = list(ordered[:self.limit + 1])
+        else:
+            results = []
+            for condition in self.position_filters(
+                    queryset, position, reverse):
+                results.extend(
+                    ordered.filter(condition)[:self.limit + 1 - len(results)]
+                )
+                if len(results) > self.limit:
+                    break
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+        has_next = reverse or has_more
+        has_previous = has_more if reverse else position is not None
+        self.next_position = self.previous_position = None
+        if results:
+            if has_next:
+                self.next_position = self.get_position(results[-1])
+            if has_previous:
+                self.previous_position = self.get_position(results[0])
+        elif not reverse and position is not None:
+            self.previous_position = position
+        return results
+
+    def order_by(self, queryset, reverse=False):
+        ordering = []
+        for name, desc in self.fields:
+            expression = F(name).desc if desc != reverse else F(name).asc
+            if self.is_nullable(queryset, name):
+                # NULL всегда в конце выдачи, в обратном порядке — в начале.
+                ordering.append(expression(
+                    nulls_first=reverse, nulls_last=not reverse
+                ))
+            else:
+                ordering.append(expression())
+        return ordering
+
+    @staticmethod
+    def is_nullable(queryset, name):
+        return queryset.model._meta.get_field(name).null
+
+    def position_filters(self, queryset, position, reverse=False):
+        """
+        Условия «строго после позиции» в порядке выдачи страницы.
+
+        Условия разбиты на части, которые выбираются по очереди: диапазон
+        по первому полю сортировки позволяет пройти по индексу без
+        сортировки всей выборки. Значение NULL допускается только
+        в первом поле.
+        """
+        (name, desc), value = self.fields[0], position[0]
+        tail = self.tail_filter(position[1:], reverse)
+        nullable = self.is_nullable(queryset, name)
+        if value is None:
+            conditions = [Q(**{f'{name}__isnull': True}) & tail]
+            if reverse:
+                conditions.append(Q(**{f'{name}__isnull': False}))
+            return conditions
+        bound, strict = ('lte', 'lt') if desc != reverse else ('gte', 'gt')
+        conditions = [
+            Q(**{f'{name}__{bound}': value})
+            & (Q(**{f'{name}__{strict}': value}) | Q(**{name: value}) & tail)
+        ]
+        if nullable and not reverse:
+            conditions.append(Q(**{f'{name}__isnull': True}))
+        return conditions
+
+    def tail_filter(self, position, reverse=False):
+        condition = Q(pk__in=[])
+        equal = Q()
+        for (name, desc), value in zip(self.fields[1:], position):
+            lookup = 'lt' if desc != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def get_position(self, instance):
+        return [getattr(instance, name) for name, _ in self.fields]
+
+    def encode_cursor(self, position, reverse=False):
+        data = {
+            'p': [
+                value.isoformat() if isinstance(value, datetime) else value
+                for value in position
+            ],
+        }
+        if reverse:
+            data['r'] = 1
+        return base64.urlsafe_b64encode(
+            json.dumps(data, separators=(',', ':')).encode()
+        ).decode()
+
+    def get_link(self, query_param, cursor):
+        url = self.request.build_absolute_uri()
+        for param in (self.offset_query_param, self.cursor_query_param,
+                      self.newer_query_param):
+            if param:
+                url = remove_query_param(url, param)
+        return replace_query_param(url, query_param, cursor)
+
+    def decode_cursor(self, queryset, encoded):
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            raw_position = data['p']
+            if len(raw_position) != len(self.fields):
+                raise ValueError
+            position = [
+                None if value is None
+                else queryset.model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, raw_position)
+            ]
+        except (binascii.Error, TypeError, ValueError, KeyError,
+                ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(data.get('r'))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        if self.next_position is None:
+            return None
+        return self.get_link(
+            self.cursor_query_param, self.encode_cursor(self.next_position)
+        )
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        if self.previous_position is None:
+            return None
+        return self.get_link(
+            self.cursor_query_param,
+            self.encode_cursor(self.previous_position, reverse=True)
+        )
+
+    def get_newer_link(self):
+        if self.newest_position is None:
+            return None
+        return self.get_link(
+            self.newer_query_param, self.encode_cursor(self.newest_position)
+        )
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        response = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        if self.newer_query_param is not None:
+            response['newer'] = self.get_newer_link()
+        response['results'] = data
+        return Response(response)
+
+
+class TitlePagination(KeysetPagination):
+    """
+    Пагинация произведений в порядке рейтинга и названия. Поиск и фильтр
+    по названию сортируют по релевантности и листаются по offset.
+    """
+    ordering = ('-rating', 'name', 'id')
+    ranking_query_params = ('search', 'name')
+
+
+class DiscussionPagination(KeysetPagination):
+    """Пагинация отзывов и комментариев от новых к старым."""
+    ordering = ('-pub_date', '-id')
+    newer_query_param = 'newer_than'
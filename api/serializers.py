@@ -3,24 +3,27 @@ from django.shortcuts import get_object_or_404
 
 from rest_framework import serializers
 from reviews.models import Category, Comment, Genre, Review, Title, User
-from .mixins import ValidateUsernameMixin
+from .mixins import SerializeTimingMixin, ValidateUsernameMixin
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SerializeTimingMixin,
+                         serializers.ModelSerializer):
 
     class Meta:
         fields = ('name', 'slug')
         model = Category
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SerializeTimingMixin,
+                      serializers.ModelSerializer):
 
     class Meta:
         model = Genre
         fields = ('name', 'slug')
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SerializeTimingMixin,
+                      serializers.ModelSerializer):
     genre = serializers.SlugRelatedField(
         many=True, queryset=Genre.objects.all(), slug_field='slug',
     )
@@ -34,7 +37,55 @@ class TitleSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class TitleInfoSerializer(serializers.ModelSerializer):
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """
+    Слаг ищется среди объектов, заранее загруженных одним запросом на
+    весь пакет: context['preloaded'][модель][слаг].
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        objects = self.context['preloaded'][self.queryset.model]
+        if data not in objects:
+            self.fail('does_not_exist', slug_name=self.slug_field, value=data)
+        return objects[data]
+
+
+class TitleBulkSerializer(TitleSerializer):
+    """Элемент пакетного создания произведений."""
+    genre = PreloadedSlugRelatedField(
+        many=True, queryset=Genre.objects.all(), slug_field='slug',
+    )
+    category = PreloadedSlugRelatedField(
+        queryset=Category.objects.all(), slug_field='slug'
+    )
+
+    @staticmethod
+    def preload(items):
+        """Жанры и категории всех элементов: по запросу на модель."""
+        slugs = {Genre: set(), Category: set()}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            genres = item.get('genre')
+            if isinstance(genres, list):
+                slugs[Genre].update(
+                    slug for slug in genres if isinstance(slug, str)
+                )
+            if isinstance(item.get('category'), str):
+                slugs[Category].add(item['category'])
+        return {
+            model: {
+                obj.slug: obj
+                for obj in model.objects.filter(slug__in=values)
+            } if values else {}
+            for model, values in slugs.items()
+        }
+
+
+class TitleInfoSerializer(SerializeTimingMixin,
+                          serializers.ModelSerializer):
     genre = GenreSerializer(many=True)
     category = CategorySerializer()
     rating = serializers.IntegerField()
@@ -47,7 +98,8 @@ class TitleInfoSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SerializeTimingMixin,
+                       serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True,
     )
@@ -77,7 +129,7 @@ class ReviewSerializer(serializers.ModelSerializer):
             f'до {settings.MAX_SCORE}')
 
 
-class SignupSerializer(ValidateUsernameMixin,
+class SignupSerializer(ValidateUsernameMixin, SerializeTimingMixin,
                        serializers.Serializer):
     username = serializers.CharField(
         max_length=settings.USERNAME_LENGTH,
@@ -101,7 +153,7 @@ class TokenSerializer(ValidateUsernameMixin,
     )
 
 
-class UserSerializer(ValidateUsernameMixin,
+class UserSerializer(ValidateUsernameMixin, SerializeTimingMixin,
                      serializers.ModelSerializer):
 
     class Meta:
@@ -113,7 +165,8 @@ class UserSerializer(ValidateUsernameMixin,
         )
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SerializeTimingMixin,
+                        serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
         slug_field='username', read_only=True
     )
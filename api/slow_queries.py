@@ -0,0 +1,229 @@
+"""
+Журнал медленных запросов к БД.
+
+Обертка выполнения SQL подключается к каждому соединению сигналом
+connection_created, если задан порог SLOW_QUERY_THRESHOLD_MS. Запросы
+дольше порога пишутся строками JSON в ротируемый файл SLOW_QUERY_LOG:
+SQL, параметры со скрытыми секретами, представление, фрагмент стека и
+план запроса. Команда `slow_queries` группирует их по отпечатку SQL.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+
+from .middleware import current_view
+from .profiling import explain
+
+logger = logging.getLogger('api.slow_queries')
+logger.propagate = False
+
+REDACTED = '***'
+STACK_DEPTH = 6
+IDENTIFIER_RE = re.compile(r'"(\w+)"')
+INSERT_RE = re.compile(r'^\s*INSERT\s+INTO\s+"\w+"\s*\(([^)]*)\)', re.I)
+NORMALIZE_RES = (
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'%s|\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)(?:\s*,\s*\(\s*\?'
+                r'(?:\s*,\s*\?)*\s*\))*'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+_state = threading.local()
+
+
+def fingerprint(sql):
+    """SQL без значений и отпечаток, по которому группируются запросы."""
+    normalized = sql.strip()
+    for pattern, replacement in NORMALIZE_RES:
+        normalized = pattern.sub(replacement, normalized)
+    return normalized, hashlib.sha1(normalized.encode()).hexdigest()[:12]
+
+
+def is_secret(column):
+    column = column.lower()
+    return any(name in column for name in settings.SLOW_QUERY_REDACT)
+
+
+def placeholder_columns(sql):
+    """
+    Столбец для каждого `%s`: по списку столбцов INSERT либо ближайший
+    предшествующий идентификатор (`"email" = %s`, `SET "bio" = %s`).
+    """
+    insert = INSERT_RE.match(sql)
+    placeholders = [match.start() for match in re.finditer('%s', sql)]
+    if insert:
+        columns = IDENTIFIER_RE.findall(insert.group(1)) or [None]
+        return [
+            columns[number % len(columns)]
+            for number in range(len(placeholders))
+        ]
+    result = []
+    for position in placeholders:
+        identifiers = IDENTIFIER_RE.findall(sql, 0, position)
+        result.append(identifiers[-1] if identifiers else None)
+    return result
+
+
+def redact(sql, params):
+    if not params:
+        return params
+    if isinstance(params, dict):
+        return {
+            key: REDACTED if is_secret(key) else value
+            for key, value in params.items()
+        }
+    columns = placeholder_columns(sql)
+    return [
+        REDACTED if column and is_secret(column) else value
+        for column, value in zip(columns + [None] * len(params), params)
+    ]
+
+
+def stack_summary():
+    """Последние кадры стека из кода проекта."""
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith('slow_queries.py')
+    ]
+    return [
+        f'{os.path.relpath(frame.filename, base_dir)}:{frame.lineno} '
+        f'in {frame.name}'
+        for frame in frames[-STACK_DEPTH:]
+    ]
+
+
+def get_handler():
+    if not logger.handlers:
+        path = settings.SLOW_QUERY_LOG
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        handler = RotatingFileHandler(
+            path, maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backupCount=settings.SLOW_QUERY_LOG_BACKUPS, encoding='utf-8'
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger.handlers[0]
+
+
+class SlowQueryLogger:
+    """
+    Обертка выполнения SQL, записывающая запросы дольше порога.
+    Записываются только успешно выполненные запросы: после ошибки
+    EXPLAIN выполнялся бы в прерванной транзакции.
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        threshold = settings.SLOW_QUERY_THRESHOLD_MS
+        if threshold is None or getattr(_state, 'active', False):
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration = (time.perf_counter() - started) * 1000
+        if duration >= threshold:
+            _state.active = True
+            try:
+                self.record(sql, params, many, duration)
+            finally:
+                _state.active = False
+        return result
+
+    def record(self, sql, params, many, duration):
+        normalized, key = fingerprint(sql)
+        keyword = sql.lstrip().split(None, 1)[0].lower() if sql else ''
+        plan = []
+        if not many and keyword in ('select', 'update', 'delete', 'with'):
+            plan = explain(self.alias, sql, params)
+        entry = {
+            'time': datetime.now(timezone.utc).isoformat(),
+            'database': self.alias,
+            'duration_ms': round(duration, 3),
+            'fingerprint': key,
+            'normalized': normalized,
+            'sql': sql,
+            'params': None if many else redact(sql, params),
+            'many': many,
+            'view': current_view(),
+            'stack': stack_summary(),
+            'plan': plan,
+        }
+        get_handler()
+        logger.info(json.dumps(entry, ensure_ascii=False, default=str))
+
+
+def install(sender, connection, **kwargs):
+    """Обработчик connection_created: подключает журнал к соединению."""
+    if settings.SLOW_QUERY_THRESHOLD_MS is None:
+        return
+    if not any(
+        isinstance(wrapper, SlowQueryLogger)
+        for wrapper in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.append(SlowQueryLogger(connection.alias))
+
+
+def log_files(path):
+    """Файл журнала и его ротированные копии, от старых к новым."""
+    backups = [
+        f'{path}.{number}'
+        for number in range(settings.SLOW_QUERY_LOG_BACKUPS, 0, -1)
+    ]
+    return [name for name in backups + [str(path)] if os.path.exists(name)]
+
+
+def read_entries(path):
+    for name in log_files(path):
+        with open(name, encoding='utf-8') as log_file:
+            for line in log_file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def is_full_scan(plan):
+    """SCAN без индекса — полный просмотр таблицы."""
+    return any(
+        line.strip().startswith('SCAN ') and ' USING ' not in line
+        for line in plan
+    )
+
+
+def aggregate(entries):
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'normalized': entry['normalized'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': set(),
+            'plan': entry['plan'],
+            'full_scan': False,
+            'stack': entry['stack'],
+        })
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+        if entry['view']:
+            group['views'].add(entry['view'])
+        group['full_scan'] = group['full_scan'] or is_full_scan(entry['plan'])
+    for group in groups.values():
+        group['avg_ms'] = group['total_ms'] / group['count']
+    return list(groups.values())
@@ -0,0 +1,206 @@
+"""
+Ограничение частоты запросов корзинами токенов.
+
+Корзина вмещает N токенов и пополняется со скоростью N за период из
+DEFAULT_THROTTLE_RATES ('20/min'); каждый запрос забирает один токен.
+Корзины хранятся в файле SQLite (THROTTLE_PATH), общем для всех
+процессов сервера, и проверяются через постоянное соединение потока.
+Токены забираются, только если они есть во всех корзинах запроса:
+корзины одного ограничения проверяются в одной транзакции, а токены,
+взятые предыдущими ограничениями, возвращаются при отказе.
+"""
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Mapping
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+PRUNE_EVERY = 10000
+SCHEMA = """CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+) WITHOUT ROWID"""
+TAKE = """INSERT INTO buckets (key, tokens, updated)
+VALUES (:key, :capacity - 1, :now)
+ON CONFLICT (key) DO UPDATE SET
+    tokens = min(:capacity, tokens + (:now - updated) * :rate) - 1,
+    updated = :now
+WHERE min(:capacity, tokens + (:now - updated) * :rate) >= 1"""
+AVAILABLE = """SELECT min(:capacity, tokens + (:now - updated) * :rate)
+FROM buckets WHERE key = :key"""
+REFUND = """UPDATE buckets SET tokens = min(:capacity, tokens + 1)
+WHERE key = :key"""
+# Полные корзины не нужны: через сутки без запросов запись удаляется.
+PRUNE = 'DELETE FROM buckets WHERE updated < :now - 86400'
+
+
+def parse_rate(rate):
+    """'20/min' -> (емкость 20, пополнение токенов в секунду)."""
+    number, period = rate.split('/')
+    capacity = int(number)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+class BucketStore:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.local = threading.local()
+        self.takes = 0
+
+    def connection(self):
+        path = str(settings.THROTTLE_PATH)
+        local = self.local
+        if getattr(local, 'path', None) != path:
+            connection = sqlite3.connect(
+                path, timeout=10, isolation_level=None,
+                check_same_thread=False
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            # Потеря корзин при сбое питания безопасна.
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(SCHEMA)
+            local.connection, local.path = connection, path
+        return local.connection
+
+    def take(self, keys, capacity, rate):
+        """
+        Забирает по токену из каждой корзины, если токены есть во всех.
+        Возвращает 0 или секунды до появления токена в самой пустой.
+        """
+        connection = self.connection()
+        now = time.time()
+        params = [
+            {'key': key, 'capacity': capacity, 'rate': rate, 'now': now}
+            for key in keys
+        ]
+        self.takes += 1
+        if self.takes % PRUNE_EVERY == 0:
+            connection.execute(PRUNE, {'now': now})
+        # Блокировка записи на время проверки: другие процессы не заберут
+        # токены между проверкой и списанием.
+        connection.execute('BEGIN IMMEDIATE')
+        with connection:
+            wait = max(
+                (self.wait(connection, item) for item in params), default=0
+            )
+            if not wait:
+                connection.executemany(TAKE, params)
+        return wait
+
+    def wait(self, connection, params):
+        """Секунды до появления токена в корзине или 0, если он есть."""
+        row = connection.execute(AVAILABLE, params).fetchone()
+        available = row[0] if row else params['capacity']
+        if available >= 1:
+            return 0
+        return max((1 - available) / params['rate'], 0.001)
+
+    def refund(self, charges):
+        """Возвращает токены: charges — пары (ключ, емкость корзины)."""
+        self.connection().executemany(REFUND, [
+            {'key': key, 'capacity': capacity} for key, capacity in charges
+        ])
+
+
+store = BucketStore()
+# Соединение SQLite нельзя использовать в дочернем процессе после fork.
+os.register_at_fork(after_in_child=store.reset)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Корзина на каждый ключ из get_keys(); scope задает частоту. Токены,
+    взятые ограничениями запроса, хранятся в request._throttle_charges;
+    после отказа они возвращаются, и следующие ограничения запроса
+    токены не берут.
+    """
+    scope = None
+
+    def get_keys(self, request, view):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.retry_after = 0
+        if not settings.THROTTLE_ENABLED:
+            return True
+        charges = getattr(request, '_throttle_charges', [])
+        if charges is None:
+            # Запрос уже отклонен другим ограничением.
+            return True
+        capacity, rate = parse_rate(
+            api_settings.DEFAULT_THROTTLE_RATES[self.scope]
+        )
+        keys = [f'{self.scope}:{key}' for key in self.get_keys(request, view)]
+        if not keys:
+            return True
+        self.retry_after = store.take(keys, capacity, rate)
+        if self.retry_after:
+            store.refund(charges)
+            request._throttle_charges = None
+            return False
+        charges.extend((key, capacity) for key in keys)
+        request._throttle_charges = charges
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class AddressThrottle(TokenBucketThrottle):
+    def get_keys(self, request, view):
+        return (self.get_ident(request),)
+
+
+class IdentityThrottle(TokenBucketThrottle):
+    """Корзины по значениям полей запроса, например username и email."""
+    fields = ()
+
+    def get_keys(self, request, view):
+        if not isinstance(request.data, Mapping):
+            # Тело не объект: ответ 400 вернет сериализатор.
+            return ()
+        keys = []
+        for field in self.fields:
+            value = request.data.get(field)
+            if isinstance(value, str) and value.strip():
+                keys.append(f'{field}:{value.strip().lower()}')
+        return keys
+
+
+class SignupAddressThrottle(AddressThrottle):
+    scope = 'signup_address'
+
+
+class SignupIdentityThrottle(IdentityThrottle):
+    scope = 'signup_identity'
+    fields = ('username', 'email')
+
+
+class TokenAddressThrottle(AddressThrottle):
+    scope = 'token_address'
+
+
+class TokenIdentityThrottle(IdentityThrottle):
+    scope = 'token_identity'
+    fields = ('username',)
+
+
+class WriteThrottle(TokenBucketThrottle):
+    """Изменяющие запросы: корзина пользователя или адреса анонима."""
+    scope = 'writes'
+
+    def get_keys(self, request, view):
+        if request.method in SAFE_METHODS:
+            return ()
+        if request.user and request.user.is_authenticated:
+            return (f'user:{request.user.pk}',)
+        return (f'address:{self.get_ident(request)}',)
@@ -0,0 +1,88 @@
+"""
+Кэш пользователей текущего процесса для JWT-аутентификации по базе.
+
+Пользователи хранятся по id не дольше USER_CACHE_TTL секунд, при
+переполнении вытесняются давно не использованные. Сигналы post_save и
+post_delete удаляют запись только в своем процессе, поэтому в других
+процессах изменение становится видно не позже чем через TTL.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from reviews.models import User
+from . import metrics
+
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+
+
+class UserCache:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, user_id):
+        """Копия пользователя из кэша или None."""
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(user_id)
+                self.hits += 1
+                outcome = CACHE_HIT
+            else:
+                if entry is not None:
+                    del self.entries[user_id]
+                entry = None
+                self.misses += 1
+                outcome = CACHE_MISS
+        metrics.USER_CACHE_REQUESTS.inc(outcome=outcome)
+        # Копия: представление может изменить и сохранить пользователя.
+        return copy.copy(entry[1]) if entry is not None else None
+
+    def set(self, user):
+        if settings.USER_CACHE_SIZE < 1:
+            return
+        expires = time.monotonic() + settings.USER_CACHE_TTL
+        with self.lock:
+            self.entries[user.pk] = (expires, copy.copy(user))
+            self.entries.move_to_end(user.pk)
+            while len(self.entries) > settings.USER_CACHE_SIZE:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(user_id, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                'size': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0.0,
+            }
+
+
+user_cache = UserCache()
+
+
+def get_user(user_id):
+    """Пользователь по id: из кэша процесса или из базы."""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = User.objects.get(pk=user_id)
+        user_cache.set(user)
+    return user
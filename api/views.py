@@ -1,40 +1,75 @@
+from functools import partial
+
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
 from django.db import IntegrityError
-from django.db.models import Avg
+from django.http import Http404, HttpResponse, HttpResponseForbidden
 from django.shortcuts import get_object_or_404
+from django.utils.crypto import constant_time_compare
 from django_filters.rest_framework import DjangoFilterBackend
 
 from rest_framework import filters, status, viewsets, mixins
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (
+    action,
+    api_view,
+    permission_classes,
+    throttle_classes
+)
 from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import AccessToken
+from reviews.bulk import insert_titles
 from reviews.models import Category, Genre, Review, Title, User
-from .filters import TitleFilter
+from . import metrics
+from .authentication import ClaimsAccessToken
+from .cache import CachedListMixin, CachedRetrieveMixin
+from .conditional import (
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    collection_validators,
+    title_validators
+)
+from .export import (
+    REVIEW_FIELDS,
+    TITLE_FIELDS,
+    csv_response,
+    review_rows,
+    title_rows
+)
+from .filters import TitleFilter, title_facets
+from .outbox import enqueue
+from .pagination import DiscussionPagination, TitlePagination
 from .permissions import (
     IsAdmin,
     IsAdminOrReadOnly,
     IsAuthorOrAdminOrModerOrReadonly
 )
+from .profiling import load_report
 from .serializers import (
     CategorySerializer,
     CommentSerializer,
     GenreSerializer,
     ReviewSerializer,
     SignupSerializer,
+    TitleBulkSerializer,
     TitleInfoSerializer,
     TitleSerializer,
     TokenSerializer,
     UserSerializer
 )
+from .throttling import (
+    SignupAddressThrottle,
+    SignupIdentityThrottle,
+    TokenAddressThrottle,
+    TokenIdentityThrottle
+)
 
 
 class СategoryGenreViewSet(
+    ConditionalListMixin,
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -47,21 +82,36 @@ class СategoryGenreViewSet(
     search_fields = ('name',)
     lookup_field = 'slug'
 
+    def get_conditional_validators(self):
+        return collection_validators(self.queryset.model)
+
 
 class CategoryViewSet(СategoryGenreViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_models = (Category,)
 
 
 class GenreViewSet(СategoryGenreViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_models = (Genre,)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(rating=Avg('reviews__score'))
+class TitleViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    CachedListMixin,
+    CachedRetrieveMixin,
+    viewsets.ModelViewSet
+):
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre')
+    # Изменение отзывов увеличивает версию коллекции произведений.
+    cache_models = (Title, Genre, Category)
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = LimitOffsetPagination
+    pagination_class = TitlePagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     ordering = ('-rating', 'name')
@@ -71,17 +121,80 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleInfoSerializer
         return TitleSerializer
 
+    def get_conditional_validators(self):
+        if self.action == 'retrieve':
+            return title_validators(self.kwargs['pk'], Genre, Category)
+        return collection_validators(Title, Genre, Category)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.create_many(request.data)
+        return super().create(request, *args, **kwargs)
+
+    def create_many(self, items):
+        """
+        Пакетное создание: ошибки возвращаются по каждому элементу,
+        корректные элементы создаются одной транзакцией.
+        """
+        if not items or len(items) > settings.TITLE_BULK_MAX_ITEMS:
+            raise ValidationError({'detail': (
+                'Передайте от 1 до '
+                f'{settings.TITLE_BULK_MAX_ITEMS} произведений.'
+            )})
+        context = self.get_serializer_context()
+        context['preloaded'] = TitleBulkSerializer.preload(items)
+        valid, errors = [], []
+        for index, item in enumerate(items):
+            serializer = TitleBulkSerializer(data=item, context=context)
+            if serializer.is_valid():
+                valid.append(serializer.validated_data)
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+        titles = insert_titles(valid)
+        created = Title.objects.filter(
+            pk__in=[title.pk for title in titles]
+        ).select_related('category').prefetch_related('genre').order_by('pk')
+        if not errors:
+            response_status = status.HTTP_201_CREATED
+        elif titles:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_400_BAD_REQUEST
+        return Response({
+            'created': TitleSerializer(created, many=True).data,
+            'errors': errors,
+        }, status=response_status)
+
+    @action(detail=False)
+    def facets(self, request):
+        return self.conditional_response(
+            partial(self.cached_response, self.get_facets), request
+        )
+
+    def get_facets(self, request):
+        return Response(
+            title_facets(self.filter_queryset(self.get_queryset())),
+            status=status.HTTP_200_OK
+        )
+
+
+class ReviewViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    viewsets.ModelViewSet
+):
     serializer_class = ReviewSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = DiscussionPagination
     permission_classes = (IsAuthorOrAdminOrModerOrReadonly,)
 
     def get_title(self):
         return get_object_or_404(Title, pk=self.kwargs.get('title_id'))
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author')
+
+    def get_conditional_validators(self):
+        return title_validators(self.kwargs.get('title_id'), User)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, title=self.get_title())
@@ -89,6 +202,7 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([SignupAddressThrottle, SignupIdentityThrottle])
 def signup(request):
     serializer = SignupSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -99,18 +213,17 @@ def signup(request):
             {'detail': 'Имя пользователя или email уже используется!'}
         )
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(
+    enqueue(
         'Код подтверждения',
         f'Ваш новый код подтверждения: {confirmation_code}',
-        settings.DEFAULT_FROM_EMAIL,
         [user.email],
-        fail_silently=False,
     )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([TokenAddressThrottle, TokenIdentityThrottle])
 def get_jwt_token(request):
     serializer = TokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
@@ -124,11 +237,44 @@ def get_jwt_token(request):
     ):
         message = {'confirmation_code': 'Код подтверждения невалиден'}
         return Response(message, status=status.HTTP_400_BAD_REQUEST)
-    message = {'token': str(AccessToken.for_user(user))}
+    message = {'token': str(ClaimsAccessToken.for_user(user))}
+    metrics.JWT_TOKENS.inc(event='issued')
     return Response(message, status=status.HTTP_200_OK)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+def metrics_view(request):
+    """Метрики всех процессов приложения в формате Prometheus."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    token = settings.METRICS_TOKEN
+    if not token:
+        # Без токена метрики открыты только в режиме отладки.
+        if not settings.DEBUG:
+            raise Http404
+    elif not constant_time_compare(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def export_titles(request):
+    return csv_response('titles.csv', TITLE_FIELDS, title_rows())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def export_reviews(request):
+    return csv_response('reviews.csv', REVIEW_FIELDS, review_rows())
+
+
+class UserViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    viewsets.ModelViewSet
+):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
@@ -136,6 +282,9 @@ class UserViewSet(viewsets.ModelViewSet):
     search_fields = ('username',)
     lookup_field = 'username'
 
+    def get_conditional_validators(self):
+        return collection_validators(User)
+
     def update(self, request, *args, **kwargs):
         if request.method == 'PUT':
             return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -163,9 +312,13 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(
+    ConditionalListMixin,
+    ConditionalRetrieveMixin,
+    viewsets.ModelViewSet
+):
     serializer_class = CommentSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = DiscussionPagination
     permission_classes = (IsAuthorOrAdminOrModerOrReadonly,)
 
     def get_review(self):
@@ -176,7 +329,20 @@ class CommentViewSet(viewsets.ModelViewSet):
         )
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
+
+    def get_conditional_validators(self):
+        return title_validators(self.kwargs.get('title_id'), User)
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
+
+
+@api_view(['GET'])
+@permission_classes([IsAdmin])
+def profile_report(request, profile_id):
+    """Отчет профилирования запроса, сохраненный ProfilingMiddleware."""
+    report = load_report(profile_id)
+    if report is None:
+        raise Http404
+    return HttpResponse(report, content_type='text/plain; charset=utf-8')
@@ -0,0 +1,119 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from reviews.models import CollectionVersion
+from . import metrics
+
+STATS_KEY = 'api:stats:{}:{}'
+RESPONSE_KEY = 'api:response:{}:{}'
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+
+
+def get_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def _incr(cache, key):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        if cache.add(key, 1, timeout=None):
+            return 1
+        return cache.incr(key)
+
+
+def get_versions(models):
+    """
+    Версии коллекций моделей из базы. Сигналы увеличивают их атомарно
+    в транзакции изменения, поэтому версии общие для всех процессов и
+    одновременные изменения не теряются.
+    """
+    names = [CollectionVersion.get_name(model) for model in models]
+    versions = dict(CollectionVersion.objects.filter(
+        name__in=names
+    ).values_list('name', 'version'))
+    return tuple(versions.get(name, 0) for name in names)
+
+
+def normalize_query(query_params):
+    """Строка запроса с упорядоченными параметрами и значениями."""
+    return urlencode(sorted(
+        (key, value)
+        for key in query_params
+        for value in query_params.getlist(key)
+    ))
+
+
+def record(name, outcome):
+    _incr(get_cache(), STATS_KEY.format(name, outcome))
+
+
+def get_cache_stats(names):
+    """Счетчики попаданий и промахов кэша ответов по именам эндпоинтов."""
+    keys = {
+        (name, outcome): STATS_KEY.format(name, outcome)
+        for name in names
+        for outcome in (CACHE_HIT, CACHE_MISS)
+    }
+    values = get_cache().get_many(keys.values())
+    stats = {}
+    for (name, outcome), key in keys.items():
+        stats.setdefault(name, {})[outcome] = values.get(key, 0)
+    return stats
+
+
+class CachedResponseMixin:
+    """
+    Кэширует успешные ответы. Ключ состоит из пути, нормализованной
+    строки запроса и версий коллекций моделей из cache_models, которые
+    увеличиваются сигналами при изменении данных.
+    """
+    cache_models = ()
+
+    def get_response_cache_key(self, request):
+        signature = '|'.join((
+            request.get_host(),
+            request.path,
+            normalize_query(request.query_params),
+            ':'.join(map(str, get_versions(self.cache_models))),
+        ))
+        return RESPONSE_KEY.format(
+            self.basename, hashlib.md5(signature.encode()).hexdigest()
+        )
+
+    def record_cache(self, outcome):
+        record(self.basename, outcome)
+        metrics.CACHE_REQUESTS.inc(
+            view=type(self).__name__, action=self.action, outcome=outcome
+        )
+
+    def cached_response(self, method, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_response_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            self.record_cache(CACHE_HIT)
+            return Response(data, headers={'X-Cache': 'HIT'})
+        self.record_cache(CACHE_MISS)
+        response = method(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+        return response
+
+
+class CachedListMixin(CachedResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(CachedResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -0,0 +1,94 @@
+import calendar
+import hashlib
+
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from reviews.models import CollectionVersion, Title
+from .cache import normalize_query
+
+
+def collection_validators(*models):
+    """Метка и дата изменения по версиям коллекций моделей."""
+    names = [CollectionVersion.get_name(model) for model in models]
+    versions = {
+        row.name: row
+        for row in CollectionVersion.objects.filter(name__in=names)
+    }
+    tag = ':'.join(
+        str(versions[name].version) if name in versions else '0'
+        for name in names
+    )
+    dates = [row.updated_at for row in versions.values()]
+    return tag, max(dates) if dates else None
+
+
+def title_validators(title_id, *models):
+    """
+    Метка и дата изменения произведения с его отзывами и комментариями,
+    дополненные версиями коллекций моделей. None, если произведения нет.
+    """
+    title = Title.objects.filter(pk=title_id).values(
+        'version', 'updated_at'
+    ).first()
+    if title is None:
+        return None
+    tag, updated_at = collection_validators(*models)
+    if updated_at is None or title['updated_at'] > updated_at:
+        updated_at = title['updated_at']
+    return f'{title_id}.{title["version"]}:{tag}', updated_at
+
+
+class ConditionalResponseMixin:
+    """
+    Добавляет к успешным ответам ETag и Last-Modified и отвечает 304
+    на условный запрос, не выполняя основной запрос и сериализацию.
+    """
+
+    def get_conditional_validators(self):
+        return None
+
+    def get_etag(self, request, tag):
+        signature = '|'.join((
+            tag,
+            request.get_host(),
+            request.path,
+            normalize_query(request.query_params),
+        ))
+        return hashlib.md5(signature.encode()).hexdigest()
+
+    def conditional_response(self, method, request, *args, **kwargs):
+        validators = self.get_conditional_validators()
+        if validators is None:
+            return method(request, *args, **kwargs)
+        tag, updated_at = validators
+        etag = quote_etag(self.get_etag(request, tag))
+        last_modified = (
+            calendar.timegm(updated_at.utctimetuple()) if updated_at
+            else None
+        )
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = method(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+
+class ConditionalListMixin(ConditionalResponseMixin):
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+
+class ConditionalRetrieveMixin(ConditionalResponseMixin):
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
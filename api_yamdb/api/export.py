@@ -0,0 +1,71 @@
+import csv
+
+from django.http import StreamingHttpResponse
+
+from reviews.bulk import format_value
+from reviews.models import Review, Title
+
+EXPORT_CHUNK_SIZE = 2000
+TITLE_FIELDS = (
+    'id', 'name', 'year', 'category', 'genres', 'rating', 'rating_count'
+)
+REVIEW_FIELDS = ('id', 'title_id', 'author', 'score', 'pub_date', 'text')
+GENRE_SEPARATOR = ';'
+
+
+class Echo:
+    """Буфер csv.writer, который сразу возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def title_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Произведения с рейтингом и жанрами. Выборка идет частями по
+    первичному ключу, жанры каждой части загружаются одним запросом.
+    """
+    last_id = 0
+    through = Title.genre.through.objects
+    while True:
+        chunk = list(Title.objects.filter(pk__gt=last_id).order_by(
+            'pk'
+        ).values_list(
+            'id', 'name', 'year', 'category__slug', 'rating', 'rating_count'
+        )[:chunk_size])
+        if not chunk:
+            return
+        genres = {}
+        for title_id, slug in through.filter(
+            title_id__gte=chunk[0][0], title_id__lte=chunk[-1][0]
+        ).order_by('genre__slug').values_list('title_id', 'genre__slug'):
+            genres.setdefault(title_id, []).append(slug)
+        for pk, name, year, category, rating, count in chunk:
+            yield (
+                pk, name, year, category,
+                GENRE_SEPARATOR.join(genres.get(pk, ())), rating, count
+            )
+        last_id = chunk[-1][0]
+
+
+def review_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    queryset = Review.objects.order_by('pk').values_list(
+        'id', 'title_id', 'author__username', 'score', 'pub_date', 'text'
+    )
+    return queryset.iterator(chunk_size=chunk_size)
+
+
+def csv_response(filename, fields, rows):
+    """Потоковый CSV-ответ: строки формируются по мере отправки."""
+    writer = csv.writer(Echo())
+
+    def lines():
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([format_value(value) for value in row])
+
+    response = StreamingHttpResponse(
+        lines(), content_type='text/csv; charset=utf-8'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -1,28 +1,160 @@
+from django.db.models import (Case, Count, F, IntegerField, Q, Subquery,
+                              Value, When)
 from django_filters import rest_framework as filters
 
-from reviews.models import Title
+from reviews.models import Category, Genre, Title
+from reviews.search import search_titles
+
+# Верхняя граница для поиска по префиксу диапазоном в индексе.
+MAX_CHAR = chr(0x10FFFF)
+GENRE_MODE_ANY = 'any'
+GENRE_MODE_ALL = 'all'
+GENRE_MODES = (
+    (GENRE_MODE_ANY, 'Любой из жанров'),
+    (GENRE_MODE_ALL, 'Все жанры'),
+)
+SLUG_LOOKUP_EXACT = 'exact'
+SLUG_LOOKUP_ICONTAINS = 'icontains'
+SLUG_LOOKUPS = (
+    (SLUG_LOOKUP_EXACT, 'Точное совпадение'),
+    (SLUG_LOOKUP_ICONTAINS, 'Вхождение подстроки (устаревший режим)'),
+)
+
+
+def split_values(value):
+    return list(dict.fromkeys(
+        item.strip() for item in value.split(',') if item.strip()
+    ))
 
 
 class TitleFilter(filters.FilterSet):
     """Фильтр выборки произведений по определенным полям."""
 
-    category = filters.CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
+    category = filters.CharFilter(method='filter_category')
+    genre = filters.CharFilter(method='filter_genre')
+    genre_mode = filters.ChoiceFilter(
+        choices=GENRE_MODES,
+        method='filter_options'
     )
-    name = filters.CharFilter(
-        field_name='name',
-        lookup_expr='contains'
+    slug_lookup = filters.ChoiceFilter(
+        choices=SLUG_LOOKUPS,
+        method='filter_options'
     )
+    name = filters.CharFilter(method='filter_name')
     year = filters.NumberFilter(
         field_name="year",
         lookup_expr='exact'
     )
+    year_min = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='gte'
+    )
+    year_max = filters.NumberFilter(
+        field_name='year',
+        lookup_expr='lte'
+    )
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = (
+            'category', 'genre', 'genre_mode', 'slug_lookup', 'name',
+            'year', 'year_min', 'year_max', 'search'
+        )
+
+    def get_option(self, name, default):
+        return self.form.cleaned_data.get(name) or default
+
+    def filter_options(self, queryset, name, value):
+        """Параметры, влияющие на другие фильтры, выборку не меняют."""
+        return queryset
+
+    def filter_category(self, queryset, name, value):
+        """Категории по точным slug через запятую."""
+        if self.get_option('slug_lookup', None) == SLUG_LOOKUP_ICONTAINS:
+            return queryset.filter(category__slug__icontains=value)
+        category_ids = list(Category.objects.filter(
+            slug__in=split_values(value)
+        ).values_list('id', flat=True))
+        return queryset.filter(category_id__in=category_ids)
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Жанры по точным slug через запятую: произведения с любым из жанров
+        или, при genre_mode=all, со всеми сразу.
+        """
+        if self.get_option('slug_lookup', None) == SLUG_LOOKUP_ICONTAINS:
+            return queryset.filter(genre__slug__icontains=value)
+        slugs = split_values(value)
+        genre_ids = list(Genre.objects.filter(
+            slug__in=slugs
+        ).values_list('id', flat=True))
+        title_genres = Title.genre.through.objects.filter(
+            genre_id__in=genre_ids
+        )
+        if self.get_option('genre_mode', GENRE_MODE_ANY) == GENRE_MODE_ALL:
+            if len(genre_ids) < len(slugs):
+                return queryset.none()
+            title_genres = title_genres.values('title_id').annotate(
+                genres_count=Count('genre_id')
+            ).filter(genres_count=len(genre_ids))
+        return queryset.filter(pk__in=title_genres.values('title_id'))
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
+
+    def filter_name(self, queryset, name, value):
+        """
+        Поиск по нормализованному названию: сначала совпадения по началу
+        названия, затем по подстроке.
+        """
+        value = Title.normalize_name(value)
+        prefix = Q(
+            name_normalized__gte=value,
+            name_normalized__lt=value + MAX_CHAR
+        )
+        # Подзапрос проходит по индексу name_normalized, а не по таблице.
+        matches = Title.objects.filter(
+            prefix | Q(name_normalized__contains=value)
+        ).values('pk')
+        return queryset.filter(pk__in=matches).annotate(
+            name_match=Case(
+                When(prefix, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField()
+            )
+        ).order_by('name_match', 'name', 'pk')
+
+
+def title_facets(queryset):
+    """
+    Количество произведений выборки по жанрам, категориям и десятилетиям
+    выпуска. Выполняет четыре запроса независимо от размера выборки.
+    """
+    titles = Title.objects.filter(
+        pk__in=Subquery(queryset.order_by().values('pk'))
+    )
+    genres = Title.genre.through.objects.filter(
+        title_id__in=Subquery(titles.values('pk'))
+    ).values(
+        slug=F('genre__slug'), name=F('genre__name')
+    ).annotate(count=Count('title_id')).order_by('-count', 'name')
+    categories = titles.filter(category__isnull=False).values(
+        'category__slug', 'category__name'
+    ).annotate(count=Count('pk')).order_by('-count', 'category__name')
+    decades = titles.filter(year__isnull=False).values(
+        decade=F('year') / 10 * 10
+    ).annotate(count=Count('pk')).order_by('decade')
+    return {
+        'count': titles.count(),
+        'genre': list(genres),
+        'category': [
+            {
+                'slug': row['category__slug'],
+                'name': row['category__name'],
+                'count': row['count'],
+            }
+            for row in categories
+        ],
+        'decade': list(decades),
+    }
@@ -0,0 +1,82 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+
+from api.outbox import claim, send_batch
+
+MAX_DATABASE_ERRORS = 5
+
+
+class Command(BaseCommand):
+    """Отправка писем из очереди"""
+
+    help = (
+        'Отправляет письма из очереди OutgoingEmail пачками через '
+        'одно соединение с почтовым сервером на пачку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Количество потоков, отправляющих письма.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Отправить письма, срок которых наступил, и завершиться.'
+        )
+        parser.add_argument(
+            '--backend',
+            help='Почтовый бэкенд вместо EMAIL_BACKEND.'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError(
+                '--batch-size и --workers должны быть больше нуля.'
+            )
+        stop = threading.Event()
+        with ThreadPoolExecutor(options['workers']) as executor:
+            futures = [
+                executor.submit(self.work, stop, options)
+                for _ in range(options['workers'])
+            ]
+            try:
+                sent = sum(future.result() for future in futures)
+            except KeyboardInterrupt:
+                stop.set()
+                sent = sum(future.result() for future in futures)
+        self.stdout.write(f'Отправлено писем: {sent}')
+
+    def work(self, stop, options):
+        """Цикл одного потока: забрать пачку, отправить, повторить."""
+        sent = errors = 0
+        try:
+            while not stop.is_set():
+                try:
+                    emails = claim(options['batch_size'])
+                    sent += send_batch(emails, options['backend'])
+                except DatabaseError as error:
+                    # База занята другим процессом: пачка вернется в
+                    # очередь после аренды, поток повторит попытку.
+                    errors += 1
+                    self.stderr.write(f'Ошибка базы данных: {error}')
+                    if options['once'] and errors >= MAX_DATABASE_ERRORS:
+                        raise CommandError('База данных недоступна.')
+                    stop.wait(options['interval'])
+                    continue
+                errors = 0
+                if emails:
+                    continue
+                if options['once']:
+                    break
+                stop.wait(options['interval'])
+        finally:
+            connection.close()
+        return sent
@@ -0,0 +1,69 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.slow_queries import aggregate, read_entries
+
+SORT_KEYS = ('total', 'count', 'avg', 'max')
+
+
+class Command(BaseCommand):
+    """Сводка журнала медленных запросов"""
+
+    help = (
+        'Группирует медленные запросы из журнала SLOW_QUERY_LOG по '
+        'отпечатку SQL и выводит самые затратные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log', default=settings.SLOW_QUERY_LOG,
+            help='Файл журнала (вместе с ротированными копиями).'
+        )
+        parser.add_argument(
+            '--sort', choices=SORT_KEYS, default='total',
+            help='Порядок: суммарное, количество, среднее или '
+                 'максимальное время.'
+        )
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--full-scans', action='store_true',
+            help='Только запросы с полным просмотром таблицы.'
+        )
+        parser.add_argument(
+            '--plans', action='store_true',
+            help='Выводить план и стек для каждой группы.'
+        )
+
+    def handle(self, *args, **options):
+        groups = aggregate(read_entries(options['log']))
+        if options['full_scans']:
+            groups = [group for group in groups if group['full_scan']]
+        if not groups:
+            self.stdout.write('Медленных запросов не найдено.')
+            return
+        key = options['sort']
+        if key != 'count':
+            key = f'{key}_ms'
+        groups.sort(key=lambda group: group[key], reverse=True)
+        for group in groups[:options['limit']]:
+            self.write_group(group, options['plans'])
+
+    def write_group(self, group, plans):
+        self.stdout.write(
+            f'{group["fingerprint"]}  x{group["count"]}  '
+            f'всего {group["total_ms"]:.1f} мс  '
+            f'среднее {group["avg_ms"]:.1f} мс  '
+            f'макс. {group["max_ms"]:.1f} мс'
+            + ('  ПОЛНЫЙ ПРОСМОТР' if group['full_scan'] else '')
+        )
+        if group['views']:
+            self.stdout.write(
+                '  представления: ' + ', '.join(sorted(group['views']))
+            )
+        self.stdout.write(f'  {group["normalized"]}')
+        if plans:
+            for line in group['plan']:
+                self.stdout.write(f'    план: {line}')
+            for line in group['stack']:
+                self.stdout.write(f'    стек: {line}')
+        self.stdout.write('')
@@ -13,7 +13,7 @@ class IsAuthorOrAdminOrModerOrReadonly(permissions.BasePermission):
             request.method in permissions.SAFE_METHODS
             or request.user.is_admin
             or request.user.is_moderator
-            or request.user == obj.author
+            or request.user.pk == obj.author_id
         )
 
 
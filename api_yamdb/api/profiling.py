@@ -0,0 +1,131 @@
+"""
+Профилирование отдельного запроса по параметру `?_profile=`: профиль
+cProfile или трасса SQL с планами запросов. Отчет сохраняется в кэше и
+доступен администратору по идентификатору.
+"""
+import cProfile
+import io
+import pstats
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connections
+
+PROFILE_PARAM = '_profile'
+PROFILE_KEY = 'api:profile:{}'
+PROFILE_CPROFILE = 'cprofile'
+PROFILE_SQL = 'sql'
+PROFILE_STATS_LIMIT = 50
+EXPLAINED_STATEMENTS = ('select', 'insert', 'update', 'delete', 'with')
+
+
+def get_cache():
+    return caches[settings.PROFILE_CACHE_ALIAS]
+
+
+def save_report(report):
+    profile_id = uuid.uuid4().hex
+    get_cache().set(
+        PROFILE_KEY.format(profile_id), report, settings.PROFILE_TIMEOUT
+    )
+    return profile_id
+
+
+def load_report(profile_id):
+    return get_cache().get(PROFILE_KEY.format(profile_id))
+
+
+class SqlTrace:
+    """Обертка выполнения SQL: запоминает каждый запрос и его время."""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.statements.append(
+                (sql, params, many, time.perf_counter() - started)
+            )
+
+
+def explain(alias, sql, params):
+    """Строки плана запроса с отступами по вложенности."""
+    connection = connections[alias]
+    if connection.vendor != 'sqlite':
+        prefix = 'EXPLAIN '
+    else:
+        prefix = 'EXPLAIN QUERY PLAN '
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    except DatabaseError as error:
+        return [f'план недоступен: {error}']
+    if connection.vendor != 'sqlite':
+        return [' '.join(map(str, row)) for row in rows]
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in rows:
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+
+def format_sql_report(traces):
+    statements = [
+        (trace.alias, *statement)
+        for trace in traces
+        for statement in trace.statements
+    ]
+    total = sum(statement[-1] for statement in statements)
+    lines = [f'Запросов: {len(statements)}, SQL {total * 1000:.2f} мс', '']
+    for number, (alias, sql, params, many, seconds) in enumerate(
+        statements, 1
+    ):
+        lines.append(f'#{number} [{alias}] {seconds * 1000:.2f} мс')
+        lines.append(sql)
+        if params:
+            lines.append(f'параметры: {params!r}')
+        keyword = sql.lstrip().split(None, 1)[0].lower() if sql else ''
+        if not many and keyword in EXPLAINED_STATEMENTS:
+            lines.append('план:')
+            lines.extend(
+                '  ' + line for line in explain(alias, sql, params)
+            )
+        lines.append('')
+    return '\n'.join(lines)
+
+
+def profile_sql(get_response, request):
+    traces = []
+    with ExitStack() as stack:
+        for connection in connections.all():
+            trace = SqlTrace(connection.alias)
+            stack.enter_context(connection.execute_wrapper(trace))
+            traces.append(trace)
+        response = get_response(request)
+    return response, format_sql_report(traces)
+
+
+def profile_cprofile(get_response, request):
+    profiler = cProfile.Profile()
+    response = profiler.runcall(get_response, request)
+    output = io.StringIO()
+    stats = pstats.Stats(profiler, stream=output)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+        PROFILE_STATS_LIMIT
+    )
+    return response, output.getvalue()
+
+
+PROFILERS = {
+    PROFILE_CPROFILE: profile_cprofile,
+    PROFILE_SQL: profile_sql,
+}
@@ -0,0 +1,23 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import User
+from .authentication import REVOKED, store_token_version
+from .user_cache import user_cache
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, **kwargs):
+    """
+    Новая версия токенов записывается в кэш после фиксации транзакции,
+    чтобы другой процесс не успел вернуть в кэш прежнюю версию из базы.
+    """
+    user_id = instance.pk
+    if kwargs['signal'] is post_save and instance.is_active:
+        version = instance.token_version
+    else:
+        version = REVOKED
+    transaction.on_commit(lambda: store_token_version(user_id, version))
+    user_cache.invalidate(user_id)
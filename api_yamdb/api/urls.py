@@ -9,7 +9,10 @@ from .views import (
     TitleViewSet,
     UserViewSet,
     signup,
-    get_jwt_token
+    get_jwt_token,
+    export_reviews,
+    export_titles,
+    profile_report
 )
 
 routers_v1 = DefaultRouter()
@@ -31,7 +34,18 @@ auth_urls = [
     path('token/', get_jwt_token, name='token'),
 ]
 
+export_urls = [
+    path('titles/', export_titles, name='export-titles'),
+    path('reviews/', export_reviews, name='export-reviews'),
+]
+
+profile_urls = [
+    path('<str:profile_id>/', profile_report, name='profile-report'),
+]
+
 urlpatterns = [
     path('v1/', include(routers_v1.urls)),
     path('v1/auth/', include(auth_urls)),
+    path('v1/export/', include(export_urls)),
+    path('v1/profiles/', include(profile_urls)),
 ]
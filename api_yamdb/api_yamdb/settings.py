@@ -28,20 +28,58 @@ INSTALLED_APPS = [
     'reviews',
 ]
 
+# Наибольшее число произведений в одном POST /api/v1/titles/.
+TITLE_BULK_MAX_ITEMS = 1000
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.YamdbJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    'DEFAULT_THROTTLE_CLASSES': [
+        'api.throttling.WriteThrottle',
+    ],
+    # Емкость корзины токенов / период ее полного пополнения.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_address': '30/min',
+        'signup_identity': '5/min',
+        'token_address': '30/min',
+        'token_identity': '10/min',
+        'writes': '300/min',
+    },
+    # Число доверенных прокси перед сервером. При 0 адрес клиента
+    # берется из REMOTE_ADDR, а подделанный X-Forwarded-For не дает
+    # обойти ограничения по адресу. За прокси укажите их число.
+    'NUM_PROXIES': 0,
 }
 
+# Корзины ограничения частоты запросов, общие для всех процессов.
+THROTTLE_ENABLED = True
+THROTTLE_PATH = BASE_DIR / 'throttle.sqlite3'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=10),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Версии токенов пользователей хранятся в общем для всех процессов кэше
+# на TOKEN_VERSION_TIMEOUT секунд. Смена роли записывает в него новую
+# версию, поэтому старые токены отклоняются всеми процессами сразу.
+TOKEN_VERSION_CACHE_ALIAS = 'default'
+TOKEN_VERSION_TIMEOUT = 60
+
+# Кэш пользователей в памяти процесса для токенов без утверждений:
+# не больше USER_CACHE_SIZE записей, каждая не дольше USER_CACHE_TTL
+# секунд (изменения из других процессов видны через TTL).
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 30
+
 MIDDLEWARE = [
+    'api.middleware.ViewContextMiddleware',
+    'api.middleware.RequestTimingMiddleware',
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,6 +121,81 @@ DATABASES = {
 }
 
 
+# Cache
+
+# Кэш в файлах общий для всех процессов сервера на одной машине.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+    },
+    # Отдельный каталог, чтобы отчеты не вытеснялись ответами API.
+    'profiles': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'profiles',
+    },
+}
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+
+# Замер числа запросов к БД и времени обработки запросов: заголовки
+# Server-Timing (db, serialize, render, total), X-DB-Queries и строка в
+# логе api.timing.
+REQUEST_TIMING = False
+
+# Отчеты профилирования запросов (?_profile=cprofile|sql) хранятся в
+# файлах, поэтому отчет доступен, какой бы процесс ни обработал запрос.
+PROFILE_CACHE_ALIAS = 'profiles'
+PROFILE_TIMEOUT = 60 * 60
+
+# Очередь писем: signup только сохраняет письмо, отправляет команда
+# send_emails. С EMAIL_OUTBOX_EAGER письмо отправляется сразу.
+EMAIL_OUTBOX_EAGER = False
+EMAIL_OUTBOX_LEASE = 5 * 60
+EMAIL_OUTBOX_BACKOFF = 30
+EMAIL_OUTBOX_BACKOFF_MAX = 60 * 60
+EMAIL_OUTBOX_MAX_ATTEMPTS = 8
+
+# Журнал запросов к БД дольше порога (мс); None — выключен. Сводка:
+# `python manage.py slow_queries`.
+SLOW_QUERY_THRESHOLD_MS = None
+SLOW_QUERY_LOG = BASE_DIR / 'slow_queries.log'
+SLOW_QUERY_LOG_MAX_BYTES = 10 * 1024 * 1024
+SLOW_QUERY_LOG_BACKUPS = 5
+# Параметры столбцов, содержащих эти подстроки, в журнал не пишутся.
+SLOW_QUERY_REDACT = (
+    'password', 'email', 'token', 'secret', 'confirmation_code',
+    'recipient', 'body'
+)
+
+# Метрики Prometheus (/metrics). Процессы сбрасывают накопленные значения
+# в общий файл SQLite не реже, чем раз в METRICS_FLUSH_INTERVAL секунд.
+METRICS_ENABLED = True
+METRICS_PATH = BASE_DIR / 'metrics.sqlite3'
+METRICS_FLUSH_INTERVAL = 5
+# Если задан, /metrics требует заголовок `Authorization: Bearer <токен>`.
+# Без токена эндпоинт доступен только при DEBUG = True.
+METRICS_TOKEN = None
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.timing': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
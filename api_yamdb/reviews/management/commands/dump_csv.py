@@ -0,0 +1,75 @@
+import csv
+import gzip
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.bulk import DEFAULT_BATCH_SIZE, TABLES, dump_rows
+
+
+class Command(BaseCommand):
+    """Выгрузка данных из БД"""
+
+    help = (
+        'Выгружает таблицы в CSV-файлы в формате static/data, который '
+        'читает команда load_csv.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('target', help='Каталог для файлов выгрузки.')
+        parser.add_argument(
+            '--table', choices=[table.name for table in TABLES],
+            help='Выгрузить только одну таблицу.'
+        )
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Сжимать файлы (.csv.gz).'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество строк, читаемых из базы за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        target = options['target']
+        os.makedirs(target, exist_ok=True)
+        suffix = '.csv.gz' if options['gzip'] else '.csv'
+        for table in TABLES:
+            if options['table'] not in (None, table.name):
+                continue
+            path = os.path.join(target, table.name + suffix)
+            started = time.monotonic()
+            try:
+                rows = self.dump(table, path, options)
+            except OSError as error:
+                raise CommandError(f'Не удалось записать {path}: {error}')
+            self.stdout.write(
+                f'{table.name}: строк {rows}, '
+                f'{time.monotonic() - started:.2f} с'
+            )
+
+    def dump(self, table, path, options):
+        """
+        Пишет таблицу во временный файл и заменяет им прежний, чтобы
+        прерванная выгрузка не оставляла неполных файлов.
+        """
+        temporary = path + '.tmp'
+        opener = gzip.open if options['gzip'] else open
+        rows = 0
+        try:
+            with opener(temporary, 'wt', encoding='utf-8',
+                        newline='') as csv_file:
+                writer = csv.writer(csv_file)
+                writer.writerow(table.dump_fields)
+                for row in dump_rows(table, options['chunk_size']):
+                    writer.writerow(row)
+                    rows += 1
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        os.replace(temporary, path)
+        return rows
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.ratings import iter_rating_mismatches, rebuild_ratings
+
+
+class Command(BaseCommand):
+    """Пересборка и сверка рейтингов произведений"""
+
+    help = 'Пересобирает сохраненные рейтинги произведений по отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Количество произведений, обрабатываемых за один проход.'
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только сверить рейтинги, ничего не изменяя.'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size < 1:
+            raise CommandError('--chunk-size должен быть больше нуля.')
+        if not options['check']:
+            fixed = rebuild_ratings(chunk_size)
+            self.stdout.write(f'Исправлено рейтингов: {fixed}')
+            return
+        mismatches = 0
+        for title in iter_rating_mismatches(chunk_size):
+            mismatches += 1
+            self.stdout.write(
+                f'Произведение {title.pk}: ожидается '
+                f'сумма {title.rating_sum}, '
+                f'количество {title.rating_count}'
+            )
+        if mismatches:
+            raise CommandError(f'Расхождений в рейтингах: {mismatches}')
+        self.stdout.write('Рейтинги совпадают с отзывами.')
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from reviews import search
+
+
+class Command(BaseCommand):
+    """Пересборка полнотекстового индекса произведений"""
+
+    help = 'Пересобирает полнотекстовый индекс произведений (SQLite FTS5).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help='База данных, в которой пересобирается индекс.'
+        )
+
+    def handle(self, *args, **options):
+        if not search.rebuild(connections[options['database']]):
+            raise CommandError(
+                'Полнотекстовый индекс поддерживается только для SQLite.'
+            )
+        self.stdout.write('Полнотекстовый индекс пересобран.')
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from reviews import search
+
+
+def create_search_index(apps, schema_editor):
+    search.install(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    if not search.is_supported(schema_editor.connection):
+        return
+    for suffix in ('ai', 'ad', 'au'):
+        schema_editor.execute(
+            f'DROP TRIGGER IF EXISTS {search.FTS_TABLE}_{suffix}'
+        )
+    schema_editor.execute(f'DROP TABLE IF EXISTS {search.FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_change_versions'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2 on 2026-10-18 14:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_title_year_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoadedFile',
+            fields=[
+                ('table', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Таблица')),
+                ('source', models.CharField(max_length=500, verbose_name='Источник')),
+                ('checksum', models.CharField(max_length=64, verbose_name='Контрольная сумма')),
+                ('loaded_at', models.DateTimeField(auto_now=True, verbose_name='Дата загрузки')),
+            ],
+            options={
+                'verbose_name': 'Загруженный файл',
+                'verbose_name_plural': 'Загруженные файлы',
+            },
+        ),
+    ]
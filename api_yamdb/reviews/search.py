@@ -0,0 +1,114 @@
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reviews_title_fts'
+TITLE_TABLE = 'reviews_title'
+TOKEN_PATTERN = re.compile(r'\w+')
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+INSTALL_SQL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='{TITLE_TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai
+    AFTER INSERT ON {TITLE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad
+    AFTER DELETE ON {TITLE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au
+    AFTER UPDATE OF name, description ON {TITLE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END""",
+)
+REBUILD_SQL = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+MATCH_SQL = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+RANK_SQL = (
+    f'SELECT bm25({FTS_TABLE}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}) '
+    f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+    f'AND rowid = {TITLE_TABLE}.id'
+)
+
+
+def normalize_text(value):
+    """Приводит строку к виду для поиска без учета регистра и «ё»."""
+    return unicodedata.normalize('NFKC', value).casefold().replace('ё', 'е')
+
+
+def is_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install(using=connection):
+    """
+    Создает полнотекстовый индекс произведений и триггеры, которые
+    поддерживают его в актуальном состоянии. Пересоздание таблицы
+    произведений в миграциях удаляет триггеры, поэтому установка
+    повторяется после каждой миграции.
+    """
+    if not is_supported(using):
+        return False
+    with using.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM sqlite_master WHERE type = %s AND name = %s',
+            ('table', FTS_TABLE)
+        )
+        created = cursor.fetchone() is None
+        for statement in INSTALL_SQL:
+            cursor.execute(statement)
+        if created:
+            cursor.execute(REBUILD_SQL)
+    return True
+
+
+def rebuild(using=connection):
+    """Полностью перестраивает полнотекстовый индекс произведений."""
+    if not install(using):
+        return False
+    with using.cursor() as cursor:
+        cursor.execute(REBUILD_SQL)
+    return True
+
+
+def build_match_query(text):
+    """
+    Запрос FTS5 из пользовательской строки: слова экранируются, ищутся
+    по префиксу и должны встречаться все.
+    """
+    return ' '.join(
+        '"{}"*'.format(token.replace('"', '""'))
+        for token in TOKEN_PATTERN.findall(text)
+    )
+
+
+def search_titles(queryset, text):
+    """
+    Отбирает произведения, подходящие под запрос, и упорядочивает их по
+    релевантности (bm25, совпадение в названии весомее описания).
+    """
+    match = build_match_query(text)
+    if not match:
+        return queryset
+    if not is_supported(connection):
+        return queryset.filter(
+            Q(name__icontains=text) | Q(description__icontains=text)
+        )
+    return queryset.filter(
+        pk__in=RawSQL(MATCH_SQL, (match,))
+    ).annotate(
+        search_rank=RawSQL(RANK_SQL, (match,))
+    ).order_by('search_rank', 'pk')
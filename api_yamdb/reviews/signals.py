@@ -0,0 +1,119 @@
+import threading
+
+from django.db import connections
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import Signal, receiver
+
+from . import search
+from .models import (Category, CollectionVersion, Comment, Genre, Review,
+                     Title, User)
+from .ratings import review_deleted, review_saved
+
+# Отправляется после массовой загрузки данных модели в обход save().
+bulk_loaded = Signal()
+
+_deleting_titles = threading.local()
+_clearing_genres = threading.local()
+
+
+def _titles_being_deleted():
+    if not hasattr(_deleting_titles, 'ids'):
+        _deleting_titles.ids = set()
+    return _deleting_titles.ids
+
+
+def _cleared_titles():
+    """id произведений жанров, связи которых удаляются clear()."""
+    if not hasattr(_clearing_genres, 'titles'):
+        _clearing_genres.titles = {}
+    return _clearing_genres.titles
+
+
+def install_title_search(sender, using, **kwargs):
+    search.install(connections[using])
+
+
+@receiver(pre_delete, sender=Title)
+def title_pre_delete(sender, instance, **kwargs):
+    _titles_being_deleted().add(instance.pk)
+
+
+@receiver(post_delete, sender=Title)
+def title_post_delete(sender, instance, **kwargs):
+    _titles_being_deleted().discard(instance.pk)
+    CollectionVersion.bump(Title)
+
+
+@receiver(post_save, sender=Title)
+def title_post_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.touch(pk=instance.pk)
+        CollectionVersion.bump(Title)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genre_changed(sender, instance, action, reverse, pk_set,
+                        **kwargs):
+    """
+    Отмечает изменение произведений, у которых поменялись жанры. При
+    изменении со стороны жанра (genre.titles) затронутые произведения
+    берутся из pk_set, а для clear запоминаются до удаления связей.
+    """
+    if not reverse:
+        if action.startswith('post_'):
+            Title.touch(pk=instance.pk)
+            CollectionVersion.bump(Title)
+        return
+    if action == 'pre_clear':
+        _cleared_titles()[instance.pk] = list(
+            instance.titles.values_list('pk', flat=True)
+        )
+        return
+    if action == 'post_clear':
+        pk_set = _cleared_titles().pop(instance.pk, ())
+    elif not action.startswith('post_'):
+        return
+    if pk_set:
+        Title.touch(pk__in=pk_set)
+    CollectionVersion.bump(Title)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def collection_changed(sender, raw=False, **kwargs):
+    if not raw:
+        CollectionVersion.bump(sender)
+
+
+@receiver(bulk_loaded)
+def model_bulk_loaded(sender, **kwargs):
+    CollectionVersion.bump(sender)
+
+
+@receiver(post_save, sender=Review)
+def review_post_save(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        review_saved(instance, created)
+        Title.touch(pk=instance.title_id)
+        CollectionVersion.bump(Title)
+
+
+@receiver(post_delete, sender=Review)
+def review_post_delete(sender, instance, **kwargs):
+    # Агрегаты удаляемого вместе с отзывами произведения не обновляем.
+    if instance.title_id not in _titles_being_deleted():
+        review_deleted(instance)
+        Title.touch(pk=instance.title_id)
+        CollectionVersion.bump(Title)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def comment_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        Title.touch(reviews=instance.review_id)
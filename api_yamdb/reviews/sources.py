@@ -0,0 +1,211 @@
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import tarfile
+import zipfile
+from contextlib import contextmanager
+from functools import partial
+
+FORMATS = ('.csv', '.csv.gz', '.jsonl', '.jsonl.gz')
+STREAM_FORMATS = ('csv', 'csv.gz', 'jsonl', 'jsonl.gz')
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz')
+CHECKSUM_CHUNK_SIZE = 1 << 20
+
+
+class SourceError(Exception):
+    """Источник данных не найден или имеет неверный формат."""
+
+
+class RowError(ValueError):
+    """Строка источника, которую не удалось разобрать."""
+
+
+def split_format(filename):
+    """Имя таблицы и формат файла: `review.csv.gz` -> (`review`, `.csv.gz`)."""
+    for suffix in sorted(FORMATS, key=len, reverse=True):
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)], suffix
+    return None, None
+
+
+def read_csv(text_file, fields):
+    """Построчно читает CSV и проверяет заголовок и число полей."""
+    reader = csv.DictReader(text_file)
+    missing = set(fields) - set(reader.fieldnames or ())
+    if missing:
+        raise SourceError(
+            'В заголовке нет полей: ' + ', '.join(sorted(missing))
+        )
+    for row in reader:
+        if None in row or None in row.values():
+            yield reader.line_num, RowError('Неверное число полей')
+        else:
+            yield reader.line_num, row
+
+
+def read_jsonl(text_file, fields):
+    """
+    Построчно читает JSON Lines. Значения приводятся к строкам, как
+    в CSV, чтобы строки обоих форматов разбирались одинаково.
+    """
+    for line, text in enumerate(text_file, start=1):
+        if not text.strip():
+            continue
+        try:
+            data = json.loads(text)
+        except ValueError as error:
+            yield line, RowError(f'Некорректный JSON: {error}')
+            continue
+        if not isinstance(data, dict):
+            yield line, RowError('Строка должна быть JSON-объектом')
+            continue
+        yield line, {
+            key: '' if value is None else str(value)
+            for key, value in data.items()
+        }
+
+
+class SourceFile:
+    """
+    Файл таблицы в источнике. Файл открывается заново при каждом чтении
+    и разбирается потоково, не загружаясь в память целиком.
+    """
+
+    def __init__(self, name, suffix, opener, seekable=True):
+        self.name = name
+        self.suffix = suffix
+        self.opener = opener
+        self.seekable = seekable
+
+    def __str__(self):
+        return self.name
+
+    def checksum(self):
+        """SHA-256 содержимого файла или None, если его нельзя перечитать."""
+        if not self.seekable:
+            return None
+        digest = hashlib.sha256()
+        with self.opener() as binary:
+            for chunk in iter(partial(binary.read, CHECKSUM_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @contextmanager
+    def rows(self, fields):
+        """Пары (номер строки, словарь значений или RowError)."""
+        with self.opener() as raw:
+            binary = raw
+            if self.suffix.endswith('.gz'):
+                binary = gzip.GzipFile(fileobj=raw, mode='rb')
+            text_file = io.TextIOWrapper(binary, encoding='utf-8', newline='')
+            try:
+                if self.suffix.startswith('.jsonl'):
+                    yield read_jsonl(text_file, fields)
+                else:
+                    yield read_csv(text_file, fields)
+            finally:
+                # Исходный поток закрывает его владелец (например, stdin).
+                text_file.detach()
+                if binary is not raw:
+                    binary.close()
+
+
+class DirectorySource:
+    """Каталог с файлами таблиц."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def find(self, table):
+        for suffix in FORMATS:
+            path = os.path.join(self.path, table + suffix)
+            if os.path.isfile(path):
+                return SourceFile(path, suffix, partial(open, path, 'rb'))
+        return None
+
+    def close(self):
+        pass
+
+
+class ArchiveSource:
+    """
+    Архив zip или tar с файлами таблиц; вложенные каталоги внутри
+    архива не учитываются.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.members = {}
+        if zipfile.is_zipfile(path):
+            self.archive = zipfile.ZipFile(path)
+            members = self.archive.infolist()
+            names = [(member, member.filename) for member in members]
+            self.extract = self.archive.open
+        else:
+            try:
+                self.archive = tarfile.open(path)
+            except tarfile.TarError as error:
+                raise SourceError(f'Не удалось открыть архив {path}: {error}')
+            names = [
+                (member, member.name) for member in self.archive.getmembers()
+                if member.isfile()
+            ]
+            self.extract = self.archive.extractfile
+        for member, name in names:
+            table, suffix = split_format(os.path.basename(name))
+            if table is not None:
+                self.members.setdefault(table, (member, name, suffix))
+
+    def find(self, table):
+        if table not in self.members:
+            return None
+        member, name, suffix = self.members[table]
+        return SourceFile(
+            f'{self.path}:{name}', suffix, partial(self.extract, member)
+        )
+
+    def close(self):
+        self.archive.close()
+
+
+class StreamSource:
+    """Поток (обычно stdin) с данными одной таблицы."""
+
+    def __init__(self, stream, table, stream_format):
+        self.stream = stream
+        self.table = table
+        self.suffix = '.' + stream_format
+
+    @contextmanager
+    def open_stream(self):
+        yield self.stream
+
+    def find(self, table):
+        if table != self.table:
+            return None
+        return SourceFile('<stdin>', self.suffix, self.open_stream,
+                          seekable=False)
+
+    def close(self):
+        pass
+
+
+def open_source(path, table=None, stream=None, stream_format='csv'):
+    """
+    Источник данных по пути: каталог, архив (zip, tar, tar.gz) или `-`
+    для чтения одной таблицы из потока.
+    """
+    if path == '-':
+        if table is None:
+            raise SourceError('Для чтения из stdin укажите --table.')
+        return StreamSource(stream, table, stream_format)
+    if os.path.isdir(path):
+        return DirectorySource(path)
+    if os.path.isfile(path) and (
+        zipfile.is_zipfile(path) or path.endswith(TAR_SUFFIXES)
+    ):
+        return ArchiveSource(path)
+    raise SourceError(f'Источник {path} не найден или не поддерживается.')
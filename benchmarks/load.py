@@ -0,0 +1,347 @@
+"""
+Нагрузочный тест API смешанной нагрузкой из нескольких потоков или
+процессов.
+
+По умолчанию запускает WSGI-приложение api_yamdb/wsgi.py на локальном
+порту поверх временной базы SQLite, заполненной generate_data. С
+--server asgi запускается api_yamdb/asgi.py (нужен uvicorn), с --url
+нагрузка подается на уже запущенный сервер, который использует базу
+из настроек проекта.
+
+    python -m benchmarks.load --workers 8 --duration 30
+    python -m benchmarks.load --mix browse=80,reviews=10,review=5,comment=5
+"""
+import argparse
+import io
+import json
+import os
+import random
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import requests
+
+from benchmarks.run import (PERCENTILES, discard_metrics, percentile,
+                            setup_django)
+
+HOST = '127.0.0.1'
+DEFAULT_MIX = 'browse=80,reviews=10,review=5,comment=5'
+DEFAULT_SIZE = 1000
+POOL_USERNAME = 'load_user_{}'
+SAMPLE_SIZE = 1000
+REQUEST_TIMEOUT = 30
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def serve_wsgi(port):
+    from api_yamdb.wsgi import application
+
+    server = make_server(
+        HOST, port, application, server_class=ThreadingWSGIServer,
+        handler_class=QuietHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.shutdown
+
+
+def serve_asgi(port):
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit('Для --server asgi установите uvicorn.')
+    from api_yamdb.asgi import application
+
+    server = uvicorn.Server(uvicorn.Config(
+        application, host=HOST, port=port, log_level='warning'
+    ))
+    server.install_signal_handlers = lambda: None
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+    return stop
+
+
+def prepare_database(options):
+    """
+    Временная база для локального сервера. Настройки меняются до
+    первого подключения к базе.
+    """
+    from django.conf import settings
+    from django.core.management import call_command
+
+    directory = tempfile.mkdtemp(prefix='yamdb_load_')
+    settings.DATABASES['default']['NAME'] = os.path.join(
+        directory, 'load.sqlite3'
+    )
+    settings.METRICS_PATH = os.path.join(directory, 'metrics.sqlite3')
+    settings.DEBUG = False
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    call_command('migrate', verbosity=0)
+    call_command(
+        'generate_data', seed=options.seed, titles=options.size,
+        users=max(options.size * 2, 50), reviews=options.size * 20,
+        stdout=io.StringIO()
+    )
+    return directory
+
+
+def build_plan(options, url):
+    """
+    Все, что нужно рабочим: токены пользователей из пула, id
+    произведений и отзывов. Рабочие обращаются только к HTTP API.
+    """
+    from api.authentication import ClaimsAccessToken
+    from reviews.models import Review, Title, User
+
+    tokens = []
+    for number in range(options.users):
+        username = POOL_USERNAME.format(number)
+        user, _ = User.objects.get_or_create(
+            username=username, defaults={'email': f'{username}@yamdb.fake'}
+        )
+        tokens.append(str(ClaimsAccessToken.for_user(user)))
+    rng = random.Random(options.seed)
+    title_ids = list(Title.objects.values_list('pk', flat=True))
+    reviews = list(Review.objects.values_list('title_id', 'pk'))
+    return {
+        'url': url.rstrip('/') + '/api/v1',
+        'tokens': tokens,
+        'titles': rng.sample(title_ids, min(len(title_ids), SAMPLE_SIZE)),
+        'reviews': rng.sample(reviews, min(len(reviews), SAMPLE_SIZE)),
+        'mix': parse_mix(options.mix),
+        'duration': options.duration,
+        'seed': options.seed,
+    }
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ACTIONS:
+            raise SystemExit(
+                f'Неизвестное действие {name!r}, доступны: '
+                + ', '.join(ACTIONS)
+            )
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def browse(session, plan, rng, state):
+    if rng.random() < 0.5:
+        offset = rng.randrange(0, max(len(plan['titles']) - 10, 1))
+        return 'GET /titles/', session.get(
+            f'{plan["url"]}/titles/', params={'offset': offset, 'limit': 10}
+        )
+    title_id = rng.choice(plan['titles'])
+    return 'GET /titles/{id}/', session.get(
+        f'{plan["url"]}/titles/{title_id}/'
+    )
+
+
+def read_reviews(session, plan, rng, state):
+    title_id = rng.choice(plan['titles'])
+    return 'GET /titles/{id}/reviews/', session.get(
+        f'{plan["url"]}/titles/{title_id}/reviews/'
+    )
+
+
+def post_review(session, plan, rng, state):
+    """Отзыв от пользователя пула на произведение, которое он не оценивал."""
+    token, reviewed = rng.choice(state['users'])
+    title_id = rng.choice(plan['titles'])
+    while title_id in reviewed and len(reviewed) < len(plan['titles']):
+        title_id = rng.choice(plan['titles'])
+    reviewed.add(title_id)
+    return 'POST /titles/{id}/reviews/', session.post(
+        f'{plan["url"]}/titles/{title_id}/reviews/',
+        json={'text': 'Нагрузочный отзыв', 'score': rng.randint(1, 10)},
+        headers={'Authorization': f'Bearer {token}'}
+    )
+
+
+def post_comment(session, plan, rng, state):
+    token, _ = rng.choice(state['users'])
+    title_id, review_id = rng.choice(plan['reviews'])
+    return 'POST /titles/{id}/reviews/{id}/comments/', session.post(
+        f'{plan["url"]}/titles/{title_id}/reviews/{review_id}/comments/',
+        json={'text': 'Нагрузочный комментарий'},
+        headers={'Authorization': f'Bearer {token}'}
+    )
+
+
+ACTIONS = {
+    'browse': browse,
+    'reviews': read_reviews,
+    'review': post_review,
+    'comment': post_comment,
+}
+
+
+def run_worker(plan, number, workers):
+    """
+    Цикл одного рабочего. Пользователи пула делятся между рабочими, чтобы
+    отзывы разных рабочих не нарушали уникальность автора и произведения.
+    """
+    rng = random.Random(f'{plan["seed"]}:{number}')
+    state = {'users': [
+        (token, set()) for token in plan['tokens'][number::workers]
+    ] or [(plan['tokens'][0], set())]}
+    names = list(plan['mix'])
+    weights = [plan['mix'][name] for name in names]
+    samples = []
+    deadline = time.monotonic() + plan['duration']
+    with requests.Session() as session:
+        session.request = timeout_request(session.request)
+        while time.monotonic() < deadline:
+            action = ACTIONS[rng.choices(names, weights)[0]]
+            started = time.perf_counter()
+            try:
+                endpoint, response = action(session, plan, rng, state)
+                status = response.status_code
+            except requests.RequestException:
+                endpoint, status = action.__name__, 0
+            samples.append((endpoint, status, time.perf_counter() - started))
+    return samples
+
+
+def timeout_request(request):
+    def wrapper(*args, **kwargs):
+        kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+        return request(*args, **kwargs)
+    return wrapper
+
+
+def summarize(samples, seconds):
+    endpoints = {}
+    for endpoint, status, elapsed in samples:
+        endpoints.setdefault(endpoint, []).append((status, elapsed))
+    report = {
+        'requests': len(samples),
+        'seconds': round(seconds, 3),
+        'throughput': round(len(samples) / seconds, 2) if seconds else 0,
+        'endpoints': {},
+    }
+    for endpoint, results in sorted(endpoints.items()):
+        timings = [elapsed * 1000 for _, elapsed in results]
+        errors = sum(1 for status, _ in results if not 200 <= status < 300)
+        stats = {
+            'requests': len(results),
+            'throughput': round(len(results) / seconds, 2) if seconds else 0,
+            'error_rate': round(errors / len(results), 4),
+        }
+        stats.update({
+            f'p{rank}_ms': round(percentile(timings, rank), 2)
+            for rank in PERCENTILES
+        })
+        report['endpoints'][endpoint] = stats
+    return report
+
+
+def print_report(report):
+    print(
+        f'Запросов: {report["requests"]} за {report["seconds"]:.1f} с, '
+        f'{report["throughput"]:.1f} запросов/с'
+    )
+    for endpoint, stats in report['endpoints'].items():
+        print(
+            f'  {endpoint:<42} {stats["requests"]:>6} '
+            f'{stats["throughput"]:>8.1f}/с  '
+            f'p50 {stats["p50_ms"]:>8.1f}  p95 {stats["p95_ms"]:>8.1f}  '
+            f'p99 {stats["p99_ms"]:>8.1f} мс  '
+            f'ошибок {stats["error_rate"]:.1%}'
+        )
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument(
+        '--processes', action='store_true',
+        help='Рабочие — процессы, а не потоки.'
+    )
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument(
+        '--users', type=int, default=50,
+        help='Размер пула пользователей с JWT.'
+    )
+    parser.add_argument(
+        '--server', choices=('wsgi', 'asgi'), default='wsgi',
+        help='Какое приложение запустить локально.'
+    )
+    parser.add_argument('--url', help='Адрес уже запущенного сервера.')
+    parser.add_argument(
+        '--size', type=int, default=DEFAULT_SIZE,
+        help='Число произведений во временной базе.'
+    )
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Файл для сохранения отчета.')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    setup_django()
+    stop = directory = None
+    url = options.url
+    if url is None:
+        directory = prepare_database(options)
+        port = free_port()
+        serve = serve_asgi if options.server == 'asgi' else serve_wsgi
+        stop = serve(port)
+        url = f'http://{HOST}:{port}'
+    plan = build_plan(options, url)
+    executor_class = (
+        ProcessPoolExecutor if options.processes else ThreadPoolExecutor
+    )
+    started = time.monotonic()
+    try:
+        with executor_class(options.workers) as executor:
+            futures = [
+                executor.submit(run_worker, plan, number, options.workers)
+                for number in range(options.workers)
+            ]
+            samples = [
+                sample for future in futures for sample in future.result()
+            ]
+    finally:
+        if stop is not None:
+            stop()
+        if directory is not None:
+            discard_metrics()
+            shutil.rmtree(directory, ignore_errors=True)
+    report = summarize(samples, time.monotonic() - started)
+    print_report(report)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Замеры эндпоинтов API на базах разного размера.
+
+Для каждого размера создается отдельная база SQLite, заполняется
+командой generate_data, после чего каждый сценарий из scenarios.py
+выполняется несколько раз через тестовый клиент. Сохраняются
+перцентили времени ответа, число запросов к БД и время SQL.
+
+    python -m benchmarks.run --sizes 100,1000 --output baseline.json
+    python -m benchmarks.run --sizes 100,1000 --compare baseline.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = '100,1000'
+DEFAULT_REPEAT = 20
+DEFAULT_WARMUP = 2
+DEFAULT_THRESHOLD = 0.25
+PERCENTILES = (50, 95, 99)
+
+
+def setup_django():
+    sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+    import django
+    django.setup()
+    from django.conf import settings
+
+    # Замеры не должны упираться в ограничения частоты запросов.
+    settings.THROTTLE_ENABLED = False
+
+
+def discard_metrics():
+    """
+    Отбрасывает несохраненные метрики замеров, чтобы сброс при выходе
+    не писал в уже удаленный временный каталог.
+    """
+    from api.metrics import buffer
+
+    buffer.clear()
+
+
+def percentile(values, rank):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    index = max(0, -(-rank * len(ordered) // 100) - 1)
+    return ordered[index]
+
+
+def seed_sizes(size):
+    """Объем данных для размера: size произведений."""
+    return {
+        'titles': size,
+        'users': max(size * 2, 50),
+        'reviews': size * 20,
+        'comments_per_review': 0.2,
+    }
+
+
+class Runner:
+    def __init__(self, repeat, warmup, warm_cache, only):
+        from rest_framework.test import APIClient
+
+        from api.authentication import ClaimsAccessToken
+        from benchmarks.scenarios import SCENARIOS, Context
+
+        self.repeat = repeat
+        self.warmup = warmup
+        self.warm_cache = warm_cache
+        self.context = Context()
+        self.scenarios = [
+            scenario for scenario in SCENARIOS
+            if not only or any(name in scenario.name for name in only)
+        ]
+        self.clients = {None: APIClient()}
+        for role, user in (('admin', self.context.admin),
+                           ('user', self.context.user)):
+            token = ClaimsAccessToken.for_user(user)
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+            self.clients[role] = client
+        self.number = 0
+
+    def request(self, scenario):
+        """Один запрос: время, число запросов к БД и время SQL."""
+        from django.core.cache import caches
+        from django.db import connection
+
+        from api.middleware import QueryTimer
+
+        self.number += 1
+        path, data = scenario.build(self.context, self.number)
+        if not self.warm_cache:
+            for cache in caches.all():
+                cache.clear()
+        client = self.clients[scenario.role]
+        timer = QueryTimer()
+        with connection.execute_wrapper(timer):
+            started = time.perf_counter()
+            response = getattr(client, scenario.method)(
+                path, data=data, format='json'
+            )
+            if response.streaming:
+                for _ in response.streaming_content:
+                    pass
+            elapsed = time.perf_counter() - started
+        return response.status_code, elapsed, timer.count, timer.seconds
+
+    def measure(self, scenario):
+        for _ in range(self.warmup):
+            self.request(scenario)
+        timings, query_counts, sql_times, errors = [], [], [], 0
+        for _ in range(self.repeat):
+            status, elapsed, count, sql_time = self.request(scenario)
+            if status != scenario.status:
+                errors += 1
+            timings.append(elapsed * 1000)
+            query_counts.append(count)
+            sql_times.append(sql_time * 1000)
+        result = {
+            f'p{rank}_ms': round(percentile(timings, rank), 3)
+            for rank in PERCENTILES
+        }
+        result.update({
+            'mean_ms': round(sum(timings) / len(timings), 3),
+            'queries': max(query_counts),
+            'sql_ms': round(sum(sql_times) / len(sql_times), 3),
+            'errors': errors,
+        })
+        return result
+
+    def run(self, log):
+        results = {}
+        for scenario in self.scenarios:
+            results[scenario.name] = result = self.measure(scenario)
+            log(
+                f'  {scenario.name:<24} p50 {result["p50_ms"]:>9.2f} мс  '
+                f'p95 {result["p95_ms"]:>9.2f} мс  '
+                f'запросов {result["queries"]:>3}  '
+                f'SQL {result["sql_ms"]:>8.2f} мс'
+                + (f'  ошибок {result["errors"]}' if result['errors']
+                   else '')
+            )
+        return results
+
+
+def run_size(size, options, log):
+    """Создает и заполняет базу заданного размера и выполняет замеры."""
+    from django.conf import settings
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import (setup_test_environment,
+                                   teardown_test_environment)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Запросы замеров не попадают в метрики проекта.
+        settings.METRICS_PATH = os.path.join(directory, 'metrics.sqlite3')
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = (
+            os.path.join(directory, f'bench_{size}.sqlite3')
+        )
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True
+        )
+        setup_test_environment(debug=False)
+        try:
+            started = time.monotonic()
+            call_command(
+                'generate_data', seed=options.seed, stdout=io.StringIO(),
+                **seed_sizes(size)
+            )
+            log(f'Размер {size}: база заполнена за '
+                f'{time.monotonic() - started:.1f} с')
+            runner = Runner(
+                options.repeat, options.warmup, options.warm_cache,
+                options.only
+            )
+            return runner.run(log)
+        finally:
+            discard_metrics()
+            teardown_test_environment()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def compare(baseline, current, threshold):
+    """
+    Регрессии относительно базового файла: рост p50 больше порога или
+    увеличение числа запросов к БД.
+    """
+    regressions = []
+    for size, scenarios in current['results'].items():
+        for name, result in scenarios.items():
+            base = baseline['results'].get(size, {}).get(name)
+            if base is None:
+                continue
+            if result['p50_ms'] > base['p50_ms'] * (1 + threshold):
+                regressions.append(
+                    f'{size}/{name}: p50 {base["p50_ms"]:.2f} -> '
+                    f'{result["p50_ms"]:.2f} мс'
+                )
+            if result['queries'] > base['queries']:
+                regressions.append(
+                    f'{size}/{name}: запросов {base["queries"]} -> '
+                    f'{result["queries"]}'
+                )
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--sizes', default=DEFAULT_SIZES,
+        help='Размеры баз через запятую (число произведений).'
+    )
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--warmup', type=int, default=DEFAULT_WARMUP)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument(
+        '--only', action='append',
+        help='Выполнять только сценарии, имя которых содержит строку.'
+    )
+    parser.add_argument(
+        '--warm-cache', action='store_true',
+        help='Не очищать кэш ответов перед каждым запросом.'
+    )
+    parser.add_argument('--output', help='Файл для сохранения результатов.')
+    parser.add_argument(
+        '--compare', help='Файл с базовыми результатами для сравнения.'
+    )
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='Допустимый рост p50 относительно базовых результатов.'
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    setup_django()
+    import django
+
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'repeat': options.repeat,
+            'seed': options.seed,
+            'warm_cache': options.warm_cache,
+        },
+        'results': {},
+    }
+    for size in (int(value) for value in options.sizes.split(',')):
+        report['results'][str(size)] = run_size(size, options, print)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+    if options.compare:
+        with open(options.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = compare(baseline, report, options.threshold)
+        for regression in regressions:
+            print(f'РЕГРЕССИЯ {regression}')
+        if regressions:
+            return 1
+        print('Регрессий не найдено.')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Сценарии замеров: по одному или несколько на каждый маршрут api/urls.py.
+
+Сценарий описывает запрос к API. Подготовка (prepare) выполняется вне
+замера и создает объекты, которые нужны запросу: например, отзыв для
+удаления или пользователя для получения токена.
+"""
+from django.contrib.auth.tokens import default_token_generator
+from django.db.models import Count
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+DEEP_PAGE_LIMIT = 10
+BULK_SIZE = 50
+
+
+class Scenario:
+    def __init__(self, name, method, path, role='admin', data=None,
+                 prepare=None, status=200):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.role = role
+        self.data = data
+        self.prepare = prepare
+        self.status = status
+
+    def build(self, context, number):
+        """URL и тело запроса для очередного повтора."""
+        values = dict(context.values)
+        if self.prepare is not None:
+            values.update(self.prepare(context, number))
+        data = self.data(values, number) if callable(self.data) else self.data
+        return self.path.format(**values), data
+
+
+class Context:
+    """
+    Объекты заполненной базы, на которые ссылаются сценарии: самое
+    популярное произведение, его отзыв, пользователи для запросов.
+    """
+
+    def __init__(self):
+        self.admin = User.objects.create(
+            username='bench_admin', email='bench_admin@yamdb.fake',
+            role='admin'
+        )
+        self.user = User.objects.create(
+            username='bench_user', email='bench_user@yamdb.fake'
+        )
+        title = Title.objects.annotate(
+            total=Count('reviews')
+        ).order_by('-total', 'pk').first()
+        review = Review.objects.filter(title=title).annotate(
+            total=Count('comments')
+        ).order_by('-total', 'pk').first()
+        titles = Title.objects.count()
+        self.values = {
+            'title_id': title.pk,
+            'review_id': review.pk,
+            'comment_id': Comment.objects.filter(review=review).values_list(
+                'pk', flat=True
+            ).first() or 0,
+            'username': User.objects.exclude(
+                pk__in=(self.admin.pk, self.user.pk)
+            ).values_list('username', flat=True).first(),
+            'genre': Genre.objects.values_list('slug', flat=True).first(),
+            'category': Category.objects.values_list(
+                'slug', flat=True
+            ).first(),
+            'deep_offset': max(titles - DEEP_PAGE_LIMIT, 0),
+            'deep_review_offset': max(
+                title.total - DEEP_PAGE_LIMIT, 0
+            ),
+            'limit': DEEP_PAGE_LIMIT,
+        }
+
+    def new_title(self, name):
+        title = Title.objects.create(
+            name=name, year=2000,
+            category=Category.objects.get(slug=self.values['category'])
+        )
+        title.genre.add(Genre.objects.get(slug=self.values['genre']))
+        return title
+
+
+def title_data(values, number):
+    return {
+        'name': f'Замер {number}',
+        'year': 2001,
+        'genre': [values['genre']],
+        'category': values['category'],
+    }
+
+
+def prepare_title(context, number):
+    return {'new_title_id': context.new_title(f'Удаление {number}').pk}
+
+
+def prepare_review(context, number):
+    title = context.new_title(f'Отзыв {number}')
+    review = Review.objects.create(
+        title=title, author=context.admin, text='Отзыв', score=5
+    )
+    return {'new_title_id': title.pk, 'new_review_id': review.pk}
+
+
+def prepare_comment(context, number):
+    comment = Comment.objects.create(
+        review_id=context.values['review_id'], author=context.admin,
+        text='Комментарий'
+    )
+    return {'new_comment_id': comment.pk}
+
+
+def prepare_dictionary(model):
+    def prepare(context, number):
+        slug = f'bench-{model._meta.model_name}-{number}'
+        model.objects.create(name=slug, slug=slug)
+        return {'slug': slug}
+    return prepare
+
+
+def prepare_user(context, number):
+    username = f'bench_delete_{number}'
+    User.objects.create(username=username, email=f'{username}@yamdb.fake')
+    return {'new_username': username}
+
+
+def prepare_token(context, number):
+    user = User.objects.create(
+        username=f'bench_token_{number}',
+        email=f'bench_token_{number}@yamdb.fake'
+    )
+    return {
+        'token_username': user.username,
+        'code': default_token_generator.make_token(user),
+    }
+
+
+TITLES = '/api/v1/titles/'
+TITLE = TITLES + '{title_id}/'
+REVIEWS = TITLE + 'reviews/'
+REVIEW = REVIEWS + '{review_id}/'
+COMMENTS = REVIEW + 'comments/'
+
+SCENARIOS = (
+    Scenario('categories.list', 'get', '/api/v1/categories/'),
+    Scenario('categories.create', 'post', '/api/v1/categories/',
+             data=lambda values, number: {
+                 'name': f'Категория {number}', 'slug': f'bench-c{number}'
+             }, status=201),
+    Scenario('categories.delete', 'delete', '/api/v1/categories/{slug}/',
+             prepare=prepare_dictionary(Category), status=204),
+    Scenario('genres.list', 'get', '/api/v1/genres/'),
+    Scenario('genres.create', 'post', '/api/v1/genres/',
+             data=lambda values, number: {
+                 'name': f'Жанр {number}', 'slug': f'bench-g{number}'
+             }, status=201),
+    Scenario('genres.delete', 'delete', '/api/v1/genres/{slug}/',
+             prepare=prepare_dictionary(Genre), status=204),
+    Scenario('titles.list', 'get', TITLES),
+    Scenario('titles.list_cursor', 'get', TITLES + '?cursor='),
+    Scenario('titles.detail', 'get', TITLE),
+    Scenario('titles.filtered', 'get',
+             TITLES + '?genre={genre}&category={category}'
+             '&year_min=1950&year_max=2000'),
+    Scenario('titles.search', 'get', TITLES + '?search=любовь'),
+    Scenario('titles.name', 'get', TITLES + '?name=время'),
+    Scenario('titles.facets', 'get', TITLES + 'facets/?year_min=1950'),
+    Scenario('titles.deep_page', 'get',
+             TITLES + '?offset={deep_offset}&limit={limit}'),
+    Scenario('titles.create', 'post', TITLES, data=title_data, status=201),
+    Scenario('titles.create_bulk', 'post', TITLES,
+             data=lambda values, number: [
+                 title_data(values, f'{number}.{item}')
+                 for item in range(BULK_SIZE)
+             ], status=201),
+    Scenario('titles.update', 'patch', TITLE,
+             data=lambda values, number: {'name': f'Новое имя {number}'}),
+    Scenario('titles.delete', 'delete', TITLES + '{new_title_id}/',
+             prepare=prepare_title, status=204),
+    Scenario('reviews.list', 'get', REVIEWS),
+    Scenario('reviews.list_cursor', 'get', REVIEWS + '?cursor='),
+    Scenario('reviews.detail', 'get', REVIEW),
+    Scenario('reviews.deep_page', 'get',
+             REVIEWS + '?offset={deep_review_offset}&limit={limit}'),
+    Scenario('reviews.create', 'post', TITLES + '{new_title_id}/reviews/',
+             prepare=lambda context, number: {
+                 'new_title_id': context.new_title(f'Новый {number}').pk
+             },
+             data={'text': 'Отличное произведение', 'score': 8},
+             status=201),
+    Scenario('reviews.update', 'patch', REVIEW,
+             data=lambda values, number: {'text': f'Правка {number}'}),
+    Scenario('reviews.delete', 'delete',
+             TITLES + '{new_title_id}/reviews/{new_review_id}/',
+             prepare=prepare_review, status=204),
+    Scenario('comments.list', 'get', COMMENTS),
+    Scenario('comments.create', 'post', COMMENTS, role='user',
+             data={'text': 'Согласен'}, status=201),
+    Scenario('comments.update', 'patch', COMMENTS + '{new_comment_id}/',
+             prepare=prepare_comment, data={'text': 'Правка'}),
+    Scenario('comments.delete', 'delete', COMMENTS + '{new_comment_id}/',
+             prepare=prepare_comment, status=204),
+    Scenario('users.list', 'get', '/api/v1/users/'),
+    Scenario('users.search', 'get', '/api/v1/users/?search=user1'),
+    Scenario('users.detail', 'get', '/api/v1/users/{username}/'),
+    Scenario('users.create', 'post', '/api/v1/users/',
+             data=lambda values, number: {
+                 'username': f'bench_new_{number}',
+                 'email': f'bench_new_{number}@yamdb.fake',
+             }, status=201),
+    Scenario('users.update', 'patch', '/api/v1/users/{username}/',
+             data=lambda values, number: {'bio': f'Био {number}'}),
+    Scenario('users.delete', 'delete', '/api/v1/users/{new_username}/',
+             prepare=prepare_user, status=204),
+    Scenario('users.me', 'get', '/api/v1/users/me/', role='user'),
+    Scenario('users.me_update', 'patch', '/api/v1/users/me/', role='user',
+             data=lambda values, number: {'bio': f'Био {number}'}),
+    Scenario('auth.signup', 'post', '/api/v1/auth/signup/', role=None,
+             data=lambda values, number: {
+                 'username': f'bench_signup_{number}',
+                 'email': f'bench_signup_{number}@yamdb.fake',
+             }),
+    Scenario('auth.token', 'post', '/api/v1/auth/token/', role=None,
+             prepare=prepare_token,
+             data=lambda values, number: {
+                 'username': values['token_username'],
+                 'confirmation_code': values['code'],
+             }),
+    Scenario('export.titles', 'get', '/api/v1/export/titles/'),
+    Scenario('export.reviews', 'get', '/api/v1/export/reviews/'),
+)
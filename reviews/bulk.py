@@ -0,0 +1,574 @@
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_datetime
+
+from .models import Category, Comment, Genre, Review, Title, User
+from .ratings import rebuild_ratings
+from .signals import bulk_loaded
+from .sources import RowError
+
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 20
+
+
+class IdIndex:
+    """
+    Множество id объектов модели: отсортированный массив id из базы
+    и id, добавленные во время загрузки. Возрастающие id дописываются в
+    массив (8 байт на id), остальные хранятся в отдельном множестве.
+    """
+
+    def __init__(self, model):
+        self.ids = array('q', model.objects.order_by('pk').values_list(
+            'pk', flat=True
+        ).iterator(chunk_size=10000))
+        self.added = set()
+
+    def __contains__(self, value):
+        if value in self.added:
+            return True
+        return contains(self.ids, value)
+
+    def add(self, value):
+        if not self.ids or value > self.ids[-1]:
+            self.ids.append(value)
+        else:
+            self.added.add(value)
+
+
+def contains(ids, value):
+    """Проверяет наличие значения в отсортированном массиве."""
+    position = bisect_left(ids, value)
+    return position < len(ids) and ids[position] == value
+
+
+class Table:
+    """
+    Описание загружаемой таблицы: имя файла без расширения, модель,
+    обязательные и необязательные (optional) поля файла, разбор строки
+    и поля, которые сравниваются и обновляются в режиме upsert.
+    """
+
+    def __init__(self, name, model, fields, build, update_fields,
+                 affects=(), after_batch=None, optional=()):
+        self.name = name
+        self.model = model
+        self.fields = fields
+        self.optional = optional
+        self.build = build
+        self.update_fields = update_fields
+        self.affects = (model,) + tuple(affects)
+        self.after_batch = after_batch
+
+    @property
+    def dump_fields(self):
+        """Все поля файла выгрузки, включая необязательные."""
+        return tuple(self.fields) + tuple(self.optional)
+
+    @property
+    def columns(self):
+        """Атрибуты модели, соответствующие полям файла выгрузки."""
+        return [
+            self.model._meta.get_field(name).attname
+            for name in self.dump_fields
+        ]
+
+
+class TableStats:
+    def __init__(self, table, max_errors=MAX_REPORTED_ERRORS):
+        self.table = table
+        self.max_errors = max_errors
+        self.rows = 0
+        self.skipped = 0
+        self.errors = []
+        self.seconds = 0.0
+        self.inserted = 0
+        self.updated = 0
+        self.deleted = 0
+        self.unchanged = 0
+
+    @property
+    def touched(self):
+        return self.inserted + self.updated + self.deleted
+
+    @property
+    def rate(self):
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add_error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((line, message))
+
+    def __str__(self):
+        return (
+            f'{self.table.name}: строк {self.rows}, пропущено '
+            f'{self.skipped}, {self.seconds:.2f} с, '
+            f'{self.rate:.0f} строк/с'
+        )
+
+    def summary(self):
+        return (
+            f'{self.table.name}: добавлено {self.inserted}, изменено '
+            f'{self.updated}, удалено {self.deleted}, без изменений '
+            f'{self.unchanged}, пропущено {self.skipped}, '
+            f'{self.seconds:.2f} с'
+        )
+
+
+def parse_id(value, field='id'):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f'Некорректное значение `{field}`: {value!r}')
+
+
+def parse_row_id(row):
+    """id строки, которую не удалось разобрать, если он корректен."""
+    if isinstance(row, RowError):
+        return None
+    try:
+        return int(row.get('id'))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_datetime_value(value, field):
+    parsed = parse_datetime(value or '')
+    if parsed is None:
+        raise ValueError(f'Некорректная дата `{field}`: {value!r}')
+    return parsed
+
+
+def build_category(row, loader):
+    return Category(id=parse_id(row['id']), name=row['name'],
+                    slug=row['slug'])
+
+
+def build_genre(row, loader):
+    return Genre(id=parse_id(row['id']), name=row['name'], slug=row['slug'])
+
+
+def build_title(row, loader):
+    year = row['year']
+    return Title(
+        id=parse_id(row['id']),
+        name=row['name'],
+        name_normalized=Title.normalize_name(row['name']),
+        year=parse_id(year, 'year') if year else None,
+        description=row.get('description') or '',
+        category_id=loader.reference(Category, row['category'], 'category')
+    )
+
+
+def build_genre_title(row, loader):
+    return Title.genre.through(
+        id=parse_id(row['id']),
+        title_id=loader.reference(Title, row['title_id'], 'title_id'),
+        genre_id=loader.reference(Genre, row['genre_id'], 'genre_id')
+    )
+
+
+def build_user(row, loader):
+    roles = dict(User.ROLE)
+    if row['role'] not in roles:
+        raise ValueError(f'Неизвестная роль: {row["role"]!r}')
+    return User(
+        id=parse_id(row['id']),
+        username=row['username'],
+        email=row['email'],
+        role=row['role'],
+        bio=row['bio'],
+        first_name=row['first_name'],
+        last_name=row['last_name']
+    )
+
+
+def build_review(row, loader):
+    score = parse_id(row['score'], 'score')
+    if not settings.MIN_SCORE <= score <= settings.MAX_SCORE:
+        raise ValueError(f'Оценка вне допустимого диапазона: {score}')
+    return Review(
+        id=parse_id(row['id']),
+        title_id=loader.reference(Title, row['title_id'], 'title_id'),
+        text=row['text'],
+        author_id=loader.reference(User, row['author'], 'author'),
+        score=score,
+        pub_date=parse_datetime_value(row['pub_date'], 'pub_date')
+    )
+
+
+def build_comment(row, loader):
+    return Comment(
+        id=parse_id(row['id']),
+        review_id=loader.reference(Review, row['review_id'], 'review_id'),
+        text=row['text'],
+        author_id=loader.reference(User, row['author'], 'author'),
+        pub_date=parse_datetime_value(row['pub_date'], 'pub_date')
+    )
+
+
+def touch_loaded_titles(objects):
+    Title.touch(pk__in=[obj.pk for obj in objects])
+
+
+def touch_titles(objects):
+    Title.touch(pk__in={obj.title_id for obj in objects})
+
+
+def touch_commented_titles(objects):
+    Title.touch(reviews__in={obj.review_id for obj in objects})
+
+
+TABLES = (
+    Table('category', Category,
+          ('id', 'name', 'slug'), build_category, ('name', 'slug')),
+    Table('genre', Genre,
+          ('id', 'name', 'slug'), build_genre, ('name', 'slug')),
+    Table('titles', Title,
+          ('id', 'name', 'year', 'category'), build_title,
+          ('name', 'name_normalized', 'year', 'category_id'),
+          after_batch=touch_loaded_titles, optional=('description',)),
+    Table('genre_title', Title.genre.through,
+          ('id', 'title_id', 'genre_id'), build_genre_title,
+          ('title_id', 'genre_id'),
+          affects=(Title,), after_batch=touch_titles),
+    Table('users', User,
+          ('id', 'username', 'email', 'role', 'bio', 'first_name',
+           'last_name'), build_user,
+          ('username', 'email', 'role', 'bio', 'first_name', 'last_name')),
+    Table('review', Review,
+          ('id', 'title_id', 'text', 'author', 'score', 'pub_date'),
+          build_review, ('title_id', 'text', 'author_id', 'score', 'pub_date'),
+          affects=(Title,), after_batch=touch_titles),
+    Table('comments', Comment,
+          ('id', 'review_id', 'text', 'author', 'pub_date'),
+          build_comment, ('review_id', 'text', 'author_id', 'pub_date'),
+          affects=(Title,), after_batch=touch_commented_titles),
+)
+
+
+@contextmanager
+def keep_auto_dates(model):
+    """Сохраняет даты из источника вместо auto_now_add при вставке."""
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False)
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def format_value(value):
+    """Значение поля в виде строки CSV в формате static/data."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.isoformat().replace('+00:00', 'Z')
+    return str(value)
+
+
+def dump_rows(table, chunk_size=DEFAULT_BATCH_SIZE):
+    """Строки таблицы для выгрузки, читаемые из базы частями."""
+    queryset = table.model.objects.order_by('pk').values_list(
+        *table.columns
+    )
+    for values in queryset.iterator(chunk_size=chunk_size):
+        yield [format_value(value) for value in values]
+
+
+def set_inserted_ids(model, objects):
+    """
+    Проставляет id объектам после bulk_create, если база их не вернула
+    (SQLite). Вызывается в той же транзакции: вставка держит блокировку
+    записи, поэтому новые строки получили последние id подряд.
+    """
+    if not objects or objects[0].pk is not None:
+        return
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    for pk, obj in enumerate(objects, last - len(objects) + 1):
+        obj.pk = pk
+
+
+def insert_titles(items, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Создает произведения и их связи с жанрами двумя bulk_create в одной
+    транзакции. items — проверенные данные TitleSerializer: поля Title и
+    список объектов Genre в genre.
+    """
+    titles = []
+    for item in items:
+        fields = {name: value for name, value in item.items()
+                  if name != 'genre'}
+        titles.append(Title(
+            name_normalized=Title.normalize_name(fields['name']), **fields
+        ))
+    through = Title.genre.through
+    with transaction.atomic():
+        Title.objects.bulk_create(titles, batch_size=batch_size)
+        set_inserted_ids(Title, titles)
+        through.objects.bulk_create([
+            through(title_id=title.pk, genre_id=genre.pk)
+            for title, item in zip(titles, items)
+            for genre in dict.fromkeys(item.get('genre', ()))
+        ], batch_size=batch_size)
+    if titles:
+        bulk_loaded.send(sender=Title)
+    return titles
+
+
+class BulkLoader:
+    """
+    Потоковая загрузка строк в базу пачками через bulk_create, по одной
+    транзакции на пачку. Внешние ключи проверяются по id, заранее
+    загруженным в память. В режиме dry_run строки только проверяются,
+    а база не изменяется.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, dry_run=False,
+                 max_errors=MAX_REPORTED_ERRORS):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.max_errors = max_errors
+        self.indexes = {}
+
+    def index(self, model):
+        if model not in self.indexes:
+            self.indexes[model] = IdIndex(model)
+        return self.indexes[model]
+
+    def reference(self, model, value, field):
+        pk = parse_id(value, field)
+        if pk not in self.index(model):
+            raise ValueError(
+                f'{model._meta.verbose_name} с id={pk} не найден(а) '
+                f'(поле `{field}`)'
+            )
+        return pk
+
+    def build(self, table, row):
+        if isinstance(row, RowError):
+            raise row
+        return table.build(row, self)
+
+    def load(self, table, rows):
+        """
+        Загружает строки таблицы. rows — итерируемое по парам
+        (номер строки, словарь значений или RowError).
+        """
+        stats = TableStats(table, self.max_errors)
+        started = time.monotonic()
+        batch = []
+        with keep_auto_dates(table.model):
+            for line, row in rows:
+                try:
+                    batch.append((line, self.build(table, row)))
+                except (KeyError, ValueError) as error:
+                    stats.add_error(line, str(error))
+                    continue
+                if len(batch) >= self.batch_size:
+                    self.save(table, batch, stats)
+                    batch = []
+            if batch:
+                self.save(table, batch, stats)
+        self.finish(table)
+        stats.seconds = time.monotonic() - started
+        return stats
+
+    def insert(self, table, objects):
+        """
+        Вставляет пачками готовые объекты, например сгенерированные.
+        Номер строки в ошибках — порядковый номер объекта.
+        """
+        stats = TableStats(table, self.max_errors)
+        started = time.monotonic()
+        batch = []
+        with keep_auto_dates(table.model):
+            for item in enumerate(objects, 1):
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self.save(table, batch, stats)
+                    batch = []
+            if batch:
+                self.save(table, batch, stats)
+        self.finish(table)
+        stats.seconds = time.monotonic() - started
+        return stats
+
+    def save(self, table, batch, stats):
+        """
+        Вставляет пачку пар (номер строки, объект). Строки с id, который
+        уже есть в базе, пропускаются без ошибки: повторная загрузка
+        файла не дублирует данные. При нарушении другого ограничения
+        уникальности пачка записывается построчно, и каждая
+        отклоненная строка попадает в ошибки.
+        """
+        index = self.index(table.model)
+        created = {}
+        for line, obj in batch:
+            if obj.pk not in index and obj.pk not in created:
+                created[obj.pk] = (line, obj)
+        stats.rows += len(batch) - len(created)
+        if not created:
+            return
+        created = list(created.values())
+        try:
+            self.write(table, created, [])
+        except IntegrityError:
+            for item in created:
+                if self.write_row(table, item, stats, created=True):
+                    stats.rows += 1
+        else:
+            stats.inserted += len(created)
+            stats.rows += len(created)
+
+    def remember(self, model, objects):
+        """
+        Добавляет id записанных объектов в индекс. Индекс, который еще
+        не построен, прочитает их из базы; при dry_run записи в базе нет,
+        поэтому индекс строится сразу.
+        """
+        if self.dry_run or model in self.indexes:
+            index = self.index(model)
+            for obj in objects:
+                index.add(obj.pk)
+
+    def upsert(self, table, rows, prune=False):
+        """
+        Приводит таблицу в соответствие с источником: строки сравниваются
+        с базой по первичному ключу, и применяются только вставки и
+        изменения. С prune удаляются строки, которых нет в источнике.
+        """
+        stats = TableStats(table, self.max_errors)
+        started = time.monotonic()
+        seen = array('q')
+        ordered = True
+        batch = {}
+        with keep_auto_dates(table.model):
+            for line, row in rows:
+                try:
+                    obj = self.build(table, row)
+                except (KeyError, ValueError) as error:
+                    stats.add_error(line, str(error))
+                    pk = parse_row_id(row)
+                else:
+                    stats.rows += 1
+                    pk = obj.pk
+                    batch[pk] = (line, obj)
+                if pk is not None:
+                    ordered = ordered and (not seen or seen[-1] <= pk)
+                    seen.append(pk)
+                if len(batch) >= self.batch_size:
+                    self.apply(table, batch, stats)
+                    batch = {}
+            if batch:
+                self.apply(table, batch, stats)
+        if prune:
+            if not ordered:
+                seen = array('q', sorted(seen))
+            self.prune(table, seen, stats)
+        self.finish(table)
+        stats.seconds = time.monotonic() - started
+        return stats
+
+    def apply(self, table, batch, stats):
+        """Сравнивает пачку с базой и сохраняет отличия."""
+        fields = table.update_fields
+        current = {
+            values[0]: values[1:]
+            for values in table.model.objects.filter(
+                pk__in=list(batch)
+            ).values_list('pk', *fields)
+        }
+        created, changed = [], []
+        for pk, (line, obj) in batch.items():
+            values = current.get(pk)
+            if values is None:
+                created.append((line, obj))
+            elif values != tuple(getattr(obj, name) for name in fields):
+                changed.append((line, obj))
+            else:
+                stats.unchanged += 1
+        if not created and not changed:
+            return
+        try:
+            self.write(table, created, changed)
+        except IntegrityError:
+            for item in created:
+                self.write_row(table, item, stats, created=True)
+            for item in changed:
+                self.write_row(table, item, stats, created=False)
+        else:
+            stats.inserted += len(created)
+            stats.updated += len(changed)
+
+    def write(self, table, created, changed):
+        model = table.model
+        if not self.dry_run:
+            with transaction.atomic():
+                model.objects.bulk_create([obj for _, obj in created])
+                model.objects.bulk_update(
+                    [obj for _, obj in changed], table.update_fields
+                )
+                if table.after_batch is not None:
+                    table.after_batch([obj for _, obj in created + changed])
+        self.remember(model, [obj for _, obj in created])
+
+    def write_row(self, table, item, stats, created):
+        """Построчная запись пачки, в которой нарушена уникальность."""
+        line, obj = item
+        try:
+            if created:
+                self.write(table, [item], [])
+            else:
+                self.write(table, [], [item])
+        except IntegrityError as error:
+            stats.add_error(line, str(error))
+            return False
+        if created:
+            stats.inserted += 1
+        else:
+            stats.updated += 1
+        return True
+
+    def prune(self, table, seen, stats):
+        """Удаляет пачками строки, которых нет в источнике."""
+        model = table.model
+        missing = array('q', (
+            pk for pk in model.objects.order_by('pk').values_list(
+                'pk', flat=True
+            ).iterator(chunk_size=10000)
+            if not contains(seen, pk)
+        ))
+        if self.dry_run:
+            stats.deleted = len(missing)
+            return
+        for start in range(0, len(missing), self.batch_size):
+            queryset = model.objects.filter(
+                pk__in=list(missing[start:start + self.batch_size])
+            )
+            with transaction.atomic():
+                if table.after_batch is not None:
+                    table.after_batch(list(queryset))
+                _, deleted = queryset.delete()
+            stats.deleted += deleted.get(model._meta.label, 0)
+        self.indexes.pop(model, None)
+
+    def finish(self, table):
+        if self.dry_run:
+            return
+        if table.model is Review:
+            rebuild_ratings(self.batch_size)
+        for model in table.affects:
+            bulk_loaded.send(sender=model)
@@ -0,0 +1,214 @@
+import random
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+
+from .models import (DEFAULT_USER, MODERATOR, Category, Comment, Genre, Review,
+                     Title, User)
+
+CATEGORIES = (
+    ('Фильм', 'movie'),
+    ('Книга', 'book'),
+    ('Музыка', 'music'),
+)
+GENRES = (
+    ('Драма', 'drama'),
+    ('Комедия', 'comedy'),
+    ('Вестерн', 'western'),
+    ('Фэнтези', 'fantasy'),
+    ('Фантастика', 'sci-fi'),
+    ('Детектив', 'detective'),
+    ('Триллер', 'thriller'),
+    ('Сказка', 'tale'),
+    ('Роман', 'roman'),
+    ('Классика', 'classical'),
+)
+WORDS = (
+    'время', 'человек', 'жизнь', 'день', 'рука', 'город', 'дорога',
+    'история', 'любовь', 'война', 'мир', 'ночь', 'море', 'небо', 'сердце',
+    'книга', 'фильм', 'песня', 'герой', 'судьба', 'тайна', 'память',
+    'свет', 'тень', 'зима', 'лето', 'ветер', 'огонь', 'вода', 'земля',
+    'дом', 'друг', 'враг', 'путь', 'сон', 'голос', 'слово', 'взгляд',
+    'старый', 'новый', 'долгий', 'последний', 'первый', 'тихий',
+    'красивый', 'страшный', 'смешной', 'грустный', 'настоящий', 'живой',
+    'очень', 'снова', 'всегда', 'никогда', 'почти', 'совсем', 'даже',
+    'смотреть', 'читать', 'слушать', 'помнить', 'ждать', 'верить',
+    'понимать', 'искать', 'найти', 'вернуться', 'остаться', 'уйти',
+    'и', 'но', 'в', 'на', 'о', 'с', 'не', 'как', 'что', 'это',
+)
+FIRST_NAMES = (
+    'Александр', 'Мария', 'Иван', 'Анна', 'Дмитрий', 'Елена', 'Сергей',
+    'Ольга', 'Андрей', 'Наталья', 'Алексей', 'Татьяна', 'Михаил', 'Юлия',
+)
+LAST_NAMES = (
+    'Иванов', 'Смирнова', 'Кузнецов', 'Попова', 'Васильев', 'Петрова',
+    'Соколов', 'Михайлова', 'Новиков', 'Федорова', 'Морозов', 'Волкова',
+)
+START_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+PERIOD = timedelta(days=365 * 8)
+MIN_YEAR = 1900
+MAX_YEAR = 2022
+USERNAME_PREFIX = 'generated_user_'
+MODERATOR_SHARE = 0.01
+
+
+def next_id(model):
+    last = model.objects.order_by('-pk').values_list('pk', flat=True).first()
+    return (last or 0) + 1
+
+
+def zipf_counts(total, size, exponent, limit):
+    """
+    Делит total между size элементами по закону Ципфа: элемент ранга k
+    получает долю, пропорциональную 1 / k ** exponent, но не больше limit.
+    """
+    weights = [1 / rank ** exponent for rank in range(1, size + 1)]
+    scale = total / sum(weights)
+    counts = array(
+        'q', (min(int(weight * scale), limit) for weight in weights)
+    )
+    remainder = total - sum(counts)
+    rank = 0
+    while remainder > 0 and rank < size:
+        extra = min(remainder, limit - counts[rank])
+        counts[rank] += extra
+        remainder -= extra
+        rank += 1
+    return counts
+
+
+class DataGenerator:
+    """
+    Детерминированный генератор данных: при одинаковых seed и начальном
+    состоянии базы создаются одни и те же объекты. Каждая таблица
+    получает собственный генератор случайных чисел, поэтому таблицы
+    можно создавать независимо и по одной, не храня их в памяти.
+    """
+
+    def __init__(self, seed=0, users=1000, titles=1000, reviews=10000,
+                 comments_per_review=0.2, zipf_exponent=1.1):
+        self.seed = seed
+        self.users = users
+        self.titles = titles
+        self.reviews = min(reviews, users * titles)
+        self.comments_per_review = comments_per_review
+        self.zipf_exponent = zipf_exponent
+        self.first_user = next_id(User)
+        self.first_title = next_id(Title)
+        self.first_link = next_id(Title.genre.through)
+        self.first_review = None
+
+    def random(self, name):
+        return random.Random(f'{self.seed}:{name}')
+
+    def text(self, rng, min_words, max_words):
+        words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+        return ' '.join(words).capitalize() + '.'
+
+    def review_date(self, index, offset=0.0):
+        return START_DATE + PERIOD * ((index + offset) / self.reviews)
+
+    def create_dictionaries(self):
+        """Категории и жанры, которых еще нет в базе."""
+        for model, values in ((Category, CATEGORIES), (Genre, GENRES)):
+            for name, slug in values:
+                model.objects.get_or_create(slug=slug, defaults={'name': name})
+        self.category_ids = list(
+            Category.objects.order_by('pk').values_list('pk', flat=True)
+        )
+        self.genre_ids = list(
+            Genre.objects.order_by('pk').values_list('pk', flat=True)
+        )
+
+    def generate_users(self):
+        rng = self.random('users')
+        for pk in range(self.first_user, self.first_user + self.users):
+            username = f'{USERNAME_PREFIX}{pk}'
+            yield User(
+                id=pk,
+                username=username,
+                email=f'{username}@yamdb.fake',
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                bio=self.text(rng, 3, 12) if rng.random() < 0.3 else '',
+                role=(
+                    MODERATOR if rng.random() < MODERATOR_SHARE
+                    else DEFAULT_USER
+                )
+            )
+
+    def generate_titles(self):
+        rng = self.random('titles')
+        for pk in range(self.first_title, self.first_title + self.titles):
+            name = self.text(rng, 1, 4)[:-1]
+            yield Title(
+                id=pk,
+                name=name,
+                name_normalized=Title.normalize_name(name),
+                year=rng.randint(MIN_YEAR, MAX_YEAR),
+                description=self.text(rng, 10, 40),
+                category_id=rng.choice(self.category_ids)
+            )
+
+    def generate_genre_links(self):
+        rng = self.random('genre_title')
+        pk = self.first_link
+        for title_id in range(self.first_title,
+                              self.first_title + self.titles):
+            count = min(rng.randint(1, 3), len(self.genre_ids))
+            for genre_id in rng.sample(self.genre_ids, count):
+                yield Title.genre.through(
+                    id=pk, title_id=title_id, genre_id=genre_id
+                )
+                pk += 1
+
+    def generate_reviews(self):
+        """
+        Отзывы с распределением числа отзывов на произведение по Ципфу.
+        Авторы отзывов на одно произведение не повторяются.
+        """
+        rng = self.random('review')
+        self.first_review = next_id(Review)
+        counts = zipf_counts(
+            self.reviews, self.titles, self.zipf_exponent, self.users
+        )
+        self.review_count = sum(counts)
+        ranks = list(range(self.titles))
+        rng.shuffle(ranks)
+        index = 0
+        for offset, rank in enumerate(ranks):
+            quality = rng.gauss(7, 1.5)
+            first_author = rng.randrange(self.users)
+            for number in range(counts[rank]):
+                score = round(rng.gauss(quality, 2))
+                yield Review(
+                    id=self.first_review + index,
+                    title_id=self.first_title + offset,
+                    author_id=self.first_user + (
+                        (first_author + number) % self.users
+                    ),
+                    score=min(max(score, settings.MIN_SCORE),
+                              settings.MAX_SCORE),
+                    text=self.text(rng, 5, 60),
+                    pub_date=self.review_date(index, rng.random())
+                )
+                index += 1
+
+    def generate_comments(self):
+        """Комментарии публикуются позже отзывов, к которым относятся."""
+        rng = self.random('comments')
+        whole = int(self.comments_per_review)
+        fraction = self.comments_per_review - whole
+        pk = next_id(Comment)
+        for index in range(self.review_count):
+            count = whole + (rng.random() < fraction)
+            for _ in range(count):
+                yield Comment(
+                    id=pk,
+                    review_id=self.first_review + index,
+                    author_id=self.first_user + rng.randrange(self.users),
+                    text=self.text(rng, 3, 30),
+                    pub_date=self.review_date(index + 1, rng.random())
+                )
+                pk += 1
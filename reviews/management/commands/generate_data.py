@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.bulk import TABLES, BulkLoader
+from reviews.generator import DataGenerator
+
+GENERATOR_BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    """Генерация данных для нагрузочного тестирования"""
+
+    help = (
+        'Создает пользователей, произведения, отзывы и комментарии в '
+        'заданном объеме. Результат определяется значением --seed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument(
+            '--comments-per-review', type=float, default=0.2,
+            help='Среднее число комментариев к отзыву.'
+        )
+        parser.add_argument(
+            '--zipf-exponent', type=float, default=1.1,
+            help='Показатель распределения Ципфа для отзывов.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=GENERATOR_BATCH_SIZE,
+            help='Количество строк, вставляемых в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        for name in ('users', 'titles', 'batch_size'):
+            if options[name] < 1:
+                raise CommandError(f'--{name.replace("_", "-")} должен '
+                                   'быть больше нуля.')
+        if options['reviews'] < 0 or options['comments_per_review'] < 0:
+            raise CommandError('Количество не может быть отрицательным.')
+        generator = DataGenerator(
+            seed=options['seed'],
+            users=options['users'],
+            titles=options['titles'],
+            reviews=options['reviews'],
+            comments_per_review=options['comments_per_review'],
+            zipf_exponent=options['zipf_exponent'],
+        )
+        generator.create_dictionaries()
+        loader = BulkLoader(options['batch_size'])
+        tables = {table.name: table for table in TABLES}
+        for name, objects in (
+            ('users', generator.generate_users()),
+            ('titles', generator.generate_titles()),
+            ('genre_title', generator.generate_genre_links()),
+            ('review', generator.generate_reviews()),
+            ('comments', generator.generate_comments()),
+        ):
+            stats = loader.insert(tables[name], objects)
+            self.stdout.write(str(stats))
+            if stats.skipped:
+                # Пропущенный объект ломает связи следующих таблиц:
+                # отзывы пропущенного пользователя нарушат внешний ключ.
+                line, message = stats.errors[0]
+                raise CommandError(
+                    f'{name}: не удалось записать {stats.skipped} '
+                    f'объект(ов), первый — №{line}: {message}'
+                )
@@ -1,111 +1,160 @@
 import csv
-from django.core.management.base import BaseCommand
-from django.shortcuts import get_object_or_404
+import os
+import sys
+import time
 
-from reviews.models import Category, Genre, Title, Comment, Review, User
+from django.core.management.base import BaseCommand, CommandError
+
+from reviews.bulk import (DEFAULT_BATCH_SIZE, MAX_REPORTED_ERRORS, TABLES,
+                          BulkLoader)
+from reviews.models import LoadedFile
+from reviews.sources import STREAM_FORMATS, SourceError, open_source
+
+DATA_DIR = os.path.join('static', 'data')
 
 
 class Command(BaseCommand):
     """Загрузка данных в БД"""
 
+    help = (
+        'Загружает данные пачками из каталога или архива с файлами '
+        '.csv, .csv.gz и .jsonl либо одну таблицу из stdin.'
+    )
+    stealth_options = ('stdin',)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'source', nargs='?', default=DATA_DIR,
+            help=(
+                'Каталог, архив zip/tar или `-` для чтения из stdin '
+                f'(по умолчанию {DATA_DIR}).'
+            )
+        )
+        parser.add_argument(
+            '--table', choices=[table.name for table in TABLES],
+            help='Загрузить только одну таблицу.'
+        )
+        parser.add_argument(
+            '--format', choices=STREAM_FORMATS, default='csv',
+            help='Формат данных в stdin.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+            help='Количество строк, вставляемых в одной транзакции.'
+        )
+        parser.add_argument(
+            '--upsert', action='store_true',
+            help=(
+                'Сравнивать файлы с базой по id и применять только '
+                'изменения. Неизменившиеся файлы пропускаются.'
+            )
+        )
+        parser.add_argument(
+            '--prune', action='store_true',
+            help=(
+                'В режиме --upsert удалять строки, которых нет в файле, '
+                'в том числе созданные через API.'
+            )
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Сравнивать файлы, даже если их содержимое не изменилось.'
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только проверить строки, не изменяя базу.'
+        )
+        parser.add_argument(
+            '--max-errors', type=int, default=MAX_REPORTED_ERRORS,
+            help='Сколько ошибочных строк выводить для каждой таблицы.'
+        )
+
     def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше нуля.')
+        if options['prune'] and not options['upsert']:
+            raise CommandError('--prune используется только с --upsert.')
+        tables = [
+            table for table in TABLES
+            if options['table'] in (None, table.name)
+        ]
+        stream = options.get('stdin') or sys.stdin.buffer
         try:
-            category_load()
-            genre_load()
-            titles_load()
-            genre_title()
-            user_load()
-            reviews_load()
-            comment_load()
-
-        except Exception as er:
-            print(er)
-
-
-def category_load():
-    with open('static/data/category.csv',
-              encoding='utf-8', mode='r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            Category.objects.get_or_create(id=row['id'],
-                                           name=row['name'],
-                                           slug=row['slug']
-                                           )
-
-
-def genre_load():
-    with open('static/data/genre.csv',
-              encoding='utf-8', mode='r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            Genre.objects.get_or_create(id=row['id'],
-                                        name=row['name'],
-                                        slug=row['slug']
-                                        )
-
-
-def titles_load():
-    with open('static/data/titles.csv',
-              encoding='utf-8', mode='r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            category = Category.objects.get(pk=row['category'])
-            Title.objects.get_or_create(id=row['id'],
-                                        name=row['name'],
-                                        year=row['year'],
-                                        category=category
-                                        )
-
-
-def genre_title():
-    with open('static/data/genre_title.csv',
-              encoding='utf-8', mode='r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            title_obj = get_object_or_404(Title, id=row['title_id'])
-            genre_obj = get_object_or_404(Genre, id=row['genre_id'])
-            title_obj.genre.add(genre_obj)
-            title_obj.save()
-
-
-def user_load():
-    with open('static/data/users.csv',
-              encoding='utf-8', mode='r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            User.objects.create(id=row['id'],
-                                username=row['username'],
-                                email=row['email'],
-                                role=row['role'],
-                                bio=row['bio'],
-                                first_name=row['first_name'],
-                                last_name=row['last_name']
-                                )
-
-
-def reviews_load():
-    with open('static/data/review.csv',
-              encoding='utf-8', mode='r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            author = User.objects.get(id=row['author'])
-            Review.objects.create(id=row['id'],
-                                  title_id=row['title_id'],
-                                  text=row['text'],
-                                  author=author,
-                                  score=row['score'],
-                                  pub_date=row['pub_date']
-                                  )
-
-
-def comment_load():
-    with open('static/data/comments.csv',
-              encoding='utf-8', mode='r') as csv_file:
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-            Comment.objects.create(id=row['id'],
-                                   text=row['text'],
-                                   pub_date=row['pub_date'],
-                                   author_id=row['author'],
-                                   review_id=row['review_id']
-                                   )
+            source = open_source(
+                options['source'], options['table'], stream,
+                options['format']
+            )
+        except (OSError, SourceError) as error:
+            raise CommandError(str(error))
+        loader = BulkLoader(
+            options['batch_size'], dry_run=options['dry_run'],
+            max_errors=options['max_errors']
+        )
+        started = time.monotonic()
+        try:
+            results = self.load_tables(source, tables, loader, options)
+        finally:
+            source.close()
+        if options['upsert']:
+            self.summary(results, time.monotonic() - started, loader)
+
+    def load_tables(self, source, tables, loader, options):
+        results = []
+        for table in tables:
+            source_file = source.find(table.name)
+            if source_file is None:
+                self.stderr.write(f'{table.name}: файл не найден')
+                continue
+            try:
+                stats = self.load(loader, table, source_file, options)
+            except (OSError, EOFError, UnicodeDecodeError, csv.Error,
+                    SourceError) as error:
+                raise CommandError(
+                    f'Не удалось прочитать {source_file}: {error}'
+                )
+            if stats is None:
+                self.stdout.write(f'{table.name}: файл не изменился')
+                continue
+            self.report(stats)
+            results.append(stats)
+        return results
+
+    def load(self, loader, table, source_file, options):
+        if not options['upsert']:
+            with source_file.rows(table.fields) as rows:
+                return loader.load(table, rows)
+        checksum = source_file.checksum()
+        if (
+            checksum is not None and not options['force']
+            and LoadedFile.is_loaded(table.name, checksum)
+        ):
+            return None
+        with source_file.rows(table.fields) as rows:
+            stats = loader.upsert(table, rows, prune=options['prune'])
+        if loader.dry_run:
+            return stats
+        if stats.skipped or checksum is None:
+            # Файл с ошибками сравнивается заново при следующем запуске:
+            # строки могут загрузиться после исправления связанных таблиц.
+            LoadedFile.objects.filter(table=table.name).delete()
+        else:
+            LoadedFile.objects.update_or_create(
+                table=table.name,
+                defaults={'source': str(source_file), 'checksum': checksum}
+            )
+        return stats
+
+    def summary(self, results, seconds, loader):
+        if loader.dry_run:
+            self.stdout.write('Итоги проверки, база не изменена:')
+        else:
+            self.stdout.write('Итоги:')
+        for stats in results:
+            self.stdout.write(f'  {stats.summary()}')
+        touched = sum(stats.touched for stats in results)
+        self.stdout.write(f'Изменено строк: {touched}, {seconds:.2f} с')
+
+    def report(self, stats):
+        self.stdout.write(str(stats))
+        for line, message in stats.errors:
+            self.stderr.write(f'  строка {line}: {message}')
@@ -0,0 +1,31 @@
+# Generated by Django 3.2 on 2026-10-18 14:29
+
+from django.db import migrations, models
+
+from reviews.search import normalize_text
+
+
+def fill_name_normalized(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    max_length = Title._meta.get_field('name_normalized').max_length
+    titles = []
+    for title in Title.objects.only('id', 'name').iterator():
+        title.name_normalized = normalize_text(title.name)[:max_length]
+        titles.append(title)
+    Title.objects.bulk_update(titles, ('name_normalized',), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='name_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=256, verbose_name='Название для поиска'),
+        ),
+        migrations.RunPython(fill_name_normalized, migrations.RunPython.noop),
+    ]
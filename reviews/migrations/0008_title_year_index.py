@@ -0,0 +1,19 @@
+# Generated by Django 3.2 on 2026-10-18 14:31
+
+from django.db import migrations, models
+import reviews.validators
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_name_normalized'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='title',
+            name='year',
+            field=models.IntegerField(blank=True, db_index=True, null=True, validators=[reviews.validators.validate_year], verbose_name='Год выпуска'),
+        ),
+    ]
@@ -2,7 +2,10 @@ from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import F
+from django.utils import timezone
 
+from .search import normalize_text
 from .validators import validate_username, validate_year
 
 DEFAULT_USER = 'user'
@@ -52,6 +55,12 @@ class User(AbstractUser):
         choices=ROLE,
         default=DEFAULT_USER
     )
+    token_version = models.PositiveIntegerField(
+        verbose_name='Версия токенов',
+        default=0
+    )
+
+    TOKEN_CLAIM_FIELDS = ('role', 'is_staff')
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -61,6 +70,32 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_claims = user.get_token_claims()
+        return user
+
+    def get_token_claims(self):
+        """Поля, которые JWT передает без обращения к базе."""
+        if any(name not in self.__dict__ for name in self.TOKEN_CLAIM_FIELDS):
+            return None
+        return tuple(getattr(self, name) for name in self.TOKEN_CLAIM_FIELDS)
+
+    def save(self, *args, **kwargs):
+        """
+        При смене роли или is_staff увеличивает token_version: выданные
+        раньше токены с устаревшими правами перестают приниматься.
+        """
+        loaded = getattr(self, '_loaded_claims', None)
+        if loaded is not None and loaded != self.get_token_claims():
+            self.token_version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'token_version'}
+        super().save(*args, **kwargs)
+        self._loaded_claims = self.get_token_claims()
+
     @property
     def is_admin(self):
         return (
@@ -108,11 +143,19 @@ class Category(CategoryGenreBase):
 class Title(models.Model):
     """Произведения, к которым пишут отзывы."""
     name = models.CharField('Название произведения', max_length=256)
+    name_normalized = models.CharField(
+        'Название для поиска',
+        max_length=256,
+        db_index=True,
+        editable=False,
+        blank=True
+    )
     year = models.IntegerField(
         'Год выпуска',
         null=True,
         validators=[validate_year],
-        blank=True
+        blank=True,
+        db_index=True
     )
     description = models.TextField('Описание', blank=True)
     genre = models.ManyToManyField(
@@ -127,14 +170,58 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категории'
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    version = models.PositiveIntegerField(
+        'Версия',
+        default=0,
+        editable=False
+    )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                fields=['-rating', 'name', 'id'],
+                name='title_rating_name_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.name_normalized = self.normalize_name(self.name)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def normalize_name(cls, name):
+        max_length = cls._meta.get_field('name_normalized').max_length
+        return normalize_text(name)[:max_length]
+
+    @classmethod
+    def touch(cls, **lookups):
+        """Отмечает изменение произведений, их отзывов и комментариев."""
+        cls.objects.filter(**lookups).update(
+            version=F('version') + 1, updated_at=timezone.now()
+        )
+
 
 class DiscussionBase(models.Model):
     """Основной класс для Reviews и Comments"""
@@ -167,9 +254,24 @@ class Review(DiscussionBase):
                     MaxValueValidator(settings.MAX_SCORE)]
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        instance._loaded_rating = (
+            loaded.get('title_id'), loaded.get('score')
+        )
+        return instance
+
     class Meta(DiscussionBase.Meta):
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx'
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=['author', 'title'],
@@ -189,3 +291,98 @@ class Comment(DiscussionBase):
     class Meta(DiscussionBase.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx'
+            ),
+        ]
+
+
+class CollectionVersion(models.Model):
+    """Версии коллекций объектов для условных запросов"""
+    name = models.CharField('Коллекция', max_length=100, primary_key=True)
+    version = models.PositiveBigIntegerField('Версия', default=0)
+    updated_at = models.DateTimeField('Дата изменения', default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Версия коллекции'
+        verbose_name_plural = 'Версии коллекций'
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
+
+    @staticmethod
+    def get_name(model):
+        return model._meta.label_lower
+
+    @classmethod
+    def bump(cls, model):
+        name = cls.get_name(model)
+        changes = {'version': F('version') + 1, 'updated_at': timezone.now()}
+        if not cls.objects.filter(name=name).update(**changes):
+            cls.objects.get_or_create(name=name)
+            cls.objects.filter(name=name).update(**changes)
+
+
+class LoadedFile(models.Model):
+    """Контрольные суммы файлов, загруженных командой load_csv"""
+    table = models.CharField('Таблица', max_length=50, primary_key=True)
+    source = models.CharField('Источник', max_length=500)
+    checksum = models.CharField('Контрольная сумма', max_length=64)
+    loaded_at = models.DateTimeField('Дата загрузки', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Загруженный файл'
+        verbose_name_plural = 'Загруженные файлы'
+
+    def __str__(self):
+        return f'{self.table}: {self.checksum}'
+
+    @classmethod
+    def is_loaded(cls, table, checksum):
+        return cls.objects.filter(table=table, checksum=checksum).exists()
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку командой send_emails"""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Не отправлено'),
+    )
+
+    subject = models.CharField('Тема', max_length=255)
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipient = models.EmailField('Получатель', max_length=254)
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка', default=timezone.now
+    )
+    claimed_by = models.CharField(
+        'Обработчик', max_length=32, blank=True, default=''
+    )
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    sent_at = models.DateTimeField('Дата отправки', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('next_attempt_at', 'pk')
+        indexes = [
+            models.Index(
+                fields=('status', 'next_attempt_at'),
+                name='outbox_status_next_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
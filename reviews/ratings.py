@@ -0,0 +1,132 @@
+from django.db import transaction
+from django.db.models import (DEFERRED, Case, Count, F, FloatField, Q, Sum,
+                              Value, When)
+from django.db.models.functions import Cast
+
+from .models import Review, Title
+
+
+def rating_value(rating_sum, rating_count):
+    """Рейтинг произведения по сумме и количеству оценок."""
+    if not rating_count:
+        return None
+    return rating_sum / rating_count
+
+
+def apply_rating_delta(title_id, score_delta, count_delta):
+    """Атомарно сдвигает агрегаты рейтинга произведения."""
+    if not score_delta and not count_delta:
+        return
+    new_sum = F('rating_sum') + score_delta
+    new_count = F('rating_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=new_sum,
+        rating_count=new_count,
+        rating=Case(
+            When(
+                Q(rating_count__gt=-count_delta),
+                then=Cast(new_sum, FloatField()) / new_count
+            ),
+            default=Value(None),
+            output_field=FloatField()
+        )
+    )
+
+
+def recalculate_title_rating(title_id):
+    """Пересчитывает агрегаты рейтинга произведения по его отзывам."""
+    aggregate = Review.objects.filter(title_id=title_id).aggregate(
+        rating_sum=Sum('score'), rating_count=Count('id')
+    )
+    rating_sum = aggregate['rating_sum'] or 0
+    rating_count = aggregate['rating_count']
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating=rating_value(rating_sum, rating_count)
+    )
+
+
+def review_saved(review, created):
+    """Учитывает в рейтинге созданный или измененный отзыв."""
+    if created:
+        apply_rating_delta(review.title_id, review.score, 1)
+        return
+    old_title_id, old_score = getattr(
+        review, '_loaded_rating', (None, None)
+    )
+    if DEFERRED in (old_title_id, old_score) or None in (
+            old_title_id, old_score):
+        recalculate_title_rating(review.title_id)
+    elif old_title_id != review.title_id:
+        apply_rating_delta(old_title_id, -old_score, -1)
+        apply_rating_delta(review.title_id, review.score, 1)
+    else:
+        apply_rating_delta(review.title_id, review.score - old_score, 0)
+    review._loaded_rating = (review.title_id, review.score)
+
+
+def review_deleted(review):
+    """Исключает удаленный отзыв из рейтинга."""
+    apply_rating_delta(review.title_id, -review.score, -1)
+
+
+def iter_rating_mismatches(chunk_size=1000):
+    """
+    Сверяет сохраненные агрегаты с отзывами пачками по chunk_size
+    произведений и возвращает расхождения.
+    """
+    last_id = 0
+    while True:
+        titles = list(
+            Title.objects.filter(pk__gt=last_id).order_by('pk').values(
+                'pk', 'rating_sum', 'rating_count', 'rating'
+            )[:chunk_size]
+        )
+        if not titles:
+            return
+        last_id = titles[-1]['pk']
+        actual = {
+            row['title_id']: (row['rating_sum'], row['rating_count'])
+            for row in Review.objects.filter(
+                title_id__in=[title['pk'] for title in titles]
+            ).values('title_id').annotate(
+                rating_sum=Sum('score'), rating_count=Count('id')
+            ).order_by()
+        }
+        for title in titles:
+            rating_sum, rating_count = actual.get(title['pk'], (0, 0))
+            rating = rating_value(rating_sum, rating_count)
+            if (
+                title['rating_sum'] != rating_sum
+                or title['rating_count'] != rating_count
+                or title['rating'] != rating
+            ):
+                yield Title(
+                    pk=title['pk'],
+                    rating_sum=rating_sum,
+                    rating_count=rating_count,
+                    rating=rating
+                )
+
+
+def rebuild_ratings(chunk_size=1000):
+    """Пересобирает агрегаты рейтинга, возвращает число исправлений."""
+    fixed = 0
+    batch = []
+    for title in iter_rating_mismatches(chunk_size):
+        batch.append(title)
+        if len(batch) >= chunk_size:
+            fixed += _save_ratings(batch)
+            batch = []
+    if batch:
+        fixed += _save_ratings(batch)
+    return fixed
+
+
+def _save_ratings(titles):
+    with transaction.atomic():
+        Title.objects.bulk_update(
+            titles, ('rating_sum', 'rating_count', 'rating')
+        )
+    return len(titles)
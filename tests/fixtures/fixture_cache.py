@@ -0,0 +1,39 @@
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(settings, tmp_path):
+    settings.CACHES = {
+        alias: {**config, 'LOCATION': tmp_path / f'cache_{alias}'}
+        if config['BACKEND'].endswith('FileBasedCache') else config
+        for alias, config in settings.CACHES.items()
+    }
+    for cache in caches.all():
+        cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def metrics_path(settings, tmp_path):
+    from api import metrics
+
+    settings.METRICS_PATH = tmp_path / 'metrics.sqlite3'
+    metrics.buffer.clear()
+    yield settings.METRICS_PATH
+    metrics.buffer.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    from api.user_cache import user_cache
+
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def throttle_path(settings, tmp_path):
+    settings.THROTTLE_PATH = tmp_path / 'throttle.sqlite3'
+    yield settings.THROTTLE_PATH
@@ -2,6 +2,8 @@ import pytest
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import AccessToken
 
+from api.authentication import ClaimsAccessToken
+
 
 @pytest.fixture
 def user_superuser(django_user_model):
@@ -79,6 +81,15 @@ def admin_client(token_admin):
     return client
 
 
+@pytest.fixture
+def claims_admin_client(admin):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(admin)}'
+    )
+    return client
+
+
 @pytest.fixture
 def token_moderator(moderator):
     token = AccessToken.for_user(moderator)
@@ -109,3 +120,12 @@ def user_client(token_user):
     client = APIClient()
     client.credentials(HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}')
     return client
+
+
+@pytest.fixture
+def claims_user_client(user):
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {ClaimsAccessToken.for_user(user)}'
+    )
+    return client
@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import caches
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import (create_comments, create_single_comment,
+                         create_single_review, create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def get_rating(self, client, title_id):
+        response = client.get(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.OK
+        return response.json()['rating']
+
+    def test_01_rating_follows_reviews(self, admin_client, user_client,
+                                       moderator_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Неплохо', 4)
+        review = create_single_review(
+            moderator_client, title_id, 'Отлично', 10
+        ).json()
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при создании отзыва.'
+        )
+
+        url = f'/api/v1/titles/{title_id}/reviews/{review["id"]}/'
+        moderator_client.patch(url, data={'score': 8})
+        assert self.get_rating(admin_client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при изменении оценки.'
+        )
+
+        moderator_client.delete(url)
+        assert self.get_rating(admin_client, title_id) == 4, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при удалении отзыва.'
+        )
+
+        user.delete()
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при удалении автора отзыва.'
+        )
+
+    def test_02_rebuild_ratings_command(self, admin_client, user_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Неплохо', 6)
+        call_command('rebuild_ratings', '--check')
+
+        Title.objects.filter(pk=title_id).update(
+            rating_sum=0, rating_count=0, rating=None
+        )
+        with pytest.raises(CommandError):
+            call_command('rebuild_ratings', '--check')
+        call_command('rebuild_ratings', '--chunk-size', '1')
+        call_command('rebuild_ratings', '--check')
+        assert self.get_rating(admin_client, title_id) == 6
+
+    def count_queries(self, client, url):
+        for cache in caches.all():
+            cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return len(context.captured_queries)
+
+    def test_03_list_queries(self, client, admin_client, user_client,
+                             moderator_client, user, moderator):
+        from reviews.models import Genre, Title
+
+        _, reviews, titles = create_comments(
+            admin_client, {user: user_client, moderator: moderator_client}
+        )
+        title_id = titles[0]['id']
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{reviews[0]["id"]}/'
+            'comments/',
+        )
+        before = [self.count_queries(client, url) for url in urls]
+        for number in range(3):
+            title = Title.objects.create(
+                name=f'Новое {number}', year=2000,
+                category=Title.objects.get(pk=title_id).category
+            )
+            title.genre.set(Genre.objects.all())
+        create_single_review(admin_client, title_id, 'Еще отзыв', 8)
+        create_single_comment(
+            admin_client, title_id, reviews[0]['id'], 'Еще комментарий'
+        )
+        after = [self.count_queries(client, url) for url in urls]
+        assert after == before, (
+            'Проверьте, что число запросов к базе при выводе списков '
+            'произведений, отзывов и комментариев не зависит от числа '
+            'объектов.'
+        )
@@ -0,0 +1,142 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+def collect_pages(client, url, key='next'):
+    names = []
+    pages = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+            'статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что при пагинации по курсору не выполняется '
+            'подсчет общего количества объектов.'
+        )
+        pages.append(data)
+        names.extend(
+            item.get('name', item.get('text')) for item in data['results']
+        )
+        url = data[key]
+    return names, pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleCursorPagination:
+    url = '/api/v1/titles/'
+
+    def test_01_cursor_pages(self, admin_client, user_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        for name in ('Бэтмен', 'Аватар'):
+            admin_client.post(self.url, data={
+                'name': name,
+                'year': 2009,
+                'genre': [genres[0]['slug']],
+                'category': categories[0]['slug'],
+            })
+        create_single_review(user_client, titles[1]['id'], 'Хорошо', 9)
+        create_single_review(user_client, titles[0]['id'], 'Неплохо', 6)
+        expected = ['Крепкий орешек', 'Терминатор', 'Аватар', 'Бэтмен']
+
+        names, pages = collect_pages(client, f'{self.url}?cursor=&limit=1')
+        assert names == expected, (
+            'Проверьте, что при пагинации по курсору произведения '
+            'отсортированы по убыванию рейтинга, затем по названию.'
+        )
+        assert pages[0]['previous'] is None
+        assert all(len(page['results']) == 1 for page in pages)
+
+        names, _ = collect_pages(client, pages[-1]['previous'], 'previous')
+        assert names == expected[-2::-1], (
+            'Проверьте, что ссылка `previous` при пагинации по курсору '
+            'возвращает предыдущие страницы.'
+        )
+
+    def test_02_offset_still_supported(self, admin_client, client):
+        create_titles(admin_client)
+        response = client.get(f'{self.url}?limit=1&offset=1')
+        data = response.json()
+        assert data['count'] == 2 and len(data['results']) == 1, (
+            'Проверьте, что без параметра `cursor` сохраняется пагинация '
+            'по `limit` и `offset`.'
+        )
+
+    def test_03_invalid_cursor(self, client):
+        response = client.get(f'{self.url}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_04_cursor_with_ranking(self, admin_client, client):
+        create_titles(admin_client)
+        for query in ('search=терминатор', 'name=крепкий'):
+            response = client.get(f'{self.url}?cursor=&{query}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что пагинация по курсору вместе с сортировкой '
+                f'по релевантности (`{query}`) возвращает ответ 400.'
+            )
+            response = client.get(f'{self.url}?{query}')
+            assert response.status_code == HTTPStatus.OK
+            assert len(response.json()['results']) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09DiscussionCursorPagination:
+
+    def test_01_reviews_cursor_and_newer_than(self, admin_client, user_client,
+                                              moderator_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        create_single_review(admin_client, titles[0]['id'], 'Первый', 5)
+        create_single_review(user_client, titles[0]['id'], 'Второй', 6)
+
+        response = client.get(f'{url}?cursor=&limit=1')
+        data = response.json()
+        assert [item['text'] for item in data['results']] == ['Второй'], (
+            'Проверьте, что при пагинации по курсору отзывы отсортированы '
+            'от новых к старым.'
+        )
+        assert data['newer'], (
+            'Проверьте, что при пагинации отзывов по курсору ответ '
+            'содержит ссылку `newer`.'
+        )
+        data = client.get(data['next']).json()
+        assert [item['text'] for item in data['results']] == ['Первый']
+        assert data['next'] is None
+
+        newer_url = client.get(f'{url}?cursor=').json()['newer']
+        data = client.get(newer_url).json()
+        assert data['results'] == [], (
+            'Проверьте, что `newer_than` не возвращает уже полученные '
+            'отзывы.'
+        )
+        create_single_review(moderator_client, titles[0]['id'], 'Третий', 7)
+        data = client.get(newer_url).json()
+        assert [item['text'] for item in data['results']] == ['Третий'], (
+            'Проверьте, что `newer_than` возвращает только новые отзывы.'
+        )
+        assert client.get(data['newer']).json()['results'] == []
+
+    def test_02_comments_cursor(self, admin_client, user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        review = create_single_review(
+            user_client, titles[0]['id'], 'Отзыв', 5
+        ).json()
+        for text in ('Первый', 'Второй', 'Третий'):
+            create_single_comment(
+                user_client, titles[0]['id'], review['id'], text
+            )
+        url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+            'comments/?cursor=&limit=2'
+        )
+        texts, _ = collect_pages(client, url)
+        assert texts == ['Третий', 'Второй', 'Первый'], (
+            'Проверьте, что при пагинации по курсору комментарии '
+            'отсортированы от новых к старым.'
+        )
@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+
+from django.db.models import F
+
+from reviews.models import CollectionVersion, Genre
+from tests.utils import create_genre, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10ResponseCache:
+
+    def check_cache_invalidation(self, admin_client, client):
+        url = '/api/v1/genres/'
+        create_genre(admin_client)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        response = client.get(url)
+        assert response['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{url}` '
+            'возвращает ответ из кэша.'
+        )
+        assert response.json()['count'] == 3
+
+        admin_client.post(url, data={'name': 'Вестерн', 'slug': 'western'})
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            f'Проверьте, что после изменения данных кэш `{url}` '
+            'сбрасывается.'
+        )
+        assert response.json()['count'] == 4
+
+    def test_01_locmem_cache(self, admin_client, client, settings):
+        settings.CACHES = {
+            'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            }
+        }
+        self.check_cache_invalidation(admin_client, client)
+
+    def test_02_file_based_cache(self, admin_client, client, settings,
+                                 tmp_path):
+        settings.CACHES = {
+            'default': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path),
+            }
+        }
+        self.check_cache_invalidation(admin_client, client)
+
+    def test_03_query_string_is_normalized(self, admin_client, client):
+        create_titles(admin_client)
+        client.get('/api/v1/titles/?year=1984&limit=5')
+        response = client.get('/api/v1/titles/?limit=5&year=1984')
+        assert response['X-Cache'] == 'HIT', (
+            'Проверьте, что ключ кэша не зависит от порядка параметров '
+            'запроса.'
+        )
+
+    def test_04_title_invalidated_by_review(self, admin_client, user_client,
+                                            client):
+        from api.cache import get_cache_stats
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+        assert client.get(url)['X-Cache'] == 'HIT'
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['rating'] == 9, (
+            'Проверьте, что кэш произведения сбрасывается при изменении '
+            'отзывов.'
+        )
+        assert get_cache_stats(['titles'])['titles'] == {
+            'hit': 1, 'miss': 2
+        }
+
+    def test_05_versions_shared_between_processes(self, admin_client,
+                                                  client):
+        url = '/api/v1/genres/'
+        create_genre(admin_client)
+        client.get(url)
+        assert client.get(url)['X-Cache'] == 'HIT'
+        # Изменение в другом процессе: сигналы этого процесса не вызываются,
+        # но версия коллекции в базе увеличивается.
+        CollectionVersion.objects.filter(
+            name=CollectionVersion.get_name(Genre)
+        ).update(version=F('version') + 1)
+        assert client.get(url)['X-Cache'] == 'MISS', (
+            'Проверьте, что версии кэша ответов общие для всех процессов.'
+        )
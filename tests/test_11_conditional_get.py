@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Genre
+from tests.utils import (create_single_comment, create_single_review,
+                         create_titles)
+
+
+def check_not_modified(client, url):
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    etag = response.get('ETag')
+    assert etag, (
+        f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+        'заголовок `ETag`.'
+    )
+    assert response.get('Last-Modified'), (
+        f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+        'заголовок `Last-Modified`.'
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        f'Проверьте, что GET-запрос к `{url}` с актуальным '
+        '`If-None-Match` возвращает ответ со статусом 304.'
+    )
+    return etag
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ConditionalGet:
+
+    def test_01_title_detail(self, admin_client, user_client, client,
+                             django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        etag = check_not_modified(client, url)
+        with django_assert_max_num_queries(2):
+            client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после добавления отзыва ETag произведения '
+            'меняется.'
+        )
+        assert response.json()['rating'] == 9
+
+    def test_02_reviews_and_comments(self, admin_client, user_client,
+                                     client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(user_client, title_id, 'Ок', 5).json()
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review["id"]}/comments/'
+        reviews_etag = check_not_modified(client, reviews_url)
+        comments_etag = check_not_modified(client, comments_url)
+
+        create_single_comment(user_client, title_id, review['id'], 'Да')
+        for url, etag in ((reviews_url, reviews_etag),
+                          (comments_url, comments_etag)):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после добавления комментария ETag `{url}` '
+                'меняется.'
+            )
+
+    def test_03_collections(self, admin_client, client):
+        create_titles(admin_client)
+        etag = check_not_modified(client, '/api/v1/genres/')
+        check_not_modified(client, '/api/v1/categories/')
+        check_not_modified(admin_client, '/api/v1/users/')
+        admin_client.post(
+            '/api/v1/genres/', data={'name': 'Вестерн', 'slug': 'western'}
+        )
+        response = client.get('/api/v1/genres/', HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 4
+
+    def test_04_missing_title(self, client):
+        response = client.get('/api/v1/titles/100500/reviews/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_05_reverse_genre_change(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/'
+        genre = Genre.objects.get(slug=titles[0]['genre'][0])
+        for change in ('remove', 'add', 'clear'):
+            etag = check_not_modified(client, url)
+            if change == 'remove':
+                genre.titles.remove(title_id)
+            elif change == 'add':
+                genre.titles.add(title_id)
+            else:
+                genre.titles.clear()
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                'Проверьте, что ETag произведения меняется при изменении '
+                f'его жанров со стороны жанра ({change}).'
+            )
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleSearch:
+    url = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.url, data=query)
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_ranked(self, admin_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        admin_client.post(self.url, data={
+            'name': 'Робокоп',
+            'year': 1987,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+            'description': 'Полицейский-киборг, почти как терминатор',
+        })
+        assert self.search(client, {'search': 'ТЕРМИНАТОР'}) == [
+            'Терминатор', 'Робокоп'
+        ], (
+            'Проверьте, что параметр `search` ищет по названию и описанию '
+            'без учета регистра, а совпадения в названии выше.'
+        )
+        assert self.search(client, {'search': 'yippie'}) == [
+            'Крепкий орешек'
+        ]
+        assert self.search(
+            client, {'search': 'терминатор', 'year': 1987}
+        ) == ['Робокоп'], (
+            'Проверьте, что параметр `search` сочетается с другими '
+            'фильтрами.'
+        )
+
+    def test_02_index_follows_updates(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            f'{self.url}{titles[1]["id"]}/', data={'name': 'Крепкий лед'}
+        )
+        assert self.search(client, {'search': 'орешек'}) == []
+        assert self.search(client, {'search': 'лед'}) == ['Крепкий лед']
+        admin_client.delete(f'{self.url}{titles[1]["id"]}/')
+        assert self.search(client, {'search': 'крепкий'}) == []
+
+    def test_03_special_characters(self, admin_client, client):
+        create_titles(admin_client)
+        assert self.search(client, {'search': 'I"ll (be'}) == [
+            'Терминатор'
+        ]
+
+    def test_04_name_filter_case_insensitive(self, admin_client, client):
+        _, categories, genres = create_titles(admin_client)
+        for name in ('Ёжик в тумане', 'Сказка о ёжике'):
+            admin_client.post(self.url, data={
+                'name': name,
+                'year': 1975,
+                'genre': [genres[1]['slug']],
+                'category': categories[0]['slug'],
+            })
+        assert self.search(client, {'name': 'ЕЖИК'}) == [
+            'Ёжик в тумане', 'Сказка о ёжике'
+        ], (
+            'Проверьте, что фильтр `name` не учитывает регистр и различие '
+            '`ё` и `е`, а совпадения с началом названия идут первыми.'
+        )
+        assert self.search(client, {'name': 'орешек'}) == ['Крепкий орешек']
@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13TitleFilters:
+    url = '/api/v1/titles/'
+
+    def get_names(self, client, query):
+        response = client.get(self.url, data=query)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.url}` с параметрами '
+            f'{query} возвращает ответ со статусом 200.'
+        )
+        return sorted(title['name'] for title in response.json()['results'])
+
+    @pytest.fixture
+    def catalogue(self, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        admin_client.post('/api/v1/genres/', data={
+            'name': 'Мелодрама', 'slug': 'melodrama'
+        })
+        admin_client.post(self.url, data={
+            'name': 'Титаник',
+            'year': 1997,
+            'genre': ['melodrama', genres[2]['slug']],
+            'category': categories[0]['slug'],
+        })
+        return titles, categories, genres
+
+    def test_01_exact_genre(self, client, catalogue):
+        assert self.get_names(client, {'genre': 'drama'}) == [
+            'Крепкий орешек', 'Титаник'
+        ], (
+            'Проверьте, что фильтр `genre` сравнивает slug целиком.'
+        )
+        assert self.get_names(client, {'genre': 'horror,melodrama'}) == [
+            'Терминатор', 'Титаник'
+        ]
+        assert self.get_names(
+            client, {'genre': 'drama,melodrama', 'genre_mode': 'all'}
+        ) == ['Титаник'], (
+            'Проверьте, что при `genre_mode=all` возвращаются произведения '
+            'со всеми указанными жанрами.'
+        )
+        assert self.get_names(
+            client, {'genre': 'drama,unknown', 'genre_mode': 'all'}
+        ) == []
+
+    def test_02_legacy_slug_lookup(self, client, catalogue):
+        assert self.get_names(client, {'genre': 'dram'}) == []
+        assert set(self.get_names(
+            client, {'genre': 'dram', 'slug_lookup': 'icontains'}
+        )) == {'Крепкий орешек', 'Титаник'}, (
+            'Проверьте, что при `slug_lookup=icontains` сохраняется поиск '
+            'по вхождению подстроки в slug.'
+        )
+
+    def test_03_category_and_years(self, client, catalogue):
+        assert self.get_names(client, {'category': 'books,films'}) == [
+            'Крепкий орешек', 'Терминатор', 'Титаник'
+        ]
+        assert self.get_names(
+            client, {'year_min': 1985, 'year_max': 1997}
+        ) == ['Крепкий орешек', 'Титаник']
+
+    def test_04_invalid_mode(self, client, catalogue):
+        response = client.get(self.url, data={'genre_mode': 'some'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_facets(self, client, catalogue,
+                       django_assert_max_num_queries):
+        url = f'{self.url}facets/'
+        with django_assert_max_num_queries(6):
+            response = client.get(url, data={'year_min': 1985})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{url}` не найден или недоступен.'
+        )
+        data = response.json()
+        assert data['count'] == 2
+        assert data['genre'] == [
+            {'slug': 'drama', 'name': 'Драма', 'count': 2},
+            {'slug': 'melodrama', 'name': 'Мелодрама', 'count': 1},
+        ], (
+            f'Проверьте, что `{url}` возвращает количество произведений '
+            'отфильтрованной выборки по жанрам.'
+        )
+        assert data['category'] == [
+            {'slug': 'books', 'name': 'Книги', 'count': 1},
+            {'slug': 'films', 'name': 'Фильм', 'count': 1},
+        ]
+        assert data['decade'] == [
+            {'decade': 1980, 'count': 1},
+            {'decade': 1990, 'count': 1},
+        ]
+        response = client.get(url, data={'year_min': 1985})
+        assert response['X-Cache'] == 'HIT'
@@ -0,0 +1,175 @@
+import csv
+import gzip
+import json
+import shutil
+import tarfile
+from datetime import datetime, timezone
+from io import BytesIO, StringIO
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from reviews.management.commands import load_csv
+from reviews.models import Comment, Genre, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14LoadCsv:
+
+    def test_01_load_and_reload(self, client):
+        call_command('load_csv', '--batch-size', '10')
+        counts = (
+            Title.objects.count(), Genre.objects.count(),
+            Title.genre.through.objects.count(), User.objects.count(),
+            Review.objects.count(), Comment.objects.count()
+        )
+        assert counts == (32, 15, 42, 5, 72, 3), (
+            'Проверьте, что команда `load_csv` загружает все таблицы.'
+        )
+        call_command('load_csv')
+        assert Review.objects.count() == 72, (
+            'Проверьте, что повторный запуск `load_csv` не дублирует '
+            'данные и не завершается ошибкой.'
+        )
+
+        review = Review.objects.get(pk=1)
+        assert review.pub_date == datetime(
+            2019, 9, 24, 21, 8, 21, 567000, tzinfo=timezone.utc
+        ), 'Проверьте, что `load_csv` сохраняет даты публикации из файла.'
+        title = Title.objects.get(pk=1)
+        assert title.name_normalized == 'побег из шоушенка'
+        call_command('rebuild_ratings', '--check')
+
+        response = client.get('/api/v1/titles/', data={'search': 'побег'})
+        assert [item['id'] for item in response.json()['results']] == [1]
+
+    @pytest.fixture
+    def data_dir(self, tmp_path, monkeypatch):
+        shutil.copytree(load_csv.DATA_DIR, tmp_path, dirs_exist_ok=True)
+        monkeypatch.setattr(load_csv, 'DATA_DIR', str(tmp_path))
+        return tmp_path
+
+    def upsert(self, *args):
+        out = StringIO()
+        call_command('load_csv', '--upsert', *args, stdout=out)
+        return out.getvalue()
+
+    def test_02_upsert(self, data_dir):
+        self.upsert()
+        assert Review.objects.count() == 72
+        output = self.upsert()
+        assert output.count('файл не изменился') == 7, (
+            'Проверьте, что `load_csv --upsert` пропускает файлы, '
+            'содержимое которых не изменилось.'
+        )
+        assert 'Изменено строк: 0' in output
+
+        path = data_dir / 'titles.csv'
+        lines = path.read_text(encoding='utf-8').splitlines(keepends=True)
+        lines[1] = lines[1].replace('Побег из Шоушенка', 'Зеленая миля')
+        path.write_text(
+            ''.join(lines[:-1]) + '999,Новинка,2020,1\n', encoding='utf-8'
+        )
+        removed = int(lines[-1].split(',')[0])
+        output = self.upsert('--prune')
+        assert 'titles: добавлено 1, изменено 1, удалено 1' in output, (
+            'Проверьте, что `load_csv --upsert` применяет только '
+            'добавленные, измененные и удаленные строки.'
+        )
+        assert output.count('файл не изменился') == 6
+        title = Title.objects.get(pk=1)
+        assert title.name_normalized == 'зеленая миля'
+        assert title.version > 0
+        assert Title.objects.filter(pk=999).exists()
+        assert not Title.objects.filter(pk=removed).exists()
+        call_command('rebuild_ratings', '--check')
+
+    def test_03_archive_formats(self, tmp_path):
+        archive = tmp_path / 'data.tar.gz'
+        with tarfile.open(archive, 'w:gz') as tar:
+            for path in sorted(Path(load_csv.DATA_DIR).glob('*.csv')):
+                target = tmp_path / path.name
+                if path.stem == 'review':
+                    target = tmp_path / 'review.csv.gz'
+                    with gzip.open(target, 'wb') as gz:
+                        gz.write(path.read_bytes())
+                elif path.stem == 'users':
+                    target = tmp_path / 'users.jsonl'
+                    with open(path, encoding='utf-8', newline='') as src:
+                        target.write_text(''.join(
+                            json.dumps(row, ensure_ascii=False) + '\n'
+                            for row in csv.DictReader(src)
+                        ), encoding='utf-8')
+                else:
+                    shutil.copy(path, target)
+                tar.add(target, arcname=f'data/{target.name}')
+        call_command('load_csv', str(archive), stdout=StringIO())
+        assert (User.objects.count(), Review.objects.count()) == (5, 72), (
+            'Проверьте, что `load_csv` читает архив с файлами .csv, '
+            '.csv.gz и .jsonl.'
+        )
+
+    def test_04_stdin(self):
+        data = 'id,name,slug\n1,Драма,drama\n2,Комедия,comedy\n'
+        call_command(
+            'load_csv', '-', '--table', 'genre', stdout=StringIO(),
+            stdin=BytesIO(data.encode())
+        )
+        assert list(Genre.objects.values_list('slug', flat=True)) == [
+            'drama', 'comedy'
+        ], 'Проверьте, что `load_csv -` читает одну таблицу из stdin.'
+
+    def test_05_dry_run(self, tmp_path):
+        (tmp_path / 'genre.jsonl').write_text(
+            '{"id": 1, "name": "Драма", "slug": "drama"}\n'
+            '{"id": 2, "name": "Комедия"\n'
+            '{"id": "x", "name": "Ужасы", "slug": "horror"}\n',
+            encoding='utf-8'
+        )
+        (tmp_path / 'genre_title.csv').write_text(
+            'id,title_id,genre_id\n1,1,1\n2,1\n', encoding='utf-8'
+        )
+        out, err = StringIO(), StringIO()
+        call_command(
+            'load_csv', str(tmp_path), '--dry-run', stdout=out, stderr=err
+        )
+        errors = err.getvalue()
+        for message in (
+            'строка 2: Некорректный JSON',
+            'строка 3: Некорректное значение `id`',
+            'строка 2: Произведение с id=1 не найден',
+            'строка 3: Неверное число полей',
+        ):
+            assert message in errors, (
+                'Проверьте, что `load_csv --dry-run` сообщает об ошибочных '
+                'строках с их номерами.'
+            )
+        assert 'genre: строк 1, пропущено 2' in out.getvalue()
+        assert not Genre.objects.exists(), (
+            'Проверьте, что `load_csv --dry-run` не изменяет базу.'
+        )
+
+    def test_06_unique_conflict(self, tmp_path):
+        (tmp_path / 'genre.csv').write_text(
+            'id,name,slug\n1,Драма,drama\n2,Еще драма,drama\n3,Комедия,comedy\n',
+            encoding='utf-8'
+        )
+        out, err = StringIO(), StringIO()
+        call_command('load_csv', str(tmp_path), stdout=out, stderr=err)
+        assert 'genre: строк 2, пропущено 1' in out.getvalue(), (
+            'Проверьте, что `load_csv` не считает загруженными строки, '
+            'нарушающие уникальность.'
+        )
+        assert 'строка 3:' in err.getvalue(), (
+            'Проверьте, что `load_csv` сообщает о строках, нарушающих '
+            'уникальность, с их номерами.'
+        )
+        assert list(Genre.objects.order_by('pk').values_list(
+            'slug', flat=True
+        )) == ['drama', 'comedy']
+        call_command('load_csv', str(tmp_path), stdout=out, stderr=err)
+        assert Genre.objects.count() == 2, (
+            'Проверьте, что повторная загрузка пропускает строки с '
+            'существующими id.'
+        )
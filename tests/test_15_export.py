@@ -0,0 +1,81 @@
+import csv
+import gzip
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Comment, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Export:
+
+    def load(self, *args):
+        call_command('load_csv', *args, stdout=StringIO())
+
+    def test_01_dump_and_load(self, tmp_path):
+        self.load()
+        Title.objects.filter(pk=1).update(description='Описание')
+        call_command('dump_csv', str(tmp_path), '--gzip', stdout=StringIO())
+        with gzip.open(tmp_path / 'review.csv.gz', 'rt',
+                       encoding='utf-8', newline='') as dump:
+            rows = list(csv.DictReader(dump))
+        assert len(rows) == 72
+        assert rows[0]['pub_date'] == '2019-09-24T21:08:21.567000Z', (
+            'Проверьте, что `dump_csv` пишет таблицы в формате static/data.'
+        )
+
+        expected = list(Review.objects.values_list(
+            'id', 'title_id', 'author_id', 'text', 'score', 'pub_date'
+        ))
+        for model in (Comment, Review, Title, User):
+            model.objects.all().delete()
+        self.load(str(tmp_path))
+        assert list(Review.objects.values_list(
+            'id', 'title_id', 'author_id', 'text', 'score', 'pub_date'
+        )) == expected, (
+            'Проверьте, что файлы `dump_csv` загружаются командой `load_csv` '
+            'без потерь.'
+        )
+        assert Comment.objects.count() == 3
+        assert Title.objects.get(pk=1).description == 'Описание', (
+            'Проверьте, что `dump_csv` выгружает описания произведений.'
+        )
+
+    def test_02_export_endpoints(self, admin_client, user_client, client):
+        self.load()
+        url = '/api/v1/export/titles/'
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+            f'Проверьте, что `{url}` доступен только администратору.'
+        )
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            f'Проверьте, что `{url}` отдает данные потоково.'
+        )
+        rows = list(csv.DictReader(StringIO(
+            b''.join(response.streaming_content).decode()
+        )))
+        assert len(rows) == Title.objects.count()
+        title = Title.objects.get(pk=1)
+        assert rows[0] == {
+            'id': '1',
+            'name': title.name,
+            'year': str(title.year),
+            'category': title.category.slug,
+            'genres': ';'.join(sorted(
+                title.genre.values_list('slug', flat=True)
+            )),
+            'rating': str(title.rating),
+            'rating_count': str(title.rating_count),
+        }
+
+        response = admin_client.get('/api/v1/export/reviews/')
+        rows = list(csv.DictReader(StringIO(
+            b''.join(response.streaming_content).decode()
+        )))
+        assert len(rows) == 72
+        assert rows[0]['author'] == 'bingobongo'
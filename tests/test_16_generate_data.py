@@ -0,0 +1,76 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Count, F
+
+from reviews.models import Comment, Review, Title, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16GenerateData:
+
+    def generate(self, seed):
+        call_command(
+            'generate_data', '--seed', str(seed), '--users', '50',
+            '--titles', '40', '--reviews', '300', '--comments-per-review',
+            '0.5', '--batch-size', '64', stdout=StringIO()
+        )
+        return (
+            list(User.objects.order_by('pk').values_list(
+                'username', 'first_name', 'role'
+            )),
+            list(Title.objects.order_by('pk').values_list(
+                'name', 'year', 'category__slug', 'rating'
+            )),
+            list(Review.objects.order_by('pk').values_list(
+                'title_id', 'author_id', 'score', 'text', 'pub_date'
+            )),
+            list(Comment.objects.order_by('pk').values_list(
+                'review_id', 'author_id', 'pub_date'
+            )),
+        )
+
+    def clear(self):
+        User.objects.all().delete()
+        Title.objects.all().delete()
+
+    def test_01_deterministic(self):
+        first = self.generate(seed=1)
+        assert len(first[2]) == 300
+        assert len(first[3]) > 0
+        self.clear()
+        assert self.generate(seed=1) == first, (
+            'Проверьте, что генератор при одинаковом `--seed` создает '
+            'одинаковые данные.'
+        )
+        self.clear()
+        assert self.generate(seed=2)[2] != first[2]
+
+    def test_02_distribution(self):
+        self.generate(seed=1)
+        counts = sorted(Title.objects.annotate(
+            total=Count('reviews')
+        ).values_list('total', flat=True), reverse=True)
+        assert counts[0] > 5 * counts[len(counts) // 2], (
+            'Проверьте, что число отзывов на произведение распределено '
+            'неравномерно (по Ципфу).'
+        )
+        assert not Comment.objects.filter(
+            pub_date__lt=F('review__pub_date')
+        ).exists(), 'Комментарий не может быть раньше отзыва.'
+        call_command('rebuild_ratings', '--check', stdout=StringIO())
+
+    def test_03_username_conflict(self):
+        user = User.objects.create(
+            username='someone', email='someone@yamdb.fake'
+        )
+        user.username = f'generated_user_{user.pk + 1}'
+        user.save()
+        with pytest.raises(CommandError, match='users'):
+            self.generate(seed=1)
+        assert not Review.objects.exists(), (
+            'Проверьте, что `generate_data` останавливается, если '
+            'пользователя не удалось записать, а не создает отзывы '
+            'с нарушенными связями.'
+        )
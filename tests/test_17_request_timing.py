@@ -0,0 +1,81 @@
+import json
+import logging
+import time
+
+import pytest
+from rest_framework.serializers import Serializer
+
+from api.serializers import TitleInfoSerializer
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17RequestTiming:
+    url = '/api/v1/titles/'
+
+    def test_01_disabled_by_default(self, client):
+        response = client.get(self.url)
+        assert 'X-DB-Queries' not in response, (
+            'Проверьте, что замер запросов по умолчанию выключен.'
+        )
+
+    def test_02_headers_and_log(self, admin_client, client, settings,
+                                caplog, monkeypatch):
+        create_titles(admin_client)
+        settings.REQUEST_TIMING = True
+        monkeypatch.setattr(logging.getLogger('api.timing'), 'propagate', True)
+        with caplog.at_level(logging.INFO, logger='api.timing'):
+            response = client.get(self.url)
+        queries = int(response['X-DB-Queries'])
+        assert queries > 0, (
+            'Проверьте, что заголовок `X-DB-Queries` содержит число '
+            'запросов к базе данных.'
+        )
+        timing = response['Server-Timing']
+        for metric in ('db;dur=', 'serialize;dur=', 'render;dur=',
+                       'total;dur='):
+            assert metric in timing, (
+                f'Проверьте, что заголовок `Server-Timing` содержит {metric}'
+            )
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['view'] == 'TitleViewSet.list'
+        assert record['queries'] == queries
+        assert record['status'] == 200
+        assert record['total_ms'] >= record['db_ms']
+        assert record['serialize_ms'] > 0, (
+            'Проверьте, что `serialize_ms` содержит время сериализаторов.'
+        )
+        assert record['render_ms'] > 0, (
+            'Проверьте, что время рендеринга ответа замеряется отдельно '
+            'в `render_ms`.'
+        )
+        assert record['total_ms'] >= (
+            record['serialize_ms'] + record['render_ms']
+        )
+
+    def test_03_serializer_time(self, admin_client, client, settings,
+                                monkeypatch):
+        create_titles(admin_client)
+        settings.REQUEST_TIMING = True
+        calls = []
+        to_representation = Serializer.to_representation
+
+        def slow_to_representation(self, instance):
+            if isinstance(self, TitleInfoSerializer):
+                calls.append(instance)
+                time.sleep(0.01)
+            return to_representation(self, instance)
+
+        monkeypatch.setattr(
+            Serializer, 'to_representation', slow_to_representation
+        )
+        response = client.get(self.url)
+        serialize = dict(
+            part.split(';dur=') for part in
+            (item.split(';desc')[0].strip()
+             for item in response['Server-Timing'].split(','))
+        )['serialize']
+        assert float(serialize) >= 10 * len(calls) > 0, (
+            'Проверьте, что `serialize` в Server-Timing содержит время '
+            'сериализаторов, вызванных в представлении.'
+        )
@@ -0,0 +1,138 @@
+import logging
+import multiprocessing
+
+import pytest
+
+from api import metrics
+from tests.utils import create_titles
+
+
+def parse(text):
+    values = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            series, value = line.rsplit(' ', 1)
+            values[series] = float(value)
+    return values
+
+
+def child_process():
+    metrics.JWT_TOKENS.inc(5, event='issued')
+    metrics.buffer.flush()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Metrics:
+    url = '/metrics'
+    token = 'secret'
+
+    @pytest.fixture(autouse=True)
+    def metrics_token(self, settings):
+        settings.METRICS_TOKEN = self.token
+
+    def scrape(self, client):
+        return client.get(
+            self.url, HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+
+    def test_01_requests(self, admin_client, client):
+        create_titles(admin_client)
+        client.get('/api/v1/titles/')
+        client.get('/api/v1/titles/')
+        response = self.scrape(client)
+        assert response.status_code == 200, (
+            f'Проверьте, что эндпоинт `{self.url}` доступен.'
+        )
+        assert response['Content-Type'].startswith('text/plain'), (
+            'Проверьте, что метрики отдаются в текстовом формате Prometheus.'
+        )
+        text = response.content.decode()
+        assert '# TYPE yamdb_http_requests_total counter' in text
+        assert '# TYPE yamdb_http_request_duration_seconds histogram' in text
+        values = parse(text)
+        labels = 'view="TitleViewSet",action="list"'
+        assert values[
+            f'yamdb_http_requests_total{{{labels},method="GET",'
+            f'status="200"}}'
+        ] == 2, 'Проверьте, что запросы считаются по представлению и действию.'
+        assert values[
+            f'yamdb_http_request_duration_seconds_count{{{labels}}}'
+        ] == 2
+        assert values[
+            f'yamdb_http_request_duration_seconds_bucket{{{labels},'
+            f'le="+Inf"}}'
+        ] == 2
+        assert values[f'yamdb_http_request_db_queries_sum{{{labels}}}'] > 0, (
+            'Проверьте, что считается число запросов к базе данных.'
+        )
+        assert values[
+            'yamdb_response_cache_total{view="TitleViewSet",action="list",'
+            'outcome="miss"}'
+        ] == 1
+        assert values[
+            'yamdb_response_cache_total{view="TitleViewSet",action="list",'
+            'outcome="hit"}'
+        ] == 1, 'Проверьте, что считаются попадания в кэш ответов.'
+
+    def test_02_auth_events(self, client, admin_client):
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'metrics_user', 'email': 'metrics@yamdb.fake'
+        })
+        client.get('/api/v1/users/me/', HTTP_AUTHORIZATION='Bearer invalid')
+        admin_client.get('/api/v1/users/me/')
+        values = parse(self.scrape(client).content.decode())
+        assert values['yamdb_emails_total{state="sent"}'] == 1, (
+            'Проверьте, что считаются отправленные письма.'
+        )
+        assert values['yamdb_jwt_total{event="rejected"}'] == 1, (
+            'Проверьте, что считаются отклоненные JWT-токены.'
+        )
+        assert values['yamdb_jwt_total{event="validated"}'] >= 1
+
+    def test_03_aggregated_across_processes(self, client):
+        metrics.JWT_TOKENS.inc(2, event='issued')
+        process = multiprocessing.get_context('fork').Process(
+            target=child_process
+        )
+        process.start()
+        process.join()
+        values = parse(self.scrape(client).content.decode())
+        assert values['yamdb_jwt_total{event="issued"}'] == 7, (
+            'Проверьте, что метрики суммируются по всем процессам.'
+        )
+
+    def test_04_token_and_disabled(self, client, settings):
+        assert client.get(self.url).status_code == 403, (
+            'Проверьте, что при заданном METRICS_TOKEN без токена '
+            'возвращается 403.'
+        )
+        assert self.scrape(client).status_code == 200
+        settings.METRICS_TOKEN = None
+        assert client.get(self.url).status_code == 404, (
+            'Проверьте, что без METRICS_TOKEN метрики не публикуются, '
+            'если DEBUG выключен.'
+        )
+        settings.DEBUG = True
+        assert client.get(self.url).status_code == 200
+        settings.METRICS_ENABLED = False
+        assert client.get(self.url).status_code == 404
+
+    def test_05_flush_failure(self, client, settings, tmp_path, caplog):
+        settings.METRICS_FLUSH_INTERVAL = 0
+        settings.METRICS_PATH = tmp_path / 'missing' / 'metrics.sqlite3'
+        with caplog.at_level(logging.ERROR, logger='api.metrics'):
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200, (
+            'Проверьте, что ошибка записи метрик не ломает запрос.'
+        )
+        assert 'Не удалось записать метрики' in caplog.text
+        settings.METRICS_PATH = tmp_path / 'metrics.sqlite3'
+        settings.METRICS_FLUSH_INTERVAL = 60
+        values = parse(self.scrape(client).content.decode())
+        assert values[
+            'yamdb_http_requests_total{view="TitleViewSet",action="list",'
+            'method="GET",status="200"}'
+        ] == 1, (
+            'Проверьте, что приращения, которые не удалось записать, '
+            'остаются в буфере до следующего сброса.'
+        )
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Profiling:
+    url = '/api/v1/titles/'
+
+    def get_report(self, client, response):
+        assert 'X-Profile-Id' in response, (
+            'Проверьте, что профилированный ответ содержит заголовок '
+            '`X-Profile-Id`.'
+        )
+        report = client.get(
+            f'/api/v1/profiles/{response["X-Profile-Id"]}/'
+        )
+        assert report.status_code == 200, (
+            'Проверьте, что отчет профилирования доступен администратору.'
+        )
+        assert response['X-Profile-Url'].endswith(
+            f'/api/v1/profiles/{response["X-Profile-Id"]}/'
+        )
+        return report.content.decode()
+
+    def test_01_sql_trace(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.get(self.url + '?_profile=sql')
+        assert response.status_code == 200
+        report = self.get_report(admin_client, response)
+        assert 'FROM "reviews_title"' in report, (
+            'Проверьте, что трасса SQL содержит выполненные запросы.'
+        )
+        assert 'план:' in report and 'SCAN' in report, (
+            'Проверьте, что для запросов выводится EXPLAIN QUERY PLAN.'
+        )
+
+    def test_02_cprofile(self, admin_client):
+        response = admin_client.get(self.url + '?_profile=cprofile')
+        report = self.get_report(admin_client, response)
+        assert 'cumulative' in report, (
+            'Проверьте, что профиль cProfile отсортирован по cumulative.'
+        )
+
+    def test_03_not_for_users(self, admin_client, user_client, client):
+        for api_client in (user_client, client):
+            response = api_client.get(self.url + '?_profile=sql')
+            assert response.status_code == 200
+            assert 'X-Profile-Id' not in response, (
+                'Проверьте, что профилирование доступно только '
+                'администратору.'
+            )
+        response = admin_client.get(self.url + '?_profile=sql')
+        profile_url = f'/api/v1/profiles/{response["X-Profile-Id"]}/'
+        assert user_client.get(profile_url).status_code == 403, (
+            'Проверьте, что отчет недоступен пользователю без прав '
+            'администратора.'
+        )
+        assert admin_client.get(
+            '/api/v1/profiles/unknown/'
+        ).status_code == 404
+
+    def test_04_reports_on_disk(self, admin_client, settings):
+        response = admin_client.get(self.url + '?_profile=sql')
+        location = Path(
+            settings.CACHES[settings.PROFILE_CACHE_ALIAS]['LOCATION']
+        )
+        assert list(location.glob('*.djcache')), (
+            'Проверьте, что отчеты профилирования хранятся в файлах, '
+            'общих для всех процессов сервера.'
+        )
+        assert admin_client.get(
+            f'/api/v1/profiles/{response["X-Profile-Id"]}/'
+        ).status_code == 200
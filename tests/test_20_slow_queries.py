@@ -0,0 +1,120 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+
+from api import slow_queries
+from tests.utils import create_titles
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    settings.SLOW_QUERY_THRESHOLD_MS = 0
+    settings.SLOW_QUERY_LOG = tmp_path / 'slow.log'
+    slow_queries.install(sender=None, connection=connection)
+    yield settings.SLOW_QUERY_LOG
+    connection.execute_wrappers[:] = [
+        wrapper for wrapper in connection.execute_wrappers
+        if not isinstance(wrapper, slow_queries.SlowQueryLogger)
+    ]
+    for handler in slow_queries.logger.handlers[:]:
+        slow_queries.logger.removeHandler(handler)
+        handler.close()
+
+
+def read_log(path):
+    with open(path, encoding='utf-8') as log_file:
+        return [json.loads(line) for line in log_file]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20SlowQueries:
+
+    def test_01_entries(self, admin_client, slow_log):
+        create_titles(admin_client)
+        admin_client.get('/api/v1/titles/?year=1950')
+        entries = read_log(slow_log)
+        titles = [
+            entry for entry in entries
+            if entry['view'] == 'TitleViewSet.list'
+            and 'reviews_title' in entry['sql']
+        ]
+        assert titles, (
+            'Проверьте, что запросы дольше порога записываются в журнал '
+            'вместе с представлением.'
+        )
+        entry = titles[0]
+        for field in ('fingerprint', 'normalized', 'params', 'stack',
+                      'plan', 'duration_ms'):
+            assert field in entry, (
+                f'Проверьте, что запись журнала содержит поле `{field}`.'
+            )
+        assert entry['plan'], (
+            'Проверьте, что в журнал пишется EXPLAIN QUERY PLAN.'
+        )
+
+    def test_02_redact(self, client, slow_log):
+        client.post('/api/v1/auth/signup/', data={
+            'username': 'slow_user', 'email': 'secret_mail@yamdb.fake'
+        })
+        with open(slow_log, encoding='utf-8') as log_file:
+            text = log_file.read()
+        assert 'slow_user' in text
+        assert 'secret_mail@yamdb.fake' not in text, (
+            'Проверьте, что email не попадает в журнал медленных запросов.'
+        )
+
+    def test_03_fingerprint(self):
+        first = slow_queries.fingerprint(
+            'SELECT * FROM "t" WHERE "id" IN (%s, %s) AND "name" = \'a\''
+        )
+        second = slow_queries.fingerprint(
+            'SELECT *  FROM "t" WHERE "id" IN (%s) AND "name" = \'b\''
+        )
+        assert first == second, (
+            'Проверьте, что отпечаток не зависит от значений и числа '
+            'элементов в IN.'
+        )
+
+    def test_04_command(self, admin_client, slow_log):
+        create_titles(admin_client)
+        for year in range(3):
+            admin_client.get(f'/api/v1/titles/?year={year}')
+        admin_client.get('/api/v1/titles/')
+        output = StringIO()
+        call_command(
+            'slow_queries', log=str(slow_log), sort='count', plans=True,
+            stdout=output
+        )
+        report = output.getvalue()
+        assert 'TitleViewSet.list' in report, (
+            'Проверьте, что команда slow_queries выводит представления.'
+        )
+        assert 'план:' in report
+        output = StringIO()
+        call_command(
+            'slow_queries', log=str(slow_log), full_scans=True,
+            stdout=output
+        )
+        assert 'ПОЛНЫЙ ПРОСМОТР' in output.getvalue()
+
+    def test_05_failed_queries(self, slow_log):
+        with pytest.raises(DatabaseError):
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT * FROM "missing_table"')
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        entries = read_log(slow_log)
+        assert not [
+            entry for entry in entries if 'missing_table' in entry['sql']
+        ], (
+            'Проверьте, что запросы, завершившиеся ошибкой, не записываются '
+            'в журнал и для них не выполняется EXPLAIN.'
+        )
+        assert entries[-1]['sql'] == 'SELECT 1'
+        assert entries[-1]['view'] is None, (
+            'Проверьте, что вне обработки запроса представление не '
+            'указывается.'
+        )
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+
+FAILING_BACKEND = 'tests.test_21_outbox.FailingBackend'
+
+
+class FailingBackend:
+    """Почтовый бэкенд, к которому не удается подключиться."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        raise ConnectionRefusedError('SMTP недоступен')
+
+    def __exit__(self, *args):
+        pass
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Outbox:
+    url = '/api/v1/auth/signup/'
+
+    def signup(self, client, number):
+        return client.post(self.url, data={
+            'username': f'outbox_{number}',
+            'email': f'outbox_{number}@yamdb.fake',
+        })
+
+    def test_01_signup_enqueues(self, client, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        outbox_before = len(mail.outbox)
+        response = self.signup(client, 1)
+        assert response.status_code == 200
+        assert len(mail.outbox) == outbox_before, (
+            'Проверьте, что `signup` не отправляет письмо во время запроса.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.PENDING
+        assert email.recipient == 'outbox_1@yamdb.fake'
+
+    def test_02_worker_sends_batches(self, client, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        for number in range(5):
+            self.signup(client, number)
+        output = StringIO()
+        call_command(
+            'send_emails', once=True, batch_size=2, workers=2,
+            interval=0.01, stdout=output, stderr=StringIO()
+        )
+        assert 'Отправлено писем: 5' in output.getvalue()
+        assert sorted(
+            recipient for message in mail.outbox for recipient in message.to
+        ) == [f'outbox_{number}@yamdb.fake' for number in range(5)], (
+            'Проверьте, что несколько потоков send_emails отправляют '
+            'каждое письмо из очереди ровно один раз.'
+        )
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.SENT
+        ).exists()
+        call_command('send_emails', once=True, stdout=StringIO())
+        assert len(mail.outbox) == 5, (
+            'Проверьте, что отправленные письма не отправляются повторно.'
+        )
+
+    def test_03_retry_with_backoff(self, client, settings):
+        settings.EMAIL_OUTBOX_EAGER = False
+        settings.EMAIL_OUTBOX_BACKOFF = 10
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        self.signup(client, 1)
+        started = timezone.now()
+        call_command(
+            'send_emails', once=True, backend=FAILING_BACKEND,
+            stdout=StringIO()
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.PENDING, (
+            'Проверьте, что при ошибке почтового сервера письмо остается '
+            'в очереди.'
+        )
+        assert email.attempts == 1
+        assert 'SMTP недоступен' in email.last_error
+        assert email.next_attempt_at >= started + timedelta(seconds=10), (
+            'Проверьте, что повторная попытка откладывается.'
+        )
+        email.next_attempt_at = timezone.now()
+        email.save()
+        call_command(
+            'send_emails', once=True, backend=FAILING_BACKEND,
+            stdout=StringIO()
+        )
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.FAILED, (
+            'Проверьте, что после EMAIL_OUTBOX_MAX_ATTEMPTS попыток письмо '
+            'помечается как не отправленное.'
+        )
+
+    def test_04_eager(self, client):
+        outbox_before = len(mail.outbox)
+        self.signup(client, 1)
+        assert len(mail.outbox) == outbox_before + 1
+        assert OutgoingEmail.objects.get().status == OutgoingEmail.SENT
@@ -0,0 +1,150 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import TOKEN_VERSION_KEY, ClaimsAccessToken
+from tests.utils import create_titles
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "reviews_user"' in query['sql']
+    ]
+
+
+def client_for(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ClaimsAuth:
+
+    def test_01_token_claims(self, client, user):
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username,
+            'confirmation_code': default_token_generator.make_token(user),
+        })
+        token = AccessToken(response.json()['token'])
+        for claim, value in (('role', 'user'), ('is_staff', False),
+                             ('token_version', 0)):
+            assert token[claim] == value, (
+                f'Проверьте, что токен содержит утверждение `{claim}`.'
+            )
+
+    def test_02_no_user_query(self, claims_admin_client):
+        create_titles(claims_admin_client)
+        claims_admin_client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            response = claims_admin_client.post('/api/v1/genres/', data={
+                'name': 'Новый жанр', 'slug': 'new-genre'
+            })
+        assert response.status_code == 201
+        assert not user_queries(context), (
+            'Проверьте, что проверка прав администратора не читает '
+            'пользователя из базы данных.'
+        )
+
+    def test_03_writes(self, admin_client, claims_user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = claims_user_client.post(
+            url, data={'text': 'Текст', 'score': 7}
+        )
+        assert response.status_code == 201
+        assert response.json()['author'] == user.username
+        review_url = f'{url}{response.json()["id"]}/'
+        response = claims_user_client.patch(
+            review_url, data={'text': 'Правка'}
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что автор может изменить свой отзыв.'
+        )
+        me = claims_user_client.get('/api/v1/users/me/').json()
+        assert me['bio'] == 'user bio'
+
+    def test_04_role_change_revokes(self, admin_client, claims_user_client,
+                                    user):
+        me_url = '/api/v1/users/me/'
+        assert claims_user_client.get(me_url).status_code == 200
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == 200
+        assert claims_user_client.get(me_url).status_code == 401, (
+            'Проверьте, что после смены роли старый токен отклоняется.'
+        )
+        user.refresh_from_db()
+        new_client = client_for(ClaimsAccessToken.for_user(user))
+        assert new_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что новый токен учитывает новую роль.'
+        )
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'bio': 'Новое био'}
+        )
+        assert new_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что изменение других полей не отзывает токены.'
+        )
+
+    def test_05_deleted_user(self, admin_client, claims_user_client, user):
+        me_url = '/api/v1/users/me/'
+        assert claims_user_client.get(me_url).status_code == 200
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert claims_user_client.get(me_url).status_code == 401, (
+            'Проверьте, что токен удаленного пользователя отклоняется.'
+        )
+
+    def test_06_legacy_token(self, user):
+        response = client_for(AccessToken.for_user(user)).get(
+            '/api/v1/users/me/'
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что токены без утверждений проверяются по базе.'
+        )
+
+    def test_07_username_change(self, claims_user_client):
+        url = '/api/v1/users/me/'
+        response = claims_user_client.patch(url, data={'username': 'renamed'})
+        assert response.status_code == 200
+        assert response.json()['username'] == 'renamed', (
+            'Проверьте, что users/me возвращает новое имя пользователя.'
+        )
+        response = claims_user_client.get(url)
+        assert response.status_code == 200, (
+            'Проверьте, что смена имени не отзывает токен пользователя.'
+        )
+        assert response.json()['username'] == 'renamed', (
+            'Проверьте, что имя пользователя берется не из токена.'
+        )
+
+    def test_08_demotion_in_other_process(self, django_user_model,
+                                          settings):
+        admin = django_user_model.objects.create_user(
+            username='OtherAdmin', email='other_admin@yamdb.fake',
+            role='admin'
+        )
+        admin_client = client_for(ClaimsAccessToken.for_user(admin))
+        url = '/api/v1/users/'
+        assert admin_client.get(url).status_code == 200
+        # Понижение в другом процессе: сигналы этого процесса не
+        # вызываются, новая версия записывается в общий кэш.
+        django_user_model.objects.filter(pk=admin.pk).update(
+            role='user', token_version=F('token_version') + 1
+        )
+        other_process = caches.create_connection(
+            settings.TOKEN_VERSION_CACHE_ALIAS
+        )
+        other_process.set(
+            TOKEN_VERSION_KEY.format(admin.pk), admin.token_version + 1
+        )
+        assert admin_client.get(url).status_code == 401, (
+            'Проверьте, что версии токенов хранятся в кэше, общем для всех '
+            'процессов сервера.'
+        )
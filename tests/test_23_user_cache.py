@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import user_cache as user_cache_module
+from api.user_cache import user_cache
+from reviews.models import User
+
+
+def user_queries(context):
+    return [
+        query['sql'] for query in context.captured_queries
+        if 'FROM "reviews_user"' in query['sql']
+    ]
+
+
+def db_client(user):
+    """Клиент с токеном без утверждений: пользователь читается из базы."""
+    client = APIClient()
+    client.credentials(
+        HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}'
+    )
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23UserCache:
+    url = '/api/v1/users/me/'
+
+    def test_01_cached_between_requests(self, user):
+        client = db_client(user)
+        client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert not user_queries(context), (
+            'Проверьте, что пользователь берется из кэша процесса.'
+        )
+        stats = user_cache.stats()
+        assert stats['hits'] == 1 and stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+
+    def test_02_invalidated_on_change(self, admin_client, user):
+        client = db_client(user)
+        response = client.patch(self.url, data={'bio': 'Новое био'})
+        assert response.status_code == 200
+        assert client.get(self.url).json()['bio'] == 'Новое био', (
+            'Проверьте, что изменение через users/me сбрасывает кэш.'
+        )
+        assert client.get('/api/v1/users/').status_code == 403
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что смена роли администратором сбрасывает кэш.'
+        )
+        admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert client.get(self.url).status_code == 401
+
+    def test_03_ttl(self, user, settings, monkeypatch):
+        settings.USER_CACHE_TTL = 30
+        client = db_client(user)
+        client.get(self.url)
+        # Изменение в другом процессе: сигнал сюда не доходит.
+        User.objects.filter(pk=user.pk).update(bio='Из другого процесса')
+        assert client.get(self.url).json()['bio'] == 'user bio'
+        now = user_cache_module.time.monotonic()
+        monkeypatch.setattr(
+            user_cache_module.time, 'monotonic', lambda: now + 31
+        )
+        assert client.get(self.url).json()['bio'] == 'Из другого процесса', (
+            'Проверьте, что запись кэша не живет дольше USER_CACHE_TTL.'
+        )
+
+    def test_04_bounded(self, settings, django_user_model):
+        settings.USER_CACHE_SIZE = 2
+        users = [
+            django_user_model.objects.create(
+                username=f'cached_{number}',
+                email=f'cached_{number}@yamdb.fake'
+            )
+            for number in range(3)
+        ]
+        for user in users:
+            db_client(user).get(self.url)
+        stats = user_cache.stats()
+        assert stats['size'] == 2, (
+            'Проверьте, что размер кэша ограничен USER_CACHE_SIZE.'
+        )
+        assert stats['evictions'] == 1
@@ -0,0 +1,167 @@
+import multiprocessing
+
+import pytest
+
+from api.throttling import store
+
+RATES = {
+    'signup_address': '3/min',
+    'signup_identity': '2/min',
+    'token_address': '3/min',
+    'token_identity': '2/min',
+    'writes': '2/min',
+}
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': RATES
+    }
+
+
+def take_in_child(capacity, rate):
+    store.take(['shared'], capacity, rate)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24Throttling:
+    signup_url = '/api/v1/auth/signup/'
+    token_url = '/api/v1/auth/token/'
+
+    def signup(self, client, username, email):
+        return client.post(
+            self.signup_url, data={'username': username, 'email': email}
+        )
+
+    def assert_throttled(self, response, message):
+        assert response.status_code == 429, message
+        assert int(response['Retry-After']) > 0, (
+            'Проверьте, что ответ 429 содержит заголовок `Retry-After`.'
+        )
+
+    def test_01_signup_identity(self, client, rates):
+        for _ in range(2):
+            response = self.signup(client, 'same_user', 'same@yamdb.fake')
+            assert response.status_code == 200
+        self.assert_throttled(
+            self.signup(client, 'same_user', 'other@yamdb.fake'),
+            'Проверьте, что повторные регистрации одного username '
+            'ограничены.'
+        )
+
+    def test_02_signup_address(self, client, rates):
+        for number in range(3):
+            response = self.signup(
+                client, f'user_{number}', f'user_{number}@yamdb.fake'
+            )
+            assert response.status_code == 200
+        self.assert_throttled(
+            self.signup(client, 'user_9', 'user_9@yamdb.fake'),
+            'Проверьте, что регистрации с одного адреса ограничены.'
+        )
+        response = client.post(
+            self.signup_url,
+            data={'username': 'user_10', 'email': 'user_10@yamdb.fake'},
+            REMOTE_ADDR='10.0.0.2'
+        )
+        assert response.status_code == 200, (
+            'Проверьте, что ограничение действует для каждого адреса '
+            'отдельно.'
+        )
+
+    def test_03_token(self, client, rates, user):
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for _ in range(2):
+            assert client.post(self.token_url, data=data).status_code == 400
+        self.assert_throttled(
+            client.post(self.token_url, data=data),
+            'Проверьте, что подбор кода подтверждения ограничен.'
+        )
+
+    def test_04_writes(self, admin_client, user_superuser_client, rates):
+        for number in range(2):
+            response = admin_client.post('/api/v1/genres/', data={
+                'name': f'Жанр {number}', 'slug': f'genre-{number}'
+            })
+            assert response.status_code == 201
+        self.assert_throttled(
+            admin_client.post('/api/v1/genres/', data={
+                'name': 'Лишний', 'slug': 'extra'
+            }),
+            'Проверьте, что изменяющие запросы ограничены.'
+        )
+        assert admin_client.get('/api/v1/genres/').status_code == 200, (
+            'Проверьте, что чтение не ограничивается.'
+        )
+        response = user_superuser_client.post('/api/v1/genres/', data={
+            'name': 'Жанр', 'slug': 'genre-s'
+        })
+        assert response.status_code == 201, (
+            'Проверьте, что корзина у каждого пользователя своя.'
+        )
+
+    def test_05_shared_between_processes(self, rates):
+        process = multiprocessing.get_context('fork').Process(
+            target=take_in_child, args=(1, 1 / 60)
+        )
+        process.start()
+        process.join()
+        assert store.take(['shared'], 1, 1 / 60) > 0, (
+            'Проверьте, что корзины общие для всех процессов.'
+        )
+
+    def test_06_disabled(self, client, settings, rates):
+        settings.THROTTLE_ENABLED = False
+        for _ in range(4):
+            response = self.signup(client, 'same_user', 'same@yamdb.fake')
+            assert response.status_code == 200
+
+    def test_07_list_body(self, client, rates):
+        for url in (self.signup_url, self.token_url):
+            response = client.post(
+                url, data=[{'username': 'list_user'}],
+                content_type='application/json'
+            )
+            assert response.status_code == 400, (
+                'Проверьте, что тело-массив возвращает ошибку 400, а не 500.'
+            )
+
+    def test_08_rejected_not_charged(self, client, rates):
+        for _ in range(2):
+            response = self.signup(client, 'same_user', 'same@yamdb.fake')
+            assert response.status_code == 200
+        self.assert_throttled(
+            self.signup(client, 'same_user', 'free@yamdb.fake'),
+            'Проверьте, что повторные регистрации одного username '
+            'ограничены.'
+        )
+        response = self.signup(client, 'free_user', 'free@yamdb.fake')
+        assert response.status_code == 200, (
+            'Проверьте, что отклоненный запрос не забирает токены из '
+            'корзин адреса и email.'
+        )
+        response = client.post(self.signup_url, data={
+            'username': 'free_user', 'email': 'free@yamdb.fake'
+        }, REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == 200
+        self.assert_throttled(
+            self.signup(client, 'other_user', 'other@yamdb.fake'),
+            'Проверьте, что регистрации с одного адреса ограничены.'
+        )
+
+    def test_09_spoofed_forwarded_for(self, client, rates):
+        for number in range(4):
+            response = client.post(
+                self.signup_url,
+                data={
+                    'username': f'user_{number}',
+                    'email': f'user_{number}@yamdb.fake'
+                },
+                HTTP_X_FORWARDED_FOR=f'10.1.0.{number}'
+            )
+        self.assert_throttled(
+            response,
+            'Проверьте, что ограничение по адресу нельзя обойти подменой '
+            'заголовка X-Forwarded-For.'
+        )
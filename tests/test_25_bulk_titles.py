@@ -0,0 +1,121 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from tests.utils import create_categories, create_genre
+
+
+def title_items(count):
+    return [
+        {
+            'name': f'Пакетное произведение {number}',
+            'year': 1990 + number,
+            'genre': ['horror', 'comedy'] if number % 2 else ['drama'],
+            'category': 'films' if number % 2 else 'books',
+        }
+        for number in range(count)
+    ]
+
+
+def lookups(context, table):
+    return [
+        query['sql'] for query in context.captured_queries
+        if query['sql'].startswith('SELECT') and f'FROM "{table}"'
+        in query['sql']
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25BulkTitles:
+    url = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def dictionaries(self, admin_client):
+        create_genre(admin_client)
+        create_categories(admin_client)
+
+    def test_01_create_many(self, admin_client):
+        items = title_items(3)
+        response = admin_client.post(self.url, data=items, format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что POST {self.url} принимает список произведений.'
+        )
+        created = response.json()['created']
+        assert [title['name'] for title in created] == [
+            item['name'] for item in items
+        ]
+        assert sorted(created[1]['genre']) == ['comedy', 'horror']
+        assert created[1]['category'] == 'films'
+        title = Title.objects.get(pk=created[2]['id'])
+        assert list(title.genre.values_list('slug', flat=True)) == ['drama']
+        assert title.name_normalized, (
+            'Проверьте, что у созданных произведений заполнено '
+            '`name_normalized`.'
+        )
+        response = admin_client.get(self.url, {'name': 'пакетное'})
+        assert response.json()['count'] == 3, (
+            'Проверьте, что созданные произведения видны в списке.'
+        )
+
+    def test_02_per_item_errors(self, admin_client):
+        items = title_items(2) + [
+            {'name': 'Без жанра', 'year': 2000, 'genre': ['unknown'],
+             'category': 'films'},
+            {'name': 'Из будущего', 'year': 3000, 'genre': ['drama'],
+             'category': 'films'},
+            'не объект',
+        ]
+        response = admin_client.post(self.url, data=items, format='json')
+        assert response.status_code == 207, (
+            'Проверьте, что при частичных ошибках возвращается 207.'
+        )
+        data = response.json()
+        assert len(data['created']) == 2
+        assert [error['index'] for error in data['errors']] == [2, 3, 4], (
+            'Проверьте, что ошибки возвращаются по каждому элементу.'
+        )
+        assert 'genre' in data['errors'][0]['errors']
+        assert 'year' in data['errors'][1]['errors']
+        response = admin_client.post(
+            self.url, data=items[2:], format='json'
+        )
+        assert response.status_code == 400
+        assert Title.objects.count() == 2
+
+    def test_03_one_query_per_model(self, admin_client):
+        admin_client.post(self.url, data=title_items(1), format='json')
+        counts = []
+        for size in (2, 20):
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.post(
+                    self.url, data=title_items(size), format='json'
+                )
+            assert response.status_code == 201
+            counts.append((
+                len(lookups(context, 'reviews_genre')),
+                len(lookups(context, 'reviews_category')),
+                len([
+                    query for query in context.captured_queries
+                    if query['sql'].startswith('INSERT')
+                ]),
+            ))
+        assert counts[0] == counts[1], (
+            'Проверьте, что число запросов не зависит от размера пакета.'
+        )
+
+    def test_04_permissions_and_limits(self, user_client, admin_client,
+                                       settings):
+        response = user_client.post(
+            self.url, data=title_items(1), format='json'
+        )
+        assert response.status_code == 403
+        settings.TITLE_BULK_MAX_ITEMS = 2
+        response = admin_client.post(
+            self.url, data=title_items(3), format='json'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что размер пакета ограничен TITLE_BULK_MAX_ITEMS.'
+        )
+        response = admin_client.post(self.url, data=[], format='json')
+        assert response.status_code == 400